@@ -14,7 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Importa a Base e todos os modelos para que o autogenerate funcione
 from app.db.base import Base  # noqa
-from app.models import category, item, order, user, member  # noqa
+from app.models import category, item, order, user, member, menu_change, idempotency_key, sales_rollup  # noqa
 
 config = context.config
 
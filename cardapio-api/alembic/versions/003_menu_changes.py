@@ -0,0 +1,33 @@
+"""add menu_changes (change log for the incremental menu delta)
+
+Revision ID: 003_menu_changes
+Revises: 002_fix_member_tabs_fk_cascade
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003_menu_changes'
+down_revision: Union[str, None] = '002_fix_member_tabs_fk_cascade'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'menu_changes',
+        sa.Column('version', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('entity', sa.String(length=10), nullable=False),
+        sa.Column('entity_id', sa.String(length=36), nullable=False),
+        sa.Column('deleted', sa.Boolean(), nullable=False, server_default='false'),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('version'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('menu_changes')
@@ -0,0 +1,49 @@
+"""unique (member_id, year, month) on member_tabs
+
+Revision ID: 004_member_tabs_unique_month
+Revises: 003_menu_changes
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '004_member_tabs_unique_month'
+down_revision: Union[str, None] = '003_menu_changes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Contas duplicadas no mesmo mês (corrida no get-or-create antigo):
+    # soma os totais na conta de menor id e remove as demais.
+    op.execute("""
+        UPDATE member_tabs t
+        SET total_consumed = d.consumed, total_paid = d.paid
+        FROM (
+            SELECT min(id) AS keep_id, sum(total_consumed) AS consumed, sum(total_paid) AS paid
+            FROM member_tabs
+            GROUP BY member_id, year, month
+            HAVING count(*) > 1
+        ) d
+        WHERE t.id = d.keep_id
+    """)
+    op.execute("""
+        DELETE FROM member_tabs t
+        USING member_tabs k
+        WHERE t.member_id = k.member_id AND t.year = k.year AND t.month = k.month AND t.id > k.id
+    """)
+
+    # O índice único cobre as buscas que usavam o índice antigo (member_id, month, year)
+    op.drop_index('ix_member_tabs_member_month_year', table_name='member_tabs')
+    op.create_unique_constraint(
+        'uq_member_tabs_member_year_month', 'member_tabs', ['member_id', 'year', 'month']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_member_tabs_member_year_month', 'member_tabs', type_='unique')
+    op.create_index('ix_member_tabs_member_month_year', 'member_tabs', ['member_id', 'month', 'year'])
@@ -0,0 +1,45 @@
+"""partial and composite indexes for the hot order queries
+
+Revision ID: 006_order_hot_indexes
+Revises: 005_idempotency_keys
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006_order_hot_indexes'
+down_revision: Union[str, None] = '005_idempotency_keys'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Painel: pedidos ativos em ordem de chegada
+    op.create_index(
+        'ix_orders_active_created_at', 'orders', ['created_at'],
+        postgresql_where=sa.text("status NOT IN ('entregue', 'cancelado')"),
+    )
+    # TVs: pedidos prontos
+    op.create_index(
+        'ix_orders_ready_created_at', 'orders', ['created_at'],
+        postgresql_where=sa.text("status = 'pronto'"),
+    )
+    # Cliente: pedidos da sessão, mais recentes primeiro — substitui o índice só de session_id
+    op.create_index('ix_orders_session_created_at', 'orders', ['session_id', sa.text('created_at DESC')])
+    op.execute("DROP INDEX IF EXISTS ix_orders_session_id")
+    # Histórico por período e cursor de sincronização do painel
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'])
+    op.create_index('ix_orders_updated_at', 'orders', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_updated_at', table_name='orders')
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.create_index('ix_orders_session_id', 'orders', ['session_id'])
+    op.drop_index('ix_orders_session_created_at', table_name='orders')
+    op.drop_index('ix_orders_ready_created_at', table_name='orders')
+    op.drop_index('ix_orders_active_created_at', table_name='orders')
@@ -0,0 +1,53 @@
+"""add sales_item_rollups and sales_order_rollups (pre-aggregated sales)
+
+Revision ID: 007_sales_rollups
+Revises: 006_order_hot_indexes
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007_sales_rollups'
+down_revision: Union[str, None] = '006_order_hot_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _measures(prefix_count: str) -> list[sa.Column]:
+    return [
+        sa.Column(f'placed_{prefix_count}', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('placed_revenue', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0'),
+        sa.Column(f'delivered_{prefix_count}', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('delivered_revenue', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0'),
+        sa.Column(f'cancelled_{prefix_count}', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cancelled_revenue', sa.Numeric(precision=12, scale=2), nullable=False, server_default='0'),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sales_item_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('hour', sa.SmallInteger(), nullable=False),
+        sa.Column('item_id', sa.String(length=36), nullable=False),
+        sa.Column('payment_method', sa.String(length=10), nullable=False),
+        *_measures('quantity'),
+        sa.PrimaryKeyConstraint('day', 'hour', 'item_id', 'payment_method'),
+    )
+    op.create_table(
+        'sales_order_rollups',
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('hour', sa.SmallInteger(), nullable=False),
+        sa.Column('payment_method', sa.String(length=10), nullable=False),
+        *_measures('orders'),
+        sa.PrimaryKeyConstraint('day', 'hour', 'payment_method'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sales_order_rollups')
+    op.drop_table('sales_item_rollups')
@@ -0,0 +1,40 @@
+"""pg_trgm GIN indexes for customer/member name search
+
+Revision ID: 008_trigram_search
+Revises: 007_sales_rollups
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008_trigram_search'
+down_revision: Union[str, None] = '007_sales_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_orders_customer_name_trgm', 'orders', ['customer_name'],
+        postgresql_using='gin', postgresql_ops={'customer_name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_members_name_trgm', 'members', ['name'],
+        postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_members_email_trgm', 'members', ['email'],
+        postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_members_email_trgm', table_name='members')
+    op.drop_index('ix_members_name_trgm', table_name='members')
+    op.drop_index('ix_orders_customer_name_trgm', table_name='orders')
+    # A extensão fica: outros objetos do banco podem depender dela
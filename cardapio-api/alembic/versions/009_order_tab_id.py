@@ -0,0 +1,52 @@
+"""add orders.tab_id (explicit link to member_tabs) and statement indexes
+
+Revision ID: 009_order_tab_id
+Revises: 008_trigram_search
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009_order_tab_id'
+down_revision: Union[str, None] = '008_trigram_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Liga os pedidos já lançados na conta à conta do mês em que foram feitos
+# (intervalo semiaberto de created_at — usa ix_orders_member_payment_created_at)
+BACKFILL_TAB_ID = """
+    UPDATE orders o SET tab_id = t.id
+    FROM member_tabs t
+    WHERE o.payment_method = 'conta'
+      AND o.tab_id IS NULL
+      AND o.member_id = t.member_id
+      AND o.created_at >= make_date(t.year, t.month, 1)
+      AND o.created_at < make_date(t.year, t.month, 1) + interval '1 month'
+"""
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('tab_id', sa.String(length=36), nullable=True))
+    op.create_foreign_key(
+        'fk_orders_tab_id', 'orders', 'member_tabs',
+        ['tab_id'], ['id'], ondelete='SET NULL',
+    )
+    op.create_index('ix_orders_tab_id', 'orders', ['tab_id'])
+    # Substitui o índice só de member_id (o composto cobre as buscas por member_id)
+    op.create_index(
+        'ix_orders_member_payment_created_at', 'orders', ['member_id', 'payment_method', 'created_at']
+    )
+    op.execute("DROP INDEX IF EXISTS ix_orders_member_id")
+    op.execute(BACKFILL_TAB_ID)
+
+
+def downgrade() -> None:
+    op.create_index('ix_orders_member_id', 'orders', ['member_id'])
+    op.drop_index('ix_orders_member_payment_created_at', table_name='orders')
+    op.drop_index('ix_orders_tab_id', table_name='orders')
+    op.drop_constraint('fk_orders_tab_id', 'orders', type_='foreignkey')
+    op.drop_column('orders', 'tab_id')
@@ -0,0 +1,65 @@
+"""add tab_entries (append-only ledger of member tabs)
+
+Revision ID: 010_tab_entries
+Revises: 009_order_tab_id
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010_tab_entries'
+down_revision: Union[str, None] = '009_order_tab_id'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Extrato das contas existentes: um consumo por pedido ligado à conta, um ajuste com a
+# diferença para total_consumed (contas anteriores a orders.tab_id) e um pagamento com
+# total_paid — a soma dos lançamentos de cada conta fica igual ao saldo atual.
+BACKFILL_ENTRIES = """
+    INSERT INTO tab_entries (id, tab_id, kind, amount, order_id, notes, created_at)
+    SELECT gen_random_uuid()::text, s.tab_id, s.kind, s.amount, s.order_id, s.notes, s.created_at
+    FROM (
+        SELECT o.tab_id, 'consumo' AS kind, o.total AS amount, o.id AS order_id,
+               NULL::text AS notes, o.created_at
+        FROM orders o WHERE o.tab_id IS NOT NULL
+        UNION ALL
+        SELECT t.id, 'ajuste', t.total_consumed - coalesce(sum(o.total), 0), NULL,
+               'Consumo anterior ao extrato detalhado', now() AT TIME ZONE 'UTC'
+        FROM member_tabs t LEFT JOIN orders o ON o.tab_id = t.id
+        GROUP BY t.id
+        HAVING t.total_consumed <> coalesce(sum(o.total), 0)
+        UNION ALL
+        SELECT t.id, 'pagamento', -t.total_paid, NULL, t.notes,
+               coalesce(t.closed_at, now() AT TIME ZONE 'UTC')
+        FROM member_tabs t WHERE t.total_paid > 0
+    ) s
+    WHERE NOT EXISTS (SELECT 1 FROM tab_entries e WHERE e.tab_id = s.tab_id)
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tab_entries',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('tab_id', sa.String(length=36), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('order_id', sa.String(length=36), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_by', sa.String(length=50), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['tab_id'], ['member_tabs.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tab_entries_tab_created_at', 'tab_entries', ['tab_id', 'created_at'])
+    op.execute(BACKFILL_ENTRIES)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_tab_entries_tab_created_at', table_name='tab_entries')
+    op.drop_table('tab_entries')
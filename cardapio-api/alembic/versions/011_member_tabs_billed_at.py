@@ -0,0 +1,25 @@
+"""add member_tabs.billed_at (month-end close)
+
+Revision ID: 011_member_tabs_billed_at
+Revises: 010_tab_entries
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '011_member_tabs_billed_at'
+down_revision: Union[str, None] = '010_tab_entries'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('member_tabs', sa.Column('billed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('member_tabs', 'billed_at')
@@ -68,6 +68,21 @@ async def get_current_member(
     return member
 
 
+def get_optional_member_id(
+    token: Optional[str] = Depends(oauth2_scheme_optional),
+) -> Optional[str]:
+    """
+    Versão leve de get_optional_member: só valida o JWT, sem consultar o banco.
+    Usada em rotas quentes (cardápio) onde basta saber se é um membro logado.
+    """
+    if not token:
+        return None
+    payload = decode_access_token(token)
+    if not payload or payload.get("role") != "member":
+        return None
+    return payload.get("sub") or None
+
+
 async def get_optional_member(
     token: Optional[str] = Depends(oauth2_scheme_optional),
     db: AsyncSession = Depends(get_db),
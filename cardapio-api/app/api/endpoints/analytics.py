@@ -0,0 +1,44 @@
+from datetime import datetime, date, timedelta
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_db, get_current_user
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.analytics import SalesReport
+from app.crud.crud_sales_rollup import REPORT_GROUPS, local_bucket
+from app import crud
+
+router = APIRouter()
+
+
+# ─── Relatórios de vendas (requer auth) ──────────────────────────────────────────
+
+@router.get("/restaurant/analytics/sales", response_model=SalesReport)
+async def relatorio_vendas(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    group_by: str = Query("day", pattern=f"^({'|'.join(REPORT_GROUPS)})$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Faturamento, quantidade e ticket médio do período, lidos dos rollups pré-agregados.
+    Datas no fuso local (TIMEZONE), inclusivas; padrão = últimos 30 dias.
+    group_by: day | hour | payment_method | item
+    """
+    today, _ = local_bucket(datetime.utcnow())
+    end_date = end_date or today
+    start_date = start_date or end_date - timedelta(days=29)
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date deve ser anterior a end_date")
+
+    totals, buckets = await crud.crud_sales_rollup.get_report(db, start_date, end_date, group_by)
+    return SalesReport(
+        start_date=start_date,
+        end_date=end_date,
+        group_by=group_by,
+        timezone=settings.TIMEZONE,
+        totals=totals,
+        buckets=buckets,
+    )
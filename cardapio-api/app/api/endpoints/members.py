@@ -1,9 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db, get_current_member
-from app.core.security import verify_password, create_access_token
-from app.schemas.member import MemberLogin, MemberResponse, MemberTabResponse
+from app.core.security import create_access_token
+from app.schemas.member import MemberLogin, MemberResponse, MemberTabResponse, TabEntryResponse
 from app.schemas.order import OrderSummary
+from app.services.password_service import password_executor
 from app import crud
 
 router = APIRouter()
@@ -13,7 +14,7 @@ router = APIRouter()
 async def member_login(data: MemberLogin, db: AsyncSession = Depends(get_db)):
     """Membro faz login com e-mail e senha."""
     member = await crud.crud_member.get_by_email(db, data.email)
-    if not member or not verify_password(data.password, member.hashed_password):
+    if not member or not await password_executor.verify(data.password, member.hashed_password):
         raise HTTPException(status_code=401, detail="E-mail ou senha incorretos")
     if not member.is_active:
         raise HTTPException(status_code=403, detail="Conta inativa. Fale com o responsável.")
@@ -63,10 +64,22 @@ async def get_my_tab_orders(
     db: AsyncSession = Depends(get_db),
 ):
     """Retorna os pedidos lançados na conta do mês atual."""
-    from datetime import datetime
-    now = datetime.utcnow()
-    orders = await crud.crud_member.get_orders_for_tab(db, member.id, now.month, now.year)
-    return orders
+    tab = await crud.crud_member.get_current_tab(db, member.id)
+    if not tab:
+        return []
+    return await crud.crud_member.get_orders_for_tab(db, tab)
+
+
+@router.get("/members/me/tab/entries", response_model=list[TabEntryResponse])
+async def get_my_tab_entries(
+    member=Depends(get_current_member),
+    db: AsyncSession = Depends(get_db),
+):
+    """Retorna o extrato (consumos, pagamentos e ajustes) da conta do mês atual."""
+    tab = await crud.crud_member.get_current_tab(db, member.id)
+    if not tab:
+        return []
+    return await crud.crud_member.get_entries(db, tab.id)
 
 
 @router.get("/members/me/tabs", response_model=list[MemberTabResponse])
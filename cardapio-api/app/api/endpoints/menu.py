@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from app.api.deps import get_db, get_current_user
+from app.api.deps import get_db, get_current_user, get_optional_member_id
+from app.api.http_cache import etag_matches, not_modified
 from app.models.category import Category
 from app.models.user import User
-from app.schemas.category import CategoryResponse, CategoryCreate, CategoryUpdate
+from app.schemas.category import CategoryResponse, CategoryCreate, CategoryUpdate, MenuCategory, MenuDelta
 from app.schemas.item import ItemResponse, ItemCreate, ItemUpdate
+from app.services.menu_service import menu_cache
 from app import crud
 
 router = APIRouter()
@@ -14,19 +17,45 @@ router = APIRouter()
 
 # ─── Cardápio público (sem auth) ────────────────────────────────────────────────
 
-@router.get("/menu", response_model=list[CategoryResponse])
-async def listar_cardapio(db: AsyncSession = Depends(get_db)):
-    """Retorna todas as categorias ativas com seus itens ativos."""
-    result = await db.execute(
-        select(Category)
-        .where(Category.active == True)
-        .options(selectinload(Category.items))
-        .order_by(Category.name)
+@router.get("/menu", response_model=list[MenuCategory])
+async def listar_cardapio(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    member_id: Optional[str] = Depends(get_optional_member_id),
+):
+    """
+    Retorna todas as categorias ativas com seus itens ativos.
+    Servido a partir do snapshot em memória (visão de membro se houver token de membro);
+    com If-None-Match válido responde 304.
+    """
+    snapshot = await menu_cache.get(db)
+    view = snapshot.view(is_member=member_id is not None)
+    headers = {
+        "Cache-Control": "no-cache",
+        "Vary": "Authorization",
+        "X-Menu-Version": str(snapshot.version),
+    }
+    if etag_matches(request.headers.get("if-none-match"), view.etag):
+        return not_modified(view.etag, headers)
+    return Response(
+        content=view.body,
+        media_type="application/json",
+        headers={"ETag": view.etag, **headers},
     )
-    categories = result.scalars().all()
-    for cat in categories:
-        cat.items = [i for i in cat.items if i.active]
-    return categories
+
+
+@router.get("/menu/changes", response_model=MenuDelta)
+async def alteracoes_cardapio(
+    since: int = Query(..., ge=0, description="Versão que o cliente já tem (X-Menu-Version)"),
+    db: AsyncSession = Depends(get_db),
+    member_id: Optional[str] = Depends(get_optional_member_id),
+):
+    """
+    Retorna apenas categorias/itens adicionados, alterados ou removidos desde `since`,
+    para o cliente atualizar sua cópia local sem baixar o cardápio inteiro.
+    """
+    body = await menu_cache.get_changes(db, since, is_member=member_id is not None)
+    return Response(content=body, media_type="application/json")
 
 
 # ─── Gestão de Categorias (requer autenticação) ─────────────────────────────────
@@ -48,7 +77,9 @@ async def criar_categoria(
     db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
-    return await crud.crud_category.create(db, data)
+    category = await crud.crud_category.create(db, data)
+    menu_cache.invalidate()
+    return category
 
 
 @router.put("/categories/{category_id}", response_model=CategoryResponse)
@@ -59,6 +90,7 @@ async def atualizar_categoria(
     _: User = Depends(get_current_user),
 ):
     category = await crud.crud_category.update_category(db, category_id, data)
+    menu_cache.invalidate()
     if not category:
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
     return category
@@ -71,6 +103,7 @@ async def deletar_categoria(
     _: User = Depends(get_current_user),
 ):
     deleted = await crud.crud_category.delete(db, category_id)
+    menu_cache.invalidate()
     if not deleted:
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
 
@@ -91,7 +124,9 @@ async def criar_item(
     db: AsyncSession = Depends(get_db),
     _: User = Depends(get_current_user),
 ):
-    return await crud.crud_item.create(db, data)
+    item = await crud.crud_item.create(db, data)
+    menu_cache.invalidate()
+    return item
 
 
 @router.put("/items/{item_id}", response_model=ItemResponse)
@@ -102,6 +137,7 @@ async def atualizar_item(
     _: User = Depends(get_current_user),
 ):
     item = await crud.crud_item.update_item(db, item_id, data)
+    menu_cache.invalidate()
     if not item:
         raise HTTPException(status_code=404, detail="Item não encontrado")
     return item
@@ -114,5 +150,6 @@ async def deletar_item(
     _: User = Depends(get_current_user),
 ):
     deleted = await crud.crud_item.delete(db, item_id)
+    menu_cache.invalidate()
     if not deleted:
         raise HTTPException(status_code=404, detail="Item não encontrado")
@@ -1,17 +1,45 @@
-from fastapi import APIRouter, Depends, HTTPException
+import uuid
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db
+from app.api.http_cache import etag_matches, not_modified, weak_etag
 from app.schemas.order import OrderCreate, OrderResponse, OrderStatusUpdate, OrderSummary, ORDER_STATUSES
-from app.services.pix_service import gerar_payload_pix, gerar_qr_code_base64
-from app.services.notification_service import manager
+from app.services.pix_service import gerar_payload_pix, qr_renderer
+from app.services.notification_service import publish_order_event, subscriptions
+from app.services.menu_service import effective_price
+from app.services import idempotency_service
 from app import crud
 
 router = APIRouter()
 
 
+def _replay_response(body: str) -> Response:
+    """Devolve a resposta original de um pedido já criado com a mesma Idempotency-Key."""
+    return Response(
+        content=body,
+        status_code=201,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
 @router.post("/orders", response_model=OrderResponse, status_code=201)
-async def criar_pedido(data: OrderCreate, db: AsyncSession = Depends(get_db)):
-    """Cria um novo pedido, calcula o total e gera o QR Code Pix (ou lança na conta do membro)."""
+async def criar_pedido(
+    data: OrderCreate,
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=100),
+):
+    """
+    Cria um novo pedido, calcula o total e gera o QR Code Pix (ou lança na conta do membro).
+    Com o cabeçalho Idempotency-Key, reenvios da mesma requisição devolvem o pedido original.
+    """
+
+    # Reenvio (Wi-Fi fraco): devolve o pedido original sem recalcular nem notificar de novo
+    if idempotency_key:
+        replay = await idempotency_service.find_replay(db, idempotency_key, data.session_id)
+        if replay is not None:
+            return _replay_response(replay)
 
     # Valida payment_method
     if data.payment_method not in ("pix", "conta"):
@@ -35,168 +63,135 @@ async def criar_pedido(data: OrderCreate, db: AsyncSession = Depends(get_db)):
     # Calcula o total: usa member_price se for membro e o item tiver preço de membro
     is_member = bool(data.member_id)
     def get_price(item_id: str) -> float:
-        item = items_map[item_id]
-        if is_member and item.member_price is not None:
-            return float(item.member_price)
-        return float(item.price)
+        return effective_price(items_map[item_id], is_member)
 
     total = sum(get_price(oi.item_id) * oi.quantity for oi in data.items)
 
-    # Pedido na conta: sem Pix, status inicial = "conta"
     if data.payment_method == "conta":
-        order = await crud.crud_order.create(db, data, items_db, pix_payload=None, unit_price_fn=get_price)
-
-        # Lança o valor na conta mensal do membro
-        await crud.crud_member.add_to_tab(db, data.member_id, total)
-
-        await manager.broadcast("novo_pedido", {
-            "order_id": order.id,
-            "table_number": order.table_number,
-            "customer_name": order.customer_name,
-            "total": float(order.total),
-            "status": order.status,
-            "payment_method": "conta",
-        })
-        return order
-
-    # Pedido via Pix: gera QR Code
-    import uuid
-    temp_order_id = str(uuid.uuid4())
-    pix_payload = gerar_payload_pix(total, temp_order_id)
-
-    order = await crud.crud_order.create(db, data, items_db, pix_payload=pix_payload, unit_price_fn=get_price)
-
-    await manager.broadcast("novo_pedido", {
+        # Pedido na conta: sem Pix, status inicial = "conta".
+        # Lança o valor na conta mensal do membro na mesma transação do pedido.
+        tab_id = await crud.crud_member.add_to_tab(db, data.member_id, total)
+        pix_payload = None
+    else:
+        # Pedido via Pix: gera o payload com o valor exato do pedido
+        pix_payload = gerar_payload_pix(total, str(uuid.uuid4()))
+        tab_id = None
+
+    order = await crud.crud_order.create(
+        db, data, items_db, pix_payload=pix_payload, unit_price_fn=get_price, commit=False, tab_id=tab_id
+    )
+    if tab_id:
+        await crud.crud_member.record_charge(db, tab_id, order.id, order.total)
+
+    if idempotency_key:
+        body = order.model_dump_json()
+        expires = idempotency_service.expires_at()
+        claimed = await crud.crud_idempotency.claim(
+            db, idempotency_key, data.session_id, order.id, body, expires
+        )
+        if not claimed:
+            # Outra requisição com a mesma chave venceu a corrida: descarta este pedido
+            await db.rollback()
+            replay = await idempotency_service.find_replay(db, idempotency_key, data.session_id)
+            if replay is None:
+                raise HTTPException(status_code=409, detail="Pedido com esta Idempotency-Key em processamento")
+            return _replay_response(replay)
+
+    # Por último: a linha do rollup é disputada por todos os pedidos da mesma hora
+    await crud.crud_sales_rollup.record(db, order, "placed")
+    await db.commit()
+    if idempotency_key:
+        idempotency_service.remember(idempotency_key, data.session_id, body, expires)
+
+    if data.member_id:
+        # O painel mostra o nome do membro (o pedido foi montado em memória, sem o join)
+        order.member_name = await crud.crud_member.get_name(db, data.member_id)
+
+    await publish_order_event("novo_pedido", order, {
         "order_id": order.id,
         "table_number": order.table_number,
         "customer_name": order.customer_name,
         "total": float(order.total),
         "status": order.status,
-        "payment_method": "pix",
+        "payment_method": data.payment_method,
     })
 
     return order
 
 
-@router.get("/orders/{order_id}", response_model=OrderResponse)
-async def buscar_pedido(order_id: str, db: AsyncSession = Depends(get_db)):
-    """Retorna os dados de um pedido pelo ID (usado pelo cliente para acompanhar)."""
-    order = await crud.crud_order.get_by_id(db, order_id)
-    if not order:
+async def _raise_transition_error(db: AsyncSession, order_id: str, new_status: str) -> None:
+    """Transição recusada: 404 se o pedido não existe, 409 se o status atual não permite."""
+    current = await crud.crud_order.get_status(db, order_id)
+    if current is None:
         raise HTTPException(status_code=404, detail="Pedido não encontrado")
-    return order
+    raise HTTPException(
+        status_code=409,
+        detail=f"Não é possível mudar o pedido de '{current}' para '{new_status}'",
+    )
 
 
-@router.get("/orders/session/{session_id}", response_model=list[OrderSummary])
-async def buscar_pedidos_da_sessao(session_id: str, db: AsyncSession = Depends(get_db)):
-    """Retorna os pedidos de uma sessão (cliente acompanha pelo localStorage)."""
-    return await crud.crud_order.get_by_session(db, session_id)
-
-
-@router.post("/orders/{order_id}/declare-payment", response_model=OrderResponse)
-async def declarar_pagamento(order_id: str, db: AsyncSession = Depends(get_db)):
+@router.get("/orders/{order_id}", response_model=OrderResponse)
+async def buscar_pedido(
+    order_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
     """
-    Cliente clicou em 'Já paguei! Avisar o restaurante'.
-    Muda status para 'pagamento_declarado' e notifica o painel.
+    Retorna os dados de um pedido pelo ID (usado pelo cliente para acompanhar).
+    ETag fraco = updated_at; com If-None-Match igual responde 304 sem carregar os itens.
     """
-    order = await crud.crud_order.get_by_id(db, order_id)
-    if not order:
+    # A versão é lida antes dos dados: se o pedido mudar no meio, o próximo poll traz a mudança
+    version = await crud.crud_order.get_version(db, order_id)
+    if version is None:
         raise HTTPException(status_code=404, detail="Pedido não encontrado")
-    if order.status != "aguardando_pagamento":
-        raise HTTPException(status_code=400, detail="Pedido não está aguardando pagamento")
 
-    order = await crud.crud_order.update_status(db, order_id, "pagamento_declarado")
-
-    await manager.broadcast("pagamento_declarado", {
-        "order_id": order.id,
-        "table_number": order.table_number,
-        "customer_name": order.customer_name,
-        "total": float(order.total),
-    })
+    etag = weak_etag(version.isoformat())
+    headers = {"Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, headers)
 
+    order = await crud.crud_order.get_by_id(db, order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Pedido não encontrado")
+    response.headers.update({"ETag": etag, **headers})
     return order
 
 
-@router.patch("/orders/{order_id}/status", response_model=OrderResponse)
-async def atualizar_status(
+@router.get("/orders/{order_id}/qr")
+async def qr_code_do_pedido(
     order_id: str,
-    data: OrderStatusUpdate,
+    formato: str = Query("svg", pattern="^(png|svg)$"),
     db: AsyncSession = Depends(get_db),
 ):
-    """Restaurante atualiza o status do pedido (protegido no painel)."""
-    if data.status not in ORDER_STATUSES:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Status inválido. Válidos: {ORDER_STATUSES}"
-        )
-
-    order = await crud.crud_order.update_status(db, order_id, data.status)
-    if not order:
-        raise HTTPException(status_code=404, detail="Pedido não encontrado")
-
-    await manager.broadcast("status_atualizado", {
-        "order_id": order.id,
-        "status": order.status,
-        "table_number": order.table_number,
-        "customer_name": order.customer_name,
-    })
-
-    return order
-
-
-
-@router.post("/orders", response_model=OrderResponse, status_code=201)
-async def criar_pedido(data: OrderCreate, db: AsyncSession = Depends(get_db)):
-    """Cria um novo pedido, calcula o total e gera o QR Code Pix."""
-    # Busca todos os itens do pedido no banco
-    item_ids = [oi.item_id for oi in data.items]
-    items_db = await crud.crud_item.get_by_ids(db, item_ids)
-
-    # Valida que todos os itens existem e estão ativos
-    items_map = {item.id: item for item in items_db}
-    for oi in data.items:
-        if oi.item_id not in items_map:
-            raise HTTPException(status_code=404, detail=f"Item '{oi.item_id}' não encontrado")
-        if not items_map[oi.item_id].active:
-            raise HTTPException(status_code=400, detail=f"Item '{items_map[oi.item_id].name}' não está disponível")
-
-    # Calcula o total para gerar o Pix
-    total = sum(float(items_map[oi.item_id].price) * oi.quantity for oi in data.items)
-
-    # Gera o payload Pix com o valor exato do pedido
-    # O ID do pedido ainda não existe, usamos um placeholder temporário
-    # O CRUD vai gerar o UUID real
-    import uuid
-    temp_order_id = str(uuid.uuid4())
-    pix_payload = gerar_payload_pix(total, temp_order_id)
-
-    # Cria o pedido no banco
-    order = await crud.crud_order.create(db, data, items_db, pix_payload)
-
-    # Notifica o painel do restaurante via WebSocket
-    await manager.broadcast("novo_pedido", {
-        "order_id": order.id,
-        "table_number": order.table_number,
-        "customer_name": order.customer_name,
-        "total": float(order.total),
-        "status": order.status,
-    })
-
-    return order
-
-
-@router.get("/orders/{order_id}", response_model=OrderResponse)
-async def buscar_pedido(order_id: str, db: AsyncSession = Depends(get_db)):
-    """Retorna os dados de um pedido pelo ID (usado pelo cliente para acompanhar)."""
-    order = await crud.crud_order.get_by_id(db, order_id)
-    if not order:
-        raise HTTPException(status_code=404, detail="Pedido não encontrado")
-    return order
+    """QR Code Pix do pedido (SVG por padrão; png = data URI base64), servido do cache quando possível."""
+    pix_payload = await crud.crud_order.get_pix_payload(db, order_id)
+    if not pix_payload:
+        raise HTTPException(status_code=404, detail="Pedido sem Pix")
+    qr_code = await qr_renderer.render(pix_payload, formato)
+    if formato == "svg":
+        return Response(content=qr_code, media_type="image/svg+xml")
+    return {"qr_code_base64": qr_code}
 
 
 @router.get("/orders/session/{session_id}", response_model=list[OrderSummary])
-async def buscar_pedidos_da_sessao(session_id: str, db: AsyncSession = Depends(get_db)):
-    """Retorna os pedidos de uma sessão (cliente acompanha pelo localStorage)."""
+async def buscar_pedidos_da_sessao(
+    session_id: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Retorna os pedidos de uma sessão (cliente acompanha pelo localStorage).
+    ETag fraco = maior updated_at + quantidade de pedidos; If-None-Match igual responde 304.
+    """
+    last_update, count = await crud.crud_order.get_session_version(db, session_id)
+    etag = weak_etag(count, last_update.isoformat() if last_update else "0")
+    headers = {"Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag, headers)
+
+    response.headers.update({"ETag": etag, **headers})
     return await crud.crud_order.get_by_session(db, session_id)
 
 
@@ -206,16 +201,14 @@ async def declarar_pagamento(order_id: str, db: AsyncSession = Depends(get_db)):
     Cliente clicou em 'Já paguei! Avisar o restaurante'.
     Muda status para 'pagamento_declarado' e notifica o painel.
     """
-    order = await crud.crud_order.get_by_id(db, order_id)
+    order = await crud.crud_order.update_status(db, order_id, "pagamento_declarado")
     if not order:
-        raise HTTPException(status_code=404, detail="Pedido não encontrado")
-    if order.status != "aguardando_pagamento":
+        if await crud.crud_order.get_status(db, order_id) is None:
+            raise HTTPException(status_code=404, detail="Pedido não encontrado")
+        # 400 como sempre foi (contrato do endpoint); o PATCH de status usa 409
         raise HTTPException(status_code=400, detail="Pedido não está aguardando pagamento")
 
-    order = await crud.crud_order.update_status(db, order_id, "pagamento_declarado")
-
-    # Alerta o restaurante com destaque
-    await manager.broadcast("pagamento_declarado", {
+    await publish_order_event("pagamento_declarado", order, {
         "order_id": order.id,
         "table_number": order.table_number,
         "customer_name": order.customer_name,
@@ -238,12 +231,15 @@ async def atualizar_status(
             detail=f"Status inválido. Válidos: {ORDER_STATUSES}"
         )
 
-    order = await crud.crud_order.update_status(db, order_id, data.status)
+    order = await crud.crud_order.update_status(db, order_id, data.status, commit=False)
     if not order:
-        raise HTTPException(status_code=404, detail="Pedido não encontrado")
+        await _raise_transition_error(db, order_id, data.status)
 
-    # Notifica o cliente e outros painéis sobre a atualização
-    await manager.broadcast("status_atualizado", {
+    # Entregue/cancelado entram nos relatórios na mesma transação da mudança de status
+    await crud.crud_sales_rollup.record_status_change(db, order)
+    await db.commit()
+
+    await publish_order_event("status_atualizado", order, {
         "order_id": order.id,
         "status": order.status,
         "table_number": order.table_number,
@@ -251,3 +247,30 @@ async def atualizar_status(
     })
 
     return order
+
+
+# ─── WebSocket (cliente acompanha o pedido em tempo real) ────────────────────────
+
+async def _listen(websocket: WebSocket, topic: str) -> None:
+    await subscriptions.connect(websocket, topic)
+    try:
+        while True:
+            # Mantém conexão aberta; o cliente só escuta (não envia)
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        subscriptions.disconnect(websocket, topic)
+
+
+@router.websocket("/ws/orders/{order_id}")
+async def websocket_pedido(websocket: WebSocket, order_id: str):
+    """
+    Eventos de um pedido: pagamento_declarado | status_atualizado.
+    O cliente só busca o pedido de novo quando recebe um evento.
+    """
+    await _listen(websocket, f"order:{order_id}")
+
+
+@router.websocket("/ws/sessions/{session_id}")
+async def websocket_sessao(websocket: WebSocket, session_id: str):
+    """Eventos de todos os pedidos de uma sessão: novo_pedido | pagamento_declarado | status_atualizado."""
+    await _listen(websocket, f"session:{session_id}")
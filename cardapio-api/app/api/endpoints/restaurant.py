@@ -1,15 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
-from datetime import datetime, date
-from typing import Optional
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from datetime import datetime, date, timezone
+from typing import Optional, Union
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.api.deps import get_db, get_current_user
+from app.api.pagination import decode_cursor, encode_cursor
+from app.db.session import AsyncSessionLocal
 from app.models.user import User
-from app.core.security import verify_password, create_access_token, get_password_hash
-from app.services.notification_service import manager
-from app.schemas.order import OrderResponse, OrderSummary
+from app.core.security import create_access_token
+from app.services.notification_service import manager, tv_manager
+from app.services.active_orders_board import board
+from app.services.password_service import password_executor
+from app.services import export_service, member_import_service, tab_closing_service
+from app.schemas.member import (
+    MemberImportReport, MemberOverview, MemberOverviewPage, MemberResponse,
+    MemberTabAdjustment, MemberTabPayment,
+)
+from app.schemas.order import ActiveOrdersDelta, OrderResponse, OrderSummary, TvOrder
 from app import crud
 
 router = APIRouter()
@@ -25,7 +36,7 @@ async def login(
     result = await db.execute(select(User).where(User.username == form_data.username))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_executor.verify(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Usuário ou senha incorretos")
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Usuário inativo")
@@ -34,44 +45,177 @@ async def login(
     return {"access_token": token, "token_type": "bearer"}
 
 
+@router.get("/restaurant/metrics/passwords")
+async def metricas_senhas(current_user: User = Depends(get_current_user)):
+    """Fila do bcrypt (logins/cadastros): em execução, aguardando, recusadas e tempos médios."""
+    return password_executor.stats()
+
+
 # ─── Painel de TV (público, sem autenticação) ─────────────────────────────────
 
-@router.get("/tv/ready-orders", response_model=list[OrderResponse])
+@router.get("/tv/ready-orders", response_model=list[TvOrder])
 async def pedidos_prontos_tv(
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Retorna apenas os pedidos com status 'pronto' para exibição no painel de TV.
-    Endpoint público — não requer autenticação.
+    Retorna apenas os pedidos com status 'pronto' para exibição no painel de TV
+    (id, mesa, nome e hora em que ficou pronto).
+    Endpoint público — não requer autenticação. Servido do quadro em memória.
+    """
+    if board.loaded:
+        return board.ready_orders()
+    return await crud.crud_order.get_ready_tv(db)
+
+
+@router.websocket("/ws/tv")
+async def websocket_tv(websocket: WebSocket):
+    """
+    Conexão WebSocket das TVs.
+    Recebe eventos: ficou_pronto (TvOrder) | saiu_de_pronto ({"id"})
     """
-    return await crud.crud_order.get_ready_orders(db)
+    await tv_manager.connect(websocket)
+    try:
+        while True:
+            # Mantém conexão aberta; a TV só escuta (não envia)
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        tv_manager.disconnect(websocket)
 
 
 # ─── Painel do Restaurante (requer auth) ─────────────────────────────────────────
 
-@router.get("/restaurant/orders", response_model=list[OrderResponse])
+@router.get("/restaurant/orders", response_model=Union[list[OrderResponse], ActiveOrdersDelta])
 async def listar_pedidos_ativos(
+    response: Response,
+    since: Optional[datetime] = Query(None, description="Cursor recebido em X-Sync-Cursor ou no último delta"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Lista todos os pedidos ativos (ainda não entregues) para o painel."""
-    return await crud.crud_order.get_active_orders(db)
+    """
+    Sem `since`: lista todos os pedidos ativos (ainda não entregues) para o painel,
+    a partir do quadro em memória, com o cursor de sincronização no cabeçalho X-Sync-Cursor.
+    Com `since`: retorna só os pedidos alterados desde o cursor e os ids que saíram do painel.
+    """
+    if since is None and board.loaded:
+        # Lista e cursor do mesmo lugar: o delta seguinte (lido do banco) traz tudo que
+        # mudou depois do que o quadro mostrou, inclusive o que ele ainda não sabia
+        cursor = board.sync_cursor()
+        if cursor is not None:
+            response.headers["X-Sync-Cursor"] = cursor.isoformat()
+            return board.active_orders()
+
+    # O cursor é lido antes dos dados: o que mudar no meio volta no próximo delta
+    cursor = await crud.crud_order.get_sync_cursor(db)
+
+    if since is None:
+        # Quadro não carregado (ou vazio): lista e cursor vêm do banco
+        if cursor is not None:
+            response.headers["X-Sync-Cursor"] = cursor.isoformat()
+        return await crud.crud_order.get_active_orders(db)
+
+    if since.tzinfo is not None:
+        # updated_at é gravado em UTC sem fuso
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    orders, removed = await crud.crud_order.get_active_changes(db, since)
+    return ActiveOrdersDelta(
+        cursor=max(cursor, since) if cursor is not None else since,
+        orders=[OrderResponse.model_validate(order) for order in orders],
+        removed=removed,
+    )
+
+
+HISTORY_PAGE_SIZE = 100
+HISTORY_MAX_PAGE_SIZE = 500
+
+
+async def _history_ndjson(start_date, end_date, customer_name, after):
+    """Uma linha JSON por pedido, direto do cursor do servidor."""
+    # Sessão própria: a do Depends(get_db) é fechada antes de o corpo ser enviado
+    async with AsyncSessionLocal() as db:
+        async for order in crud.crud_order.stream_history(
+            db, start_date=start_date, end_date=end_date, customer_name=customer_name, after=after
+        ):
+            yield OrderResponse.model_validate(order).model_dump_json() + "\n"
+
+
+@router.get("/restaurant/orders/search", response_model=list[OrderSummary])
+async def buscar_pedidos(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Busca pedidos pelo nome do cliente, mais parecidos primeiro (tolera erros de digitação)."""
+    return await crud.crud_order.search_by_customer(db, q, limit=limit, offset=offset)
 
 
 @router.get("/restaurant/history", response_model=list[OrderResponse])
 async def historico_pedidos(
+    response: Response,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     customer_name: Optional[str] = None,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor da página anterior"),
+    formato: str = Query("json", pattern="^(json|ndjson)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Retorna histórico de pedidos com filtros opcionais.
+    Retorna o histórico de pedidos (mais recentes primeiro) com filtros opcionais.
     Recebe datas no formato YYYY-MM-DD.
+    json: uma página de até `limit` pedidos; o cursor da próxima vem em X-Next-Cursor.
+    ndjson: todo o período em streaming, um pedido por linha (ignora `limit`).
     """
-    return await crud.crud_order.get_history(
-        db, start_date=start_date, end_date=end_date, customer_name=customer_name
+    after = decode_cursor(cursor) if cursor else None
+
+    if formato == "ndjson":
+        return StreamingResponse(
+            _history_ndjson(start_date, end_date, customer_name, after),
+            media_type="application/x-ndjson",
+        )
+
+    orders = await crud.crud_order.get_history(
+        db, start_date=start_date, end_date=end_date, customer_name=customer_name,
+        limit=limit, after=after,
+    )
+    if len(orders) == limit:
+        last = orders[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return orders
+
+
+@router.get("/restaurant/export")
+async def exportar_pedidos(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    formato: str = Query("csv", pattern="^(csv|xlsx)$"),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Exporta pedidos e itens (uma linha por item, com nome do item e do membro) para planilha.
+    csv: streaming, começa a enviar na hora; xlsx: gerado em disco e enviado ao final.
+    """
+    filename = f"pedidos_{start_date or 'inicio'}_{end_date or 'hoje'}.{formato}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+    if formato == "csv":
+        return StreamingResponse(
+            export_service.csv_chunks(start_date, end_date),
+            media_type="text/csv; charset=utf-8",
+            headers=headers,
+        )
+
+    try:
+        path = await export_service.build_xlsx(start_date, end_date)
+    except ImportError:
+        raise HTTPException(status_code=501, detail="Exportação XLSX indisponível (openpyxl não instalado)")
+    return FileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers=headers,
+        background=BackgroundTask(os.remove, path),
     )
 
 
@@ -105,6 +249,46 @@ async def listar_membros(
     return [MemberResponse.model_validate(m) for m in members]
 
 
+@router.get("/restaurant/members/overview", response_model=MemberOverviewPage)
+async def visao_geral_membros(
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    sort: str = Query("name", pattern="^(name|balance|current)$"),
+    is_active: Optional[bool] = Query(None, description="Filtra por membros ativos (true) ou inativos (false)"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Listagem paginada dos membros com a conta do mês atual e o saldo devedor total,
+    numa única consulta (sem buscar as contas membro a membro).
+    """
+    total, rows = await crud.crud_member.get_overview(db, limit=limit, offset=offset, sort=sort, is_active=is_active)
+    items = [
+        MemberOverview(
+            **MemberResponse.model_validate(row.Member).model_dump(),
+            current_tab_id=row.current_tab_id,
+            current_consumed=row.current_consumed,
+            current_paid=row.current_paid,
+            current_status=row.current_status,
+            outstanding=row.outstanding,
+        )
+        for row in rows
+    ]
+    return MemberOverviewPage(total=total, items=items)
+
+
+@router.get("/restaurant/members/search", response_model=list[MemberResponse])
+async def buscar_membros(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Busca membros por nome ou e-mail, mais parecidos primeiro (tolera erros de digitação)."""
+    return await crud.crud_member.search(db, q, limit=limit, offset=offset)
+
+
 @router.post("/restaurant/members", response_model=dict)
 async def criar_membro(
     data: dict,
@@ -121,6 +305,40 @@ async def criar_membro(
     return MemberResponse.model_validate(member).model_dump()
 
 
+@router.post("/restaurant/members/import", response_model=MemberImportReport)
+async def importar_membros(
+    request: Request,
+    dry_run: bool = Query(False, description="Só valida, sem cadastrar"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Cadastra vários membros de uma vez. Aceita planilha CSV (multipart, campo `file`,
+    ou corpo text/csv, colunas nome;email;senha;telefone) ou JSON (lista de membros).
+    Linhas com erro não impedem as demais; o relatório traz o resultado de cada linha.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("file")
+            if upload is None or isinstance(upload, str):
+                raise HTTPException(status_code=400, detail="Envie a planilha no campo 'file'")
+            rows = member_import_service.parse_csv(await upload.read())
+        elif content_type.startswith("text/csv"):
+            rows = member_import_service.parse_csv(await request.body())
+        else:
+            rows = member_import_service.parse_json(await request.json())
+    except member_import_service.MemberImportError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="A planilha deve estar em UTF-8")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="JSON inválido")
+
+    return await member_import_service.import_members(db, rows, dry_run=dry_run)
+
+
 @router.patch("/restaurant/members/{member_id}", response_model=dict)
 async def atualizar_membro(
     member_id: str,
@@ -177,7 +395,7 @@ async def pedidos_da_conta(
     tab = await crud.crud_member.get_tab_by_id(db, tab_id)
     if not tab or tab.member_id != member_id:
         raise HTTPException(status_code=404, detail="Conta não encontrada")
-    orders = await crud.crud_member.get_orders_for_tab(db, member_id, tab.month, tab.year)
+    orders = await crud.crud_member.get_orders_for_tab(db, tab)
     return [OrderSummary.model_validate(o) for o in orders]
 
 
@@ -185,7 +403,7 @@ async def pedidos_da_conta(
 async def registrar_pagamento_conta(
     member_id: str,
     tab_id: str,
-    data: dict,
+    payment: MemberTabPayment,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -193,27 +411,66 @@ async def registrar_pagamento_conta(
     Admin confirma recebimento do pagamento da conta do membro
     (independente de ser Pix ou cartão — a confirmação é sempre manual).
     """
-    from app.schemas.member import MemberTabPayment, MemberTabResponse
-    payment = MemberTabPayment(**data)
+    from app.schemas.member import MemberTabResponse
     tab = await crud.crud_member.get_tab_by_id(db, tab_id)
     if not tab or tab.member_id != member_id:
         raise HTTPException(status_code=404, detail="Conta não encontrada")
-    updated_tab = await crud.crud_member.register_payment(db, tab_id, payment)
+    updated_tab = await crud.crud_member.register_payment(db, tab_id, payment, created_by=current_user.username)
     return MemberTabResponse.model_validate(updated_tab).model_dump()
 
 
+@router.post("/restaurant/members/{member_id}/tabs/{tab_id}/adjust", response_model=dict)
+async def ajustar_conta(
+    member_id: str,
+    tab_id: str,
+    adjustment: MemberTabAdjustment,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Ajuste manual do consumo da conta (valor positivo cobra a mais, negativo dá desconto).
+    Fica registrado no extrato com o motivo e o usuário que fez.
+    """
+    from app.schemas.member import MemberTabResponse
+    tab = await crud.crud_member.get_tab_by_id(db, tab_id)
+    if not tab or tab.member_id != member_id:
+        raise HTTPException(status_code=404, detail="Conta não encontrada")
+    updated_tab = await crud.crud_member.adjust_tab(db, tab_id, adjustment, created_by=current_user.username)
+    if not updated_tab:
+        raise HTTPException(status_code=400, detail="O ajuste deixaria o consumo da conta negativo")
+    return MemberTabResponse.model_validate(updated_tab).model_dump()
+
+
+@router.get("/restaurant/members/{member_id}/tabs/{tab_id}/statement", response_model=dict)
+async def extrato_da_conta(
+    member_id: str,
+    tab_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Extrato da conta: consumos, pagamentos e ajustes com o saldo acumulado."""
+    from app.schemas.member import MemberTabStatement
+    tab = await crud.crud_member.get_tab_by_id(db, tab_id)
+    if not tab or tab.member_id != member_id:
+        raise HTTPException(status_code=404, detail="Conta não encontrada")
+    entries = await crud.crud_member.get_entries(db, tab_id)
+    return MemberTabStatement.build(tab, entries).model_dump()
+
+
 @router.get("/restaurant/members/{member_id}/tabs/{tab_id}/pix")
 async def gerar_pix_quitacao(
     member_id: str,
     tab_id: str,
+    formato: str = Query("png", pattern="^(png|svg)$"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Gera QR Code Pix com o saldo devedor da conta do membro
     para o admin mostrar ao membro para quitar.
+    formato=svg retorna `qr_code_svg` (mais leve) no lugar de `qr_code_base64`.
     """
-    from app.services.pix_service import gerar_payload_pix, gerar_qr_code_base64
+    from app.services.pix_service import gerar_payload_pix, qr_renderer
     tab = await crud.crud_member.get_tab_by_id(db, tab_id)
     if not tab or tab.member_id != member_id:
         raise HTTPException(status_code=404, detail="Conta não encontrada")
@@ -222,13 +479,56 @@ async def gerar_pix_quitacao(
     if saldo <= 0:
         raise HTTPException(status_code=400, detail="Conta já está quitada")
 
-    pix_payload = gerar_payload_pix(saldo, f"CONTA-{tab_id[:8].upper()}")
-    qr_base64 = gerar_qr_code_base64(pix_payload)
+    pix_payload = gerar_payload_pix(saldo, tab_closing_service.tab_txid(tab_id))
+    qr_code = await qr_renderer.render(pix_payload, formato)
 
     return {
         "pix_payload": pix_payload,
-        "qr_code_base64": qr_base64,
+        f"qr_code_{'svg' if formato == 'svg' else 'base64'}": qr_code,
         "saldo_devedor": saldo,
         "tab_id": tab_id,
     }
 
+
+@router.post("/restaurant/tabs/close-month")
+async def fechar_mes(
+    year: Optional[int] = Query(None, ge=2000, le=2100),
+    month: Optional[int] = Query(None, ge=1, le=12),
+    formato: str = Query("json", pattern="^(json|zip)$"),
+    qr: str = Query("png", pattern="^(png|svg)$"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Fecha as contas de todos os membros no mês (padrão: mês anterior) e gera de uma vez
+    a cobrança Pix de cada conta com saldo devedor.
+    formato=json devolve payloads e QR Codes; formato=zip devolve as imagens (qr=png|svg)
+    e um cobrancas.csv com membro, contato, valor e Pix copia-e-cola.
+    Rodar de novo para o mesmo mês é seguro: reemite as cobranças com os saldos atuais.
+    """
+    if (year is None) != (month is None):
+        raise HTTPException(status_code=400, detail="Informe year e month juntos")
+    if year is None:
+        today = datetime.utcnow()
+        year, month = (today.year - 1, 12) if today.month == 1 else (today.year, today.month - 1)
+
+    rows = await crud.crud_member.close_month(db, year, month)
+    charges = await tab_closing_service.build_charges(rows, qr)
+
+    if formato == "zip":
+        content = await tab_closing_service.zip_bundle(charges, qr)
+        filename = f"cobrancas_{year}-{month:02d}.zip"
+        return Response(
+            content=content,
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    return {
+        "year": year,
+        "month": month,
+        "contas_fechadas": len(rows),
+        "total_devedor": round(sum(c["saldo_devedor"] for c in charges), 2),
+        "cobrancas": charges,
+    }
+
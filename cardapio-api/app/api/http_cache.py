@@ -0,0 +1,28 @@
+"""
+Helpers de cache HTTP (ETag / If-None-Match) compartilhados pelos endpoints.
+"""
+from typing import Optional
+from fastapi import Response
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara o cabeçalho If-None-Match com o ETag atual (comparação fraca, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == current
+        for candidate in if_none_match.split(",")
+    )
+
+
+def weak_etag(*parts) -> str:
+    """ETag fraco a partir de valores de versão (ex.: updated_at, contagem)."""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def not_modified(etag: str, headers: Optional[dict] = None) -> Response:
+    """Resposta 304 sem corpo, repetindo o ETag para o cliente."""
+    return Response(status_code=304, headers={"ETag": etag, **(headers or {})})
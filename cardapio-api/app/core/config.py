@@ -19,6 +19,20 @@ class Settings(BaseSettings):
     RESTAURANT_NAME: str = "Restaurante"
     RESTAURANT_CITY: str = "Brasil"
     BAR_WHATSAPP: str = ""
+    TIMEZONE: str = "America/Sao_Paulo"  # fuso dos relatórios (dia/hora das vendas)
+    QR_RENDER_WORKERS: int = 2     # processos dedicados à renderização de QR Code
+    QR_CACHE_SIZE: int = 512       # QR Codes renderizados mantidos em memória (LRU)
+    LOGIN_BCRYPT_THREADS: int = 2       # threads de bcrypt para login/cadastro avulso (operações simultâneas)
+    LOGIN_BCRYPT_MAX_PENDING: int = 32  # logins/cadastros aguardando bcrypt; acima disso responde 503
+    IMPORT_HASH_PROCESSES: int = 2  # processos para o hash de senhas da importação de membros em lote
+    MEMBER_IMPORT_MAX_ROWS: int = 200  # linhas por importação (~0,25 s de bcrypt por linha ÷ processos)
+
+    # Idempotência do POST /orders
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_CACHE_SIZE: int = 2048
+
+    # Quadro de pedidos ativos em memória
+    BOARD_RECONCILE_SECONDS: int = 60   # intervalo da conferência com o banco
 
     # CORS / Frontend
     FRONTEND_URL: str = "http://localhost:5173"
@@ -1 +1 @@
-from app.crud import crud_category, crud_item, crud_order, crud_member
+from app.crud import crud_category, crud_item, crud_order, crud_member, crud_menu_change, crud_idempotency, crud_sales_rollup
@@ -1,8 +1,10 @@
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from sqlalchemy.orm import selectinload
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.crud import crud_menu_change
 from typing import Optional
 
 
@@ -24,8 +26,9 @@ async def get_by_id(db: AsyncSession, category_id: str) -> Optional[Category]:
 
 
 async def create(db: AsyncSession, data: CategoryCreate) -> Category:
-    category = Category(**data.model_dump())
+    category = Category(id=str(uuid.uuid4()), **data.model_dump())
     db.add(category)
+    crud_menu_change.record(db, "category", category.id)
     await db.commit()
     # Busca novamente para garantir que relacionamentos (items) sejam carregados com eager loading
     return await get_by_id(db, category.id)
@@ -37,9 +40,11 @@ async def update_category(
     values = {k: v for k, v in data.model_dump().items() if v is not None}
     if not values:
         return await get_by_id(db, category_id)
-    await db.execute(
+    result = await db.execute(
         update(Category).where(Category.id == category_id).values(**values)
     )
+    if result.rowcount:
+        crud_menu_change.record(db, "category", category_id)
     await db.commit()
     return await get_by_id(db, category_id)
 
@@ -49,5 +54,6 @@ async def delete(db: AsyncSession, category_id: str) -> bool:
     if not category:
         return False
     await db.delete(category)
+    crud_menu_change.record(db, "category", category_id, deleted=True)
     await db.commit()
     return True
@@ -0,0 +1,61 @@
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.idempotency_key import IdempotencyKey
+
+
+async def get_valid(db: AsyncSession, key: str) -> Optional[IdempotencyKey]:
+    """Busca a chave pela PK, ignorando as expiradas."""
+    result = await db.execute(
+        select(IdempotencyKey).where(
+            IdempotencyKey.key == key,
+            IdempotencyKey.expires_at > datetime.utcnow(),
+        )
+    )
+    return result.scalar_one_or_none()
+
+
+async def claim(
+    db: AsyncSession,
+    key: str,
+    session_id: str,
+    order_id: str,
+    response_body: str,
+    expires_at: datetime,
+) -> bool:
+    """
+    Grava a chave na transação do pedido. Uma chave expirada é reaproveitada;
+    se outra requisição já gravou a mesma chave válida, retorna False
+    (o chamador faz rollback e devolve a resposta original).
+    """
+    stmt = pg_insert(IdempotencyKey).values(
+        key=key,
+        session_id=session_id,
+        order_id=order_id,
+        response_body=response_body,
+        created_at=datetime.utcnow(),
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.key],
+        set_={
+            "session_id": stmt.excluded.session_id,
+            "order_id": stmt.excluded.order_id,
+            "response_body": stmt.excluded.response_body,
+            "created_at": stmt.excluded.created_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=IdempotencyKey.expires_at <= datetime.utcnow(),
+    ).returning(IdempotencyKey.key)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none() is not None
+
+
+async def purge_expired(db: AsyncSession) -> int:
+    result = await db.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow())
+    )
+    await db.commit()
+    return result.rowcount
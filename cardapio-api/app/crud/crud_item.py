@@ -1,8 +1,10 @@
+import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
 from sqlalchemy.orm import selectinload
 from app.models.item import Item
 from app.schemas.item import ItemCreate, ItemUpdate
+from app.crud import crud_menu_change
 from typing import Optional
 
 
@@ -25,8 +27,9 @@ async def get_by_ids(db: AsyncSession, item_ids: list[str]) -> list[Item]:
 
 
 async def create(db: AsyncSession, data: ItemCreate) -> Item:
-    item = Item(**data.model_dump())
+    item = Item(id=str(uuid.uuid4()), **data.model_dump())
     db.add(item)
+    crud_menu_change.record(db, "item", item.id)
     await db.commit()
     await db.refresh(item)
     return item
@@ -38,7 +41,9 @@ async def update_item(
     values = {k: v for k, v in data.model_dump().items() if v is not None}
     if not values:
         return await get_by_id(db, item_id)
-    await db.execute(update(Item).where(Item.id == item_id).values(**values))
+    result = await db.execute(update(Item).where(Item.id == item_id).values(**values))
+    if result.rowcount:
+        crud_menu_change.record(db, "item", item_id)
     await db.commit()
     return await get_by_id(db, item_id)
 
@@ -48,5 +53,6 @@ async def delete(db: AsyncSession, item_id: str) -> bool:
     if not item:
         return False
     await db.delete(item)
+    crud_menu_change.record(db, "item", item_id, deleted=True)
     await db.commit()
     return True
@@ -1,11 +1,15 @@
+import uuid
 from datetime import datetime
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete as sql_delete
-from app.models.member import Member, MemberTab
+from sqlalchemy import select, insert, update, and_, case, func, null, delete as sql_delete
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from app.models.member import Member, MemberTab, TabEntry
 from app.models.order import Order
-from app.schemas.member import MemberCreate, MemberUpdate, MemberTabPayment
-from app.core.security import get_password_hash
+from app.db.search import matches, similarity, supports_trigram
+from app.schemas.member import MemberCreate, MemberUpdate, MemberTabAdjustment, MemberTabPayment
+from app.services.password_service import password_executor
 
 
 # ─── Member ───────────────────────────────────────────────────────────────────
@@ -15,11 +19,109 @@ async def get_all(db: AsyncSession) -> list[Member]:
     return list(result.scalars().all())
 
 
+MEMBER_SORTS = ("name", "balance", "current")
+
+
+async def get_overview(
+    db: AsyncSession,
+    limit: int = 50,
+    offset: int = 0,
+    sort: str = "name",
+    is_active: Optional[bool] = None,
+) -> tuple[int, list]:
+    """
+    Página da listagem do admin numa única consulta: cada membro com a conta do mês
+    atual (LEFT JOIN pela chave única member_id/year/month), o saldo devedor somado de
+    todas as contas e o total de membros do filtro (count(*) OVER ()).
+    sort: name | balance (maior saldo devedor primeiro) | current (maior consumo no mês).
+    Retorna (total, linhas com Member + colunas da conta).
+    """
+    now = datetime.utcnow()
+    current = aliased(MemberTab)
+    debts = (
+        select(
+            MemberTab.member_id,
+            func.sum(MemberTab.total_consumed - MemberTab.total_paid).label("outstanding"),
+        )
+        .where(MemberTab.total_consumed > MemberTab.total_paid)
+        .group_by(MemberTab.member_id)
+        .subquery()
+    )
+    outstanding = func.coalesce(debts.c.outstanding, 0).label("outstanding")
+    current_consumed = func.coalesce(current.total_consumed, 0).label("current_consumed")
+
+    query = (
+        select(
+            Member,
+            current.id.label("current_tab_id"),
+            current_consumed,
+            func.coalesce(current.total_paid, 0).label("current_paid"),
+            current.status.label("current_status"),
+            outstanding,
+            func.count().over().label("total"),
+        )
+        .outerjoin(current, and_(
+            current.member_id == Member.id,
+            current.year == now.year,
+            current.month == now.month,
+        ))
+        .outerjoin(debts, debts.c.member_id == Member.id)
+    )
+    if is_active is not None:
+        query = query.where(Member.is_active == is_active)
+
+    order_by = {
+        "name": (Member.name,),
+        "balance": (outstanding.desc(), Member.name),
+        "current": (current_consumed.desc(), Member.name),
+    }[sort]
+    # id no fim: ordem estável entre páginas quando há nomes iguais
+    result = await db.execute(query.order_by(*order_by, Member.id).limit(limit).offset(offset))
+    rows = result.all()
+
+    if rows:
+        return rows[0].total, rows
+    if offset == 0:
+        return 0, rows
+    # Página além do fim: o total vem de uma contagem à parte
+    count = select(func.count()).select_from(Member)
+    if is_active is not None:
+        count = count.where(Member.is_active == is_active)
+    return (await db.execute(count)).scalar_one(), rows
+
+
+async def search(db: AsyncSession, term: str, limit: int = 20, offset: int = 0) -> list[Member]:
+    """
+    Membros com nome ou e-mail parecido com `term`, do mais parecido para o menos
+    (pg_trgm); fallback sem pg_trgm: ILIKE em ordem alfabética.
+    """
+    trigram = await supports_trigram(db)
+    query = (
+        select(Member)
+        .where(matches(Member.name, term, trigram) | matches(Member.email, term, trigram))
+        .limit(limit)
+        .offset(offset)
+    )
+    if trigram:
+        score = func.greatest(similarity(Member.name, term), similarity(Member.email, term))
+        query = query.order_by(score.desc(), Member.name)
+    else:
+        query = query.order_by(Member.name)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
 async def get_by_id(db: AsyncSession, member_id: str) -> Optional[Member]:
     result = await db.execute(select(Member).where(Member.id == member_id))
     return result.scalar_one_or_none()
 
 
+async def get_name(db: AsyncSession, member_id: str) -> Optional[str]:
+    """Só a coluna name (sem carregar o membro)."""
+    result = await db.execute(select(Member.name).where(Member.id == member_id))
+    return result.scalar_one_or_none()
+
+
 async def get_by_email(db: AsyncSession, email: str) -> Optional[Member]:
     result = await db.execute(select(Member).where(Member.email == email))
     return result.scalar_one_or_none()
@@ -29,7 +131,7 @@ async def create(db: AsyncSession, data: MemberCreate) -> Member:
     member = Member(
         name=data.name,
         email=data.email,
-        hashed_password=get_password_hash(data.password),
+        hashed_password=await password_executor.hash(data.password),
         phone=data.phone,
     )
     db.add(member)
@@ -38,12 +140,37 @@ async def create(db: AsyncSession, data: MemberCreate) -> Member:
     return member
 
 
+async def get_existing_emails(db: AsyncSession, emails: list[str]) -> set[str]:
+    """Quais destes e-mails já estão cadastrados (uma consulta IN)."""
+    if not emails:
+        return set()
+    result = await db.execute(select(Member.email).where(Member.email.in_(emails)))
+    return set(result.scalars().all())
+
+
+async def create_many(db: AsyncSession, values: list[dict]) -> dict[str, str]:
+    """
+    Insere vários membros (senhas já com hash) num único INSERT ... ON CONFLICT (email)
+    DO NOTHING RETURNING. Retorna {email: id} só dos que foram criados.
+    """
+    stmt = (
+        pg_insert(Member)
+        .values(values)
+        .on_conflict_do_nothing(index_elements=[Member.email])
+        .returning(Member.email, Member.id)
+    )
+    result = await db.execute(stmt)
+    created = {email: member_id for email, member_id in result.all()}
+    await db.commit()
+    return created
+
+
 async def update_member(
     db: AsyncSession, member_id: str, data: MemberUpdate
 ) -> Optional[Member]:
     values = data.model_dump(exclude_unset=True)
     if "password" in values:
-        values["hashed_password"] = get_password_hash(values.pop("password"))
+        values["hashed_password"] = await password_executor.hash(values.pop("password"))
     if values:
         await db.execute(update(Member).where(Member.id == member_id).values(**values))
         await db.commit()
@@ -62,44 +189,48 @@ async def delete(db: AsyncSession, member_id: str) -> bool:
 
 # ─── MemberTab ────────────────────────────────────────────────────────────────
 
-async def get_or_create_current_tab(db: AsyncSession, member_id: str) -> MemberTab:
-    """Retorna a aba do mês atual, criando se não existir."""
-    now = datetime.utcnow()
-    result = await db.execute(
-        select(MemberTab).where(
-            MemberTab.member_id == member_id,
-            MemberTab.month == now.month,
-            MemberTab.year == now.year,
-        )
+def _tab_status(consumed, paid):
+    """Status da conta a partir dos totais (expressão SQL, usada nos UPDATEs)."""
+    return case(
+        (paid >= consumed, "paga"),
+        (paid > 0, "parcial"),
+        else_="aberta",
     )
-    tab = result.scalar_one_or_none()
-    if not tab:
-        tab = MemberTab(
-            member_id=member_id,
-            month=now.month,
-            year=now.year,
-            total_consumed=0,
-            total_paid=0,
-            status="aberta",
-        )
-        db.add(tab)
-        await db.commit()
-        await db.refresh(tab)
-    return tab
 
 
-async def add_to_tab(db: AsyncSession, member_id: str, amount: float) -> MemberTab:
-    """Adiciona um valor ao total consumido da conta do mês."""
-    tab = await get_or_create_current_tab(db, member_id)
-    new_total = float(tab.total_consumed) + amount
-    await db.execute(
-        update(MemberTab)
-        .where(MemberTab.id == tab.id)
-        .values(total_consumed=new_total)
+async def add_to_tab(db: AsyncSession, member_id: str, amount: float) -> str:
+    """
+    Lança um valor na conta do mês com um único UPSERT
+    (INSERT ... ON CONFLICT (member_id, year, month) DO UPDATE SET total_consumed = total_consumed + :amount).
+    Não faz commit: roda na mesma transação do pedido. Retorna o id da conta;
+    o lançamento no extrato vem depois, com o pedido já criado (record_charge).
+    """
+    now = datetime.utcnow()
+    stmt = pg_insert(MemberTab).values(
+        id=str(uuid.uuid4()),
+        member_id=member_id,
+        month=now.month,
+        year=now.year,
+        total_consumed=amount,
+        total_paid=0,
+        status="aberta",
     )
-    await db.commit()
-    await db.refresh(tab)
-    return tab
+    new_total = MemberTab.total_consumed + stmt.excluded.total_consumed
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MemberTab.member_id, MemberTab.year, MemberTab.month],
+        set_={
+            "total_consumed": new_total,
+            # Conta já quitada que recebe novo consumo volta a ter saldo devedor
+            "status": case(
+                (MemberTab.total_paid >= new_total, MemberTab.status),
+                (MemberTab.total_paid > 0, "parcial"),
+                else_="aberta",
+            ),
+            "closed_at": case((MemberTab.total_paid >= new_total, MemberTab.closed_at), else_=null()),
+        },
+    ).returning(MemberTab.id)
+    result = await db.execute(stmt)
+    return result.scalar_one()
 
 
 async def get_tab_by_id(db: AsyncSession, tab_id: str) -> Optional[MemberTab]:
@@ -128,43 +259,133 @@ async def get_current_tab(db: AsyncSession, member_id: str) -> Optional[MemberTa
     return result.scalar_one_or_none()
 
 
-async def register_payment(
-    db: AsyncSession, tab_id: str, data: MemberTabPayment
-) -> Optional[MemberTab]:
-    """Registra um pagamento na conta. Admin confirma manualmente."""
-    tab = await get_tab_by_id(db, tab_id)
-    if not tab:
-        return None
+async def close_month(db: AsyncSession, year: int, month: int) -> list:
+    """
+    Fecha todas as contas do mês num único UPDATE ... FROM members ... RETURNING:
+    marca billed_at (quem já foi fechada mantém a data — rodar de novo é seguro) e
+    devolve, na mesma ida ao banco, o saldo devedor de cada conta com o contato do membro.
+
+    Fechar é só isso: status e closed_at continuam descrevendo o pagamento
+    (aberta/parcial/paga e a data da quitação) e mudam quando a cobrança for paga.
+    """
+    # Tabelas (Core): o UPDATE do ORM descarta do RETURNING as colunas de members
+    tabs, members = MemberTab.__table__, Member.__table__
+    result = await db.execute(
+        update(tabs)
+        .where(tabs.c.member_id == members.c.id, tabs.c.year == year, tabs.c.month == month)
+        .values(billed_at=func.coalesce(tabs.c.billed_at, datetime.utcnow()))
+        .returning(
+            tabs.c.id,
+            tabs.c.member_id,
+            members.c.name,
+            members.c.email,
+            members.c.phone,
+            tabs.c.billed_at,
+            (tabs.c.total_consumed - tabs.c.total_paid).label("balance"),
+        )
+    )
+    rows = result.all()
+    await db.commit()
+    return sorted(rows, key=lambda r: r.name)
+
+
+async def get_orders_for_tab(db: AsyncSession, tab: MemberTab) -> list[Order]:
+    """Retorna os pedidos lançados numa conta (busca pelo índice de orders.tab_id)."""
+    result = await db.execute(
+        select(Order).where(Order.tab_id == tab.id).order_by(Order.created_at.desc())
+    )
+    return list(result.scalars().all())
+
+
+# ─── Extrato (TabEntry) ───────────────────────────────────────────────────────
 
-    new_paid = float(tab.total_paid) + data.amount
-    new_status = "paga" if new_paid >= float(tab.total_consumed) else "parcial"
-    update_values: dict = {
-        "total_paid": new_paid,
-        "status": new_status,
+def _entry_values(tab_id: str, kind: str, amount: float, **extra) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "tab_id": tab_id,
+        "kind": kind,
+        "amount": round(amount, 2),
+        "created_at": datetime.utcnow(),
+        **extra,
     }
-    if data.notes:
-        update_values["notes"] = data.notes
-    if new_status == "paga":
-        update_values["closed_at"] = datetime.utcnow()
 
-    await db.execute(
-        update(MemberTab).where(MemberTab.id == tab_id).values(**update_values)
+
+async def record_charge(db: AsyncSession, tab_id: str, order_id: str, amount: float) -> None:
+    """
+    Lança o consumo do pedido no extrato. O total da conta já foi somado por add_to_tab;
+    não faz commit: roda na mesma transação do pedido.
+    """
+    await db.execute(insert(TabEntry).values(**_entry_values(tab_id, "consumo", amount, order_id=order_id)))
+
+
+async def _apply_entry(
+    db: AsyncSession,
+    tab_id: str,
+    entry: dict,
+    consumed_delta: float = 0,
+    paid_delta: float = 0,
+    conditions: tuple = (),
+) -> Optional[MemberTab]:
+    """
+    Atualiza os totais da conta num único UPDATE ... RETURNING (sem ler-e-regravar,
+    então pagamentos simultâneos não se perdem) e grava o lançamento na mesma transação.
+    Retorna None se a conta não existe ou alguma condição extra falhou.
+    """
+    new_consumed = MemberTab.total_consumed + consumed_delta
+    new_paid = MemberTab.total_paid + paid_delta
+    result = await db.execute(
+        update(MemberTab)
+        .where(MemberTab.id == tab_id, *conditions)
+        .values(
+            total_consumed=new_consumed,
+            total_paid=new_paid,
+            status=_tab_status(new_consumed, new_paid),
+            # Data da quitação: gravada só na passagem para paga; apagada se a conta reabre
+            closed_at=case(
+                (new_paid < new_consumed, null()),
+                (MemberTab.closed_at.is_(None), datetime.utcnow()),
+                else_=MemberTab.closed_at,
+            ),
+        )
+        .returning(MemberTab)
+        .execution_options(synchronize_session=False, populate_existing=True)
     )
+    tab = result.scalar_one_or_none()
+    if tab is None:
+        return None
+    await db.execute(insert(TabEntry).values(**entry))
     await db.commit()
-    return await get_tab_by_id(db, tab_id)
+    return tab
+
+
+async def register_payment(
+    db: AsyncSession, tab_id: str, data: MemberTabPayment, created_by: Optional[str] = None
+) -> Optional[MemberTab]:
+    """Registra um pagamento na conta (admin confirma manualmente). A observação fica no lançamento."""
+    entry = _entry_values(tab_id, "pagamento", -data.amount, notes=data.notes, created_by=created_by)
+    return await _apply_entry(db, tab_id, entry, paid_delta=data.amount)
+
+
+async def adjust_tab(
+    db: AsyncSession, tab_id: str, data: MemberTabAdjustment, created_by: Optional[str] = None
+) -> Optional[MemberTab]:
+    """
+    Ajuste manual do consumo (cobrança extra ou desconto).
+    Recusado (None) se deixaria o consumo da conta negativo.
+    """
+    entry = _entry_values(tab_id, "ajuste", data.amount, notes=data.notes, created_by=created_by)
+    return await _apply_entry(
+        db, tab_id, entry,
+        consumed_delta=data.amount,
+        conditions=(MemberTab.total_consumed + data.amount >= 0,),
+    )
 
 
-async def get_orders_for_tab(db: AsyncSession, member_id: str, month: int, year: int) -> list[Order]:
-    """Retorna os pedidos na conta de um membro em determinado mês."""
-    from sqlalchemy import and_, extract
+async def get_entries(db: AsyncSession, tab_id: str) -> list[TabEntry]:
+    """Lançamentos da conta em ordem cronológica (índice tab_id, created_at)."""
     result = await db.execute(
-        select(Order).where(
-            and_(
-                Order.member_id == member_id,
-                Order.payment_method == "conta",
-                extract("month", Order.created_at) == month,
-                extract("year", Order.created_at) == year,
-            )
-        ).order_by(Order.created_at.desc())
+        select(TabEntry)
+        .where(TabEntry.tab_id == tab_id)
+        .order_by(TabEntry.created_at, TabEntry.id)
     )
     return list(result.scalars().all())
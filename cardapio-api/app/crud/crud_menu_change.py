@@ -0,0 +1,7 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.menu_change import MenuChange
+
+
+def record(db: AsyncSession, entity: str, entity_id: str, deleted: bool = False) -> None:
+    """Registra a alteração na mesma transação da escrita (entra no commit do chamador)."""
+    db.add(MenuChange(entity=entity, entity_id=entity_id, deleted=deleted))
@@ -1,13 +1,25 @@
 import uuid
-import uuid
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select, update, insert, func, bindparam, literal, tuple_
 from sqlalchemy.orm import selectinload
 from app.models.order import Order, OrderItem
 from app.models.item import Item
-from app.schemas.order import OrderCreate, ORDER_STATUSES
-from typing import Optional
+from app.models.member import Member
+from app.db.search import matches, similarity, supports_trigram
+from app.schemas.order import (
+    OrderCreate, OrderResponse, OrderItemResponse, TvOrder, ORDER_STATUSES, INACTIVE_STATUSES, allowed_sources,
+)
+from typing import AsyncIterator, Optional
+
+# Filtros de status com os valores escritos no SQL (literal_execute), não como parâmetros:
+# os índices parciais ix_orders_active_created_at / ix_orders_ready_created_at só servem
+# se o planner provar que o WHERE bate com o predicado do índice, o que um plano genérico
+# de prepared statement ($1, $2) não permite.
+ACTIVE_FILTER = Order.status.not_in(
+    bindparam("inactive_statuses", list(INACTIVE_STATUSES), expanding=True, literal_execute=True)
+)
+READY_FILTER = Order.status == literal("pronto", literal_execute=True)
 
 
 async def get_by_id(db: AsyncSession, order_id: str) -> Optional[Order]:
@@ -19,6 +31,27 @@ async def get_by_id(db: AsyncSession, order_id: str) -> Optional[Order]:
     return result.scalar_one_or_none()
 
 
+async def get_pix_payload(db: AsyncSession, order_id: str) -> Optional[str]:
+    """Só a coluna pix_payload (sem carregar itens). None se o pedido não existir."""
+    result = await db.execute(select(Order.pix_payload).where(Order.id == order_id))
+    return result.scalar_one_or_none()
+
+
+async def get_version(db: AsyncSession, order_id: str) -> Optional[datetime]:
+    """Só o updated_at do pedido (base do ETag). None se o pedido não existir."""
+    result = await db.execute(select(Order.updated_at).where(Order.id == order_id))
+    return result.scalar_one_or_none()
+
+
+async def get_session_version(db: AsyncSession, session_id: str) -> tuple[Optional[datetime], int]:
+    """Maior updated_at e quantidade de pedidos da sessão (base do ETag da lista)."""
+    result = await db.execute(
+        select(func.max(Order.updated_at), func.count(Order.id)).where(Order.session_id == session_id)
+    )
+    last_update, count = result.one()
+    return last_update, count
+
+
 async def get_by_session(db: AsyncSession, session_id: str) -> list[Order]:
     result = await db.execute(
         select(Order)
@@ -32,7 +65,7 @@ async def get_active_orders(db: AsyncSession) -> list[Order]:
     """Retorna todos os pedidos que ainda não foram entregues para o painel do restaurante."""
     result = await db.execute(
         select(Order)
-        .where(Order.status.notin_(["entregue", "cancelado"]))
+        .where(ACTIVE_FILTER)
         .options(
             selectinload(Order.items).selectinload(OrderItem.item),
             selectinload(Order.member),
@@ -42,18 +75,57 @@ async def get_active_orders(db: AsyncSession) -> list[Order]:
     return list(result.scalars().all())
 
 
-async def get_ready_orders(db: AsyncSession) -> list[Order]:
-    """Retorna apenas os pedidos com status 'pronto' para exibição na TV."""
+# Janela de sobreposição do cursor: updated_at é gerado antes do commit, então uma
+# transação mais lenta pode ficar visível com updated_at um pouco anterior ao cursor.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+async def get_sync_cursor(db: AsyncSession) -> Optional[datetime]:
+    """Maior updated_at entre todos os pedidos — cursor da sincronização incremental do painel."""
+    result = await db.execute(select(func.max(Order.updated_at)))
+    return result.scalar_one_or_none()
+
+
+async def get_active_changes(db: AsyncSession, since: datetime) -> tuple[list[Order], list[str]]:
+    """
+    Pedidos alterados desde `since` (menos SYNC_OVERLAP):
+    os que continuam ativos, completos, e só os ids dos que saíram do painel.
+    """
+    changed_since = since - SYNC_OVERLAP
     result = await db.execute(
         select(Order)
-        .where(Order.status == "pronto")
+        .where(Order.updated_at >= changed_since, ACTIVE_FILTER)
         .options(
             selectinload(Order.items).selectinload(OrderItem.item),
             selectinload(Order.member),
         )
         .order_by(Order.created_at.asc())
     )
-    return list(result.scalars().all())
+    orders = list(result.scalars().all())
+
+    result = await db.execute(
+        select(Order.id)
+        .where(Order.updated_at >= changed_since, Order.status.in_(INACTIVE_STATUSES))
+    )
+    removed = list(result.scalars().all())
+    return orders, removed
+
+
+async def get_ready_tv(db: AsyncSession) -> list[TvOrder]:
+    """Pedidos 'pronto' para as TVs, só com as colunas exibidas (sem itens nem pix_payload)."""
+    result = await db.execute(
+        select(
+            Order.id,
+            Order.table_number,
+            func.coalesce(Member.name, Order.customer_name).label("customer_name"),
+            Order.member_id.is_not(None).label("is_member"),
+            Order.updated_at.label("ready_at"),
+        )
+        .outerjoin(Member, Member.id == Order.member_id)
+        .where(READY_FILTER)
+        .order_by(Order.created_at.asc())
+    )
+    return [TvOrder(**row._mapping) for row in result.all()]
 
 
 async def create(
@@ -62,7 +134,14 @@ async def create(
     items_db: list[Item],
     pix_payload: Optional[str],
     unit_price_fn=None,  # callable(item_id: str) -> float — se None usa item.price
-) -> Order:
+    commit: bool = True,  # False = o chamador completa a transação (ex.: lançamento na conta)
+    tab_id: Optional[str] = None,  # conta do membro (retorno de crud_member.add_to_tab)
+) -> OrderResponse:
+    """
+    Insere o pedido e todos os seus itens num único statement
+    (WITH novo_pedido AS (INSERT INTO orders ...) INSERT INTO order_items VALUES (...), (...))
+    e monta a resposta com os dados já em memória — sem recarregar do banco.
+    """
     items_map = {item.id: item for item in items_db}
 
     def _price(item_id: str) -> float:
@@ -75,82 +154,259 @@ async def create(
     # Pedidos na conta começam direto em "conta" (sem etapa de pagamento pix)
     initial_status = "conta" if data.payment_method == "conta" else "aguardando_pagamento"
 
-    order = Order(
-        id=str(uuid.uuid4()),
-        session_id=data.session_id,
-        member_id=data.member_id,
-        payment_method=data.payment_method,
-        table_number=data.table_number,
-        customer_name=data.customer_name,
-        observations=data.observations,
-        status=initial_status,
-        total=total,
-        pix_payload=pix_payload,
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+    now = datetime.utcnow()
+    order_values = {
+        "id": str(uuid.uuid4()),
+        "session_id": data.session_id,
+        "member_id": data.member_id,
+        "tab_id": tab_id,
+        "payment_method": data.payment_method,
+        "table_number": data.table_number,
+        "customer_name": data.customer_name,
+        "observations": data.observations,
+        "status": initial_status,
+        "total": total,
+        "pix_payload": pix_payload,
+        "created_at": now,
+        "updated_at": now,
+    }
+    order_items = [
+        {
+            "id": str(uuid.uuid4()),
+            "order_id": order_values["id"],
+            "item_id": oi.item_id,
+            "quantity": oi.quantity,
+            "unit_price": _price(oi.item_id),
+        }
+        for oi in data.items
+    ]
+
+    order_insert = insert(Order).values(**order_values)
+    if order_items:
+        new_order = order_insert.returning(Order.id).cte("novo_pedido")
+        await db.execute(insert(OrderItem).values(order_items).add_cte(new_order))
+    else:
+        await db.execute(order_insert)
+    if commit:
+        await db.commit()
+
+    return OrderResponse(
+        **order_values,
+        items=[
+            OrderItemResponse(
+                id=oi["id"],
+                item_id=oi["item_id"],
+                quantity=oi["quantity"],
+                unit_price=oi["unit_price"],
+                item_name=items_map[oi["item_id"]].name,
+            )
+            for oi in order_items
+        ],
     )
-    db.add(order)
-    await db.flush()
-
-    for oi in data.items:
-        order_item = OrderItem(
-            id=str(uuid.uuid4()),
-            order_id=order.id,
-            item_id=oi.item_id,
-            quantity=oi.quantity,
-            unit_price=_price(oi.item_id),
-        )
-        db.add(order_item)
 
-    await db.commit()
-    return await get_by_id(db, order.id)
+
+def _response_from_rows(rows) -> Optional[OrderResponse]:
+    """Monta o OrderResponse a partir de linhas pedido ⟕ itens (uma linha por item)."""
+    if not rows:
+        return None
+    first = rows[0]._mapping
+    return OrderResponse(
+        **{c.key: first[c.key] for c in Order.__table__.columns},
+        member_name=first["member_name"],
+        items=[
+            OrderItemResponse(
+                id=row.order_item_id,
+                item_id=row.item_id,
+                quantity=row.quantity,
+                unit_price=row.unit_price,
+                item_name=row.item_name,
+            )
+            for row in rows
+            if row.order_item_id is not None
+        ],
+    )
+
+
+async def get_status(db: AsyncSession, order_id: str) -> Optional[str]:
+    """Só a coluna status. None se o pedido não existir."""
+    result = await db.execute(select(Order.status).where(Order.id == order_id))
+    return result.scalar_one_or_none()
 
 
 async def update_status(
-    db: AsyncSession, order_id: str, new_status: str
-) -> Optional[Order]:
+    db: AsyncSession, order_id: str, new_status: str, commit: bool = True
+) -> Optional[OrderResponse]:
+    """
+    Transição atômica de status conforme ORDER_TRANSITIONS, num único statement:
+    UPDATE ... WHERE id = :id AND status IN (:origens_permitidas) RETURNING ...,
+    já juntando itens e nome do membro para a resposta.
+    Retorna None se o pedido não existe ou se o status atual não permite a transição
+    (ex.: dois atendentes clicando ao mesmo tempo) — use get_status para diferenciar.
+    """
     if new_status not in ORDER_STATUSES:
         return None
-    await db.execute(
+    sources = allowed_sources(new_status)
+    if not sources:
+        return None
+
+    updated = (
         update(Order)
-        .where(Order.id == order_id)
+        .where(Order.id == order_id, Order.status.in_(sources))
         .values(status=new_status, updated_at=datetime.utcnow())
+        .returning(*Order.__table__.columns)
+        .cte("pedido_atualizado")
     )
-    await db.commit()
-    return await get_by_id(db, order_id)
+    result = await db.execute(
+        select(
+            updated,
+            OrderItem.id.label("order_item_id"),
+            OrderItem.item_id,
+            OrderItem.quantity,
+            OrderItem.unit_price,
+            Item.name.label("item_name"),
+            Member.name.label("member_name"),
+        )
+        .select_from(updated)
+        .outerjoin(OrderItem, OrderItem.order_id == updated.c.id)
+        .outerjoin(Item, Item.id == OrderItem.item_id)
+        .outerjoin(Member, Member.id == updated.c.member_id)
+    )
+    order = _response_from_rows(result.all())
+    if commit:
+        await db.commit()
+    return order
 
 
-async def get_history(
-    db: AsyncSession,
-    start_date: Optional[date] = None,
-    end_date: Optional[date] = None,
-    customer_name: Optional[str] = None,
-) -> list[Order]:
+async def search_by_customer(db: AsyncSession, term: str, limit: int = 20, offset: int = 0) -> list[Order]:
+    """
+    Pedidos cujo nome do cliente se parece com `term`, do mais parecido para o menos
+    (pg_trgm); empate e fallback sem pg_trgm: mais recentes primeiro.
+    """
+    trigram = await supports_trigram(db)
+    query = (
+        select(Order)
+        .where(matches(Order.customer_name, term, trigram))
+        .options(selectinload(Order.member))
+        .limit(limit)
+        .offset(offset)
+    )
+    if trigram:
+        query = query.order_by(similarity(Order.customer_name, term).desc(), Order.created_at.desc())
+    else:
+        query = query.order_by(Order.created_at.desc())
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+def _history_query(
+    start_date: Optional[date],
+    end_date: Optional[date],
+    customer_name: Optional[str],
+    after: Optional[tuple[datetime, str]],
+):
+    """Filtros do histórico, do mais recente para o mais antigo, com desempate por id."""
     query = (
         select(Order)
         .options(
             selectinload(Order.items).selectinload(OrderItem.item),
             selectinload(Order.member),
         )
-        .order_by(Order.created_at.desc())
+        .order_by(Order.created_at.desc(), Order.id.desc())
     )
 
     if start_date:
         # Converte date -> datetime (00:00:00) naive
         start_dt = datetime.combine(start_date, datetime.min.time())
         query = query.where(Order.created_at >= start_dt)
-        
+
     if end_date:
         # Converte date -> datetime (23:59:59.999999) naive
         end_dt = datetime.combine(end_date, datetime.max.time())
         query = query.where(Order.created_at <= end_dt)
-    
+
     if customer_name:
-        query = query.where(Order.customer_name.ilike(f"%{customer_name}%"))
+        query = query.where(matches(Order.customer_name, customer_name, trigram=False))
+
+    if after:
+        # Keyset: continua depois do último (created_at, id) visto.
+        # O `<=` sozinho usa o índice de created_at; a comparação de tupla desempata.
+        after_created_at, after_id = after
+        query = query.where(
+            Order.created_at <= after_created_at,
+            tuple_(Order.created_at, Order.id) < tuple_(after_created_at, after_id),
+        )
+    return query
 
-    # Opcional: Filtrar apenas pedidos concluídos
-    
+
+async def get_history(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    customer_name: Optional[str] = None,
+    limit: int = 100,
+    after: Optional[tuple[datetime, str]] = None,
+) -> list[Order]:
+    """Uma página do histórico (no máximo `limit` pedidos) a partir do cursor `after`."""
+    query = _history_query(start_date, end_date, customer_name, after).limit(limit)
     result = await db.execute(query)
-    orders = list(result.scalars().all())
-    
-    return orders
+    return list(result.scalars().all())
+
+
+async def stream_history(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    customer_name: Optional[str] = None,
+    after: Optional[tuple[datetime, str]] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[Order]:
+    """
+    Histórico completo do período via cursor do servidor (stream_scalars + yield_per):
+    só um lote de pedidos fica em memória por vez, qualquer que seja o intervalo.
+    """
+    query = _history_query(start_date, end_date, customer_name, after).execution_options(yield_per=batch_size)
+    result = await db.stream_scalars(query)
+    async for order in result:
+        yield order
+
+
+async def stream_export_batches(
+    db: AsyncSession,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[list]:
+    """
+    Uma linha por item de pedido (pedido sem itens = uma linha com item vazio), já com
+    nome do item e do membro, em lotes de `batch_size` lidos do cursor do servidor.
+    Período semiaberto: [start_date 00:00, end_date + 1 dia 00:00).
+    """
+    query = (
+        select(
+            Order.id,
+            Order.created_at,
+            Order.table_number,
+            Order.customer_name,
+            Member.name.label("member_name"),
+            Order.payment_method,
+            Order.status,
+            Order.total,
+            Item.name.label("item_name"),
+            OrderItem.quantity,
+            OrderItem.unit_price,
+        )
+        .select_from(Order)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .outerjoin(Item, Item.id == OrderItem.item_id)
+        .outerjoin(Member, Member.id == Order.member_id)
+        .order_by(Order.created_at, Order.id)
+        .execution_options(yield_per=batch_size)
+    )
+    if start_date:
+        query = query.where(Order.created_at >= datetime.combine(start_date, datetime.min.time()))
+    if end_date:
+        query = query.where(Order.created_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time()))
+
+    result = await db.stream(query)
+    async for batch in result.partitions():
+        yield batch
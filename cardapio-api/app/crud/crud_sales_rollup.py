@@ -0,0 +1,276 @@
+"""
+Vendas pré-agregadas (sales_item_rollups / sales_order_rollups).
+
+Os baldes são (dia, hora) no fuso local (settings.TIMEZONE) de quando o pedido foi
+feito. Cada evento soma num conjunto de colunas: placed_* na criação, delivered_* e
+cancelled_* quando o pedido chega a entregue / cancelado — como esses status são
+finais na máquina de estados, cada pedido conta no máximo uma vez em cada conjunto.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.item import Item
+from app.models.order import Order
+from app.models.sales_rollup import SalesItemRollup, SalesOrderRollup
+from app.schemas.order import OrderResponse
+
+# Status final -> conjunto de colunas do rollup
+EVENT_BY_STATUS = {"entregue": "delivered", "cancelado": "cancelled"}
+
+REPORT_GROUPS = ("day", "hour", "payment_method", "item")
+
+
+@lru_cache(maxsize=1)
+def _local_tz() -> ZoneInfo:
+    return ZoneInfo(settings.TIMEZONE)
+
+
+def local_bucket(created_at: datetime) -> tuple[date, int]:
+    """created_at (UTC sem fuso, como gravado) -> (dia, hora) no fuso local."""
+    local = created_at.replace(tzinfo=timezone.utc).astimezone(_local_tz())
+    return local.date(), local.hour
+
+
+def _upsert(model, rows: list[dict], keys: list[str], measures: list[str]):
+    """INSERT ... ON CONFLICT (chave) DO UPDATE somando as medidas do evento."""
+    # Insert de várias linhas não aplica os defaults do modelo: zera as outras medidas aqui
+    zeros = {c.key: 0 for c in model.__table__.columns if c.key not in keys}
+    stmt = pg_insert(model).values([{**zeros, **row} for row in rows])
+    return stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={m: getattr(model, m) + stmt.excluded[m] for m in measures},
+    )
+
+
+async def _lock_day(db: AsyncSession, day: date, shared: bool) -> None:
+    """
+    Lock de aplicação do dia local, solto no fim da transação. Os eventos pegam o
+    compartilhado (não esperam uns pelos outros) e o recálculo do dia, o exclusivo:
+    só quem grava nesse mesmo dia espera por ele.
+    """
+    fn = "pg_advisory_xact_lock_shared" if shared else "pg_advisory_xact_lock"
+    await db.execute(text(f"SELECT {fn}(hashtext(:key))"), {"key": f"sales_rollups:{day.isoformat()}"})
+
+
+async def record(db: AsyncSession, order: OrderResponse, event: str) -> None:
+    """
+    Soma o pedido nos rollups (event = placed | delivered | cancelled).
+    Não faz commit: roda na mesma transação que cria ou finaliza o pedido.
+
+    Todos os pedidos do mesmo (dia, hora, forma de pagamento) atualizam a mesma linha
+    de sales_order_rollups e seguram o lock dela até o commit — chame como último
+    comando antes do commit para que essa espera seja a menor possível.
+    """
+    day, hour = local_bucket(order.created_at)
+    await _lock_day(db, day, shared=True)
+    bucket = {"day": day, "hour": hour, "payment_method": order.payment_method}
+
+    # Mesmo item repetido no pedido vira uma linha só (o ON CONFLICT não aceita a mesma chave duas vezes)
+    per_item: dict[str, list] = defaultdict(lambda: [0, 0.0])
+    for oi in order.items:
+        per_item[oi.item_id][0] += oi.quantity
+        per_item[oi.item_id][1] += oi.quantity * float(oi.unit_price)
+
+    if per_item:
+        # Linhas em ordem de item_id: pedidos simultâneos no mesmo balde travam as linhas
+        # na mesma ordem (carrinhos [A, B] e [B, A] não entram em deadlock)
+        await db.execute(_upsert(
+            SalesItemRollup,
+            [
+                {
+                    **bucket,
+                    "item_id": item_id,
+                    f"{event}_quantity": quantity,
+                    f"{event}_revenue": round(revenue, 2),
+                }
+                for item_id, (quantity, revenue) in sorted(per_item.items())
+            ],
+            keys=["day", "hour", "item_id", "payment_method"],
+            measures=[f"{event}_quantity", f"{event}_revenue"],
+        ))
+
+    await db.execute(_upsert(
+        SalesOrderRollup,
+        [{**bucket, f"{event}_orders": 1, f"{event}_revenue": float(order.total)}],
+        keys=["day", "hour", "payment_method"],
+        measures=[f"{event}_orders", f"{event}_revenue"],
+    ))
+
+
+async def record_status_change(db: AsyncSession, order: OrderResponse) -> None:
+    """Chamado após uma mudança de status: só entregue/cancelado alteram os rollups."""
+    event = EVENT_BY_STATUS.get(order.status)
+    if event:
+        await record(db, order, event)
+
+
+# ─── Relatório ───────────────────────────────────────────────────────────────
+
+def _net(placed, cancelled) -> float:
+    return float(placed or 0) - float(cancelled or 0)
+
+
+def _bucket(key: str, placed_o, placed_r, cancelled_o, cancelled_r, quantity) -> dict:
+    orders = int(_net(placed_o, cancelled_o))
+    revenue = round(_net(placed_r, cancelled_r), 2)
+    return {
+        "key": key,
+        "orders": orders,
+        "quantity": int(quantity),
+        "revenue": revenue,
+        "average_ticket": round(revenue / orders, 2) if orders else None,
+        "cancelled_orders": int(cancelled_o or 0),
+        "cancelled_revenue": round(float(cancelled_r or 0), 2),
+    }
+
+
+async def get_report(db: AsyncSession, start: date, end: date, group_by: str) -> tuple[dict, list[dict]]:
+    """
+    Totais e baldes do período [start, end] (dias locais), líquidos de cancelamentos.
+    Agrupando por item não há contagem de pedidos (nem ticket médio).
+    """
+    o, i = SalesOrderRollup, SalesItemRollup
+    in_period_o = (o.day >= start, o.day <= end)
+    in_period_i = (i.day >= start, i.day <= end)
+
+    order_sums = (
+        func.sum(o.placed_orders), func.sum(o.placed_revenue),
+        func.sum(o.cancelled_orders), func.sum(o.cancelled_revenue),
+    )
+    item_sums = (
+        func.sum(i.placed_quantity), func.sum(i.cancelled_quantity),
+        func.sum(i.placed_revenue), func.sum(i.cancelled_revenue),
+    )
+
+    placed_o, placed_r, cancelled_o, cancelled_r = (await db.execute(select(*order_sums).where(*in_period_o))).one()
+    placed_q, cancelled_q, _, _ = (await db.execute(select(*item_sums).where(*in_period_i))).one()
+    totals = _bucket("total", placed_o, placed_r, cancelled_o, cancelled_r, _net(placed_q, cancelled_q))
+
+    if group_by == "item":
+        result = await db.execute(
+            select(i.item_id, func.max(Item.name), *item_sums)
+            .outerjoin(Item, Item.id == i.item_id)
+            .where(*in_period_i)
+            .group_by(i.item_id)
+        )
+        buckets = [
+            {
+                "key": name or item_id,
+                "orders": None,
+                "quantity": int(_net(pq, cq)),
+                "revenue": round(_net(pr, cr), 2),
+                "average_ticket": None,
+                "cancelled_orders": None,
+                "cancelled_revenue": round(float(cr or 0), 2),
+            }
+            for item_id, name, pq, cq, pr, cr in result.all()
+        ]
+        buckets.sort(key=lambda b: b["revenue"], reverse=True)
+        return totals, buckets
+
+    dim_o, dim_i = getattr(o, group_by), getattr(i, group_by)
+    orders_by_key = {
+        row[0]: row[1:]
+        for row in (await db.execute(select(dim_o, *order_sums).where(*in_period_o).group_by(dim_o))).all()
+    }
+    quantity_by_key = {
+        row[0]: _net(row[1], row[2])
+        for row in (await db.execute(select(dim_i, *item_sums[:2]).where(*in_period_i).group_by(dim_i))).all()
+    }
+    buckets = [
+        _bucket(str(key), *orders_by_key[key], quantity_by_key.get(key, 0))
+        for key in sorted(orders_by_key)
+    ]
+    return totals, buckets
+
+
+# ─── Recalcular a partir dos pedidos ─────────────────────────────────────────
+
+_BACKFILL_ITEMS = """
+    INSERT INTO sales_item_rollups (day, hour, item_id, payment_method,
+        placed_quantity, placed_revenue, delivered_quantity, delivered_revenue,
+        cancelled_quantity, cancelled_revenue)
+    SELECT (o.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz)::date,
+           extract(hour FROM o.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz)::smallint,
+           oi.item_id, o.payment_method,
+           sum(oi.quantity), sum(oi.quantity * oi.unit_price),
+           coalesce(sum(oi.quantity) FILTER (WHERE o.status = 'entregue'), 0),
+           coalesce(sum(oi.quantity * oi.unit_price) FILTER (WHERE o.status = 'entregue'), 0),
+           coalesce(sum(oi.quantity) FILTER (WHERE o.status = 'cancelado'), 0),
+           coalesce(sum(oi.quantity * oi.unit_price) FILTER (WHERE o.status = 'cancelado'), 0)
+    FROM orders o JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.created_at >= :start AND o.created_at < :end
+    GROUP BY 1, 2, 3, 4
+"""
+
+_BACKFILL_ORDERS = """
+    INSERT INTO sales_order_rollups (day, hour, payment_method,
+        placed_orders, placed_revenue, delivered_orders, delivered_revenue,
+        cancelled_orders, cancelled_revenue)
+    SELECT (o.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz)::date,
+           extract(hour FROM o.created_at AT TIME ZONE 'UTC' AT TIME ZONE :tz)::smallint,
+           o.payment_method,
+           count(*), sum(o.total),
+           count(*) FILTER (WHERE o.status = 'entregue'),
+           coalesce(sum(o.total) FILTER (WHERE o.status = 'entregue'), 0),
+           count(*) FILTER (WHERE o.status = 'cancelado'),
+           coalesce(sum(o.total) FILTER (WHERE o.status = 'cancelado'), 0)
+    FROM orders o
+    WHERE o.created_at >= :start AND o.created_at < :end
+    GROUP BY 1, 2, 3
+"""
+
+
+def _utc_bounds(day: date) -> tuple[datetime, datetime]:
+    """Dia local -> [início, fim) em UTC sem fuso, como created_at é gravado."""
+    def utc(d: date) -> datetime:
+        local = datetime.combine(d, time.min, tzinfo=_local_tz())
+        return local.astimezone(timezone.utc).replace(tzinfo=None)
+    return utc(day), utc(day + timedelta(days=1))
+
+
+async def rebuild_day(db: AsyncSession, day: date) -> tuple[int, int]:
+    """
+    Recalcula os rollups de um dia local a partir de orders/order_items, numa transação.
+    O lock exclusivo do dia espera os eventos desse dia já em andamento e segura os
+    próximos até o fim, então nenhum evento se perde nem conta duas vezes. Pedidos de
+    outros dias (o de hoje, ao recalcular o histórico) não esperam; os do próprio dia
+    esperam uma varredura de um dia só (índice em created_at).
+    Retorna (linhas de item, linhas de pedido).
+    """
+    start, end = _utc_bounds(day)
+    await _lock_day(db, day, shared=False)
+    await db.execute(text("DELETE FROM sales_item_rollups WHERE day = :day"), {"day": day})
+    await db.execute(text("DELETE FROM sales_order_rollups WHERE day = :day"), {"day": day})
+    params = {"tz": settings.TIMEZONE, "start": start, "end": end}
+    items = await db.execute(text(_BACKFILL_ITEMS), params)
+    orders = await db.execute(text(_BACKFILL_ORDERS), params)
+    await db.commit()
+    return items.rowcount, orders.rowcount
+
+
+async def rebuild(db: AsyncSession, start: date | None = None, end: date | None = None) -> tuple[int, int]:
+    """
+    Recalcula os dias locais [start, end] (padrão: do primeiro ao último pedido),
+    um dia por transação. Retorna o total de (linhas de item, linhas de pedido).
+    """
+    if start is None or end is None:
+        first, last = (await db.execute(select(func.min(Order.created_at), func.max(Order.created_at)))).one()
+        if first is None:
+            return 0, 0
+        start = start or local_bucket(first)[0]
+        end = end or local_bucket(last)[0]
+
+    item_rows = order_rows = 0
+    day = start
+    while day <= end:
+        items, orders = await rebuild_day(db, day)
+        item_rows += items
+        order_rows += orders
+        day += timedelta(days=1)
+    return item_rows, order_rows
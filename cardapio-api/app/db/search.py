@@ -0,0 +1,40 @@
+"""
+Helpers de busca por nome/e-mail compartilhados pelos cruds.
+
+No Postgres a busca usa pg_trgm (índices GIN *_trgm, migração 008): o operador `%`
+e similarity() ranqueiam por semelhança e o ILIKE '%termo%' usa o mesmo índice.
+Sem a extensão (outros bancos, ou um Postgres sem contrib) cai para ILIKE simples.
+"""
+from sqlalchemy import func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# URL do banco -> pg_trgm instalada? (consultado uma vez por processo)
+_trigram_by_url: dict[str, bool] = {}
+
+
+async def supports_trigram(db: AsyncSession) -> bool:
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _trigram_by_url:
+        if bind.dialect.name != "postgresql":
+            _trigram_by_url[key] = False
+        else:
+            found = await db.scalar(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"))
+            _trigram_by_url[key] = found is not None
+    return _trigram_by_url[key]
+
+
+def like_pattern(term: str) -> str:
+    """'%termo%' com os curingas do próprio termo escapados (usar com escape='\\\\')."""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def matches(column, term: str, trigram: bool):
+    """Condição de busca: semelhante (pg_trgm) ou contendo o termo."""
+    contains = column.ilike(like_pattern(term), escape="\\")
+    return column.op("%")(term) | contains if trigram else contains
+
+
+def similarity(column, term: str):
+    return func.similarity(column, term)
@@ -1,17 +1,44 @@
+import asyncio
 import os
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
-from app.api.endpoints import menu, orders, restaurant, uploads, members
+from app.api.endpoints import menu, orders, restaurant, uploads, members, analytics
+from app.services.pix_service import qr_renderer
+from app.services.password_service import PasswordQueueFull, password_executor, password_hasher
+from app.services import idempotency_service, active_orders_board
 
 UPLOAD_DIR = "/app/uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Quadro de pedidos ativos: carregado antes de aceitar requisições
+    await active_orders_board.hydrate_on_startup()
+
+    # Tarefas de manutenção em segundo plano
+    background_tasks = [
+        asyncio.create_task(idempotency_service.purge_loop()),
+        asyncio.create_task(active_orders_board.reconcile_loop()),
+    ]
+    yield
+    for task in background_tasks:
+        task.cancel()
+    # Encerra os pools de processos (QR Code e hash de senhas) e as threads de bcrypt
+    qr_renderer.shutdown()
+    password_hasher.shutdown()
+    password_executor.shutdown()
+
+
 app = FastAPI(
     title="Cardápio Digital API",
     description="API do sistema de cardápio digital com pedidos e Pix",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # ─── CORS ─────────────────────────────────────────────────────────────────────
@@ -21,8 +48,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cabeçalhos de cache/sincronização lidos pelo frontend
+    expose_headers=["ETag", "X-Menu-Version", "X-Sync-Cursor", "X-Next-Cursor"],
 )
 
+# ─── Erros ────────────────────────────────────────────────────────────────────
+@app.exception_handler(PasswordQueueFull)
+async def password_queue_full(request: Request, exc: PasswordQueueFull):
+    # Rajada de logins: recusa na hora em vez de enfileirar sem limite
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Muitos acessos ao mesmo tempo. Tente novamente em instantes."},
+        headers={"Retry-After": "1"},
+    )
+
 # ─── Serve static uploads ─────────────────────────────────────────────────────
 app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 
@@ -32,6 +71,7 @@ app.include_router(orders.router, prefix="/api", tags=["Pedidos"])
 app.include_router(restaurant.router, prefix="/api", tags=["Restaurante"])
 app.include_router(uploads.router, prefix="/api", tags=["Uploads"])
 app.include_router(members.router, prefix="/api", tags=["Membros"])
+app.include_router(analytics.router, prefix="/api", tags=["Relatórios"])
 
 
 @app.get("/", tags=["Health"])
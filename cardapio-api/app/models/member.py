@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Boolean, DateTime, Numeric, Integer, ForeignKey, Text
+from sqlalchemy import String, Boolean, DateTime, Numeric, Integer, ForeignKey, Text, UniqueConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
@@ -8,6 +8,11 @@ from app.db.base import Base
 class Member(Base):
     """Membro da igreja — acessa preço de membro e pode lançar na conta."""
     __tablename__ = "members"
+    __table_args__ = (
+        # Busca por nome/e-mail (pg_trgm) — crud_member.search
+        Index("ix_members_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_members_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -32,6 +37,10 @@ class Member(Base):
 class MemberTab(Base):
     """Conta mensal do membro — acumula pedidos lançados na conta."""
     __tablename__ = "member_tabs"
+    __table_args__ = (
+        # Uma conta por membro por mês — alvo do UPSERT em crud_member.add_to_tab
+        UniqueConstraint("member_id", "year", "month", name="uq_member_tabs_member_year_month"),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
@@ -43,9 +52,42 @@ class MemberTab(Base):
     year: Mapped[int] = mapped_column(Integer, nullable=False)
     total_consumed: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False, default=0)
     total_paid: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False, default=0)
-    # status: aberta | paga | parcial
+    # status: aberta | paga | parcial — situação do pagamento, não do fechamento do mês
     status: Mapped[str] = mapped_column(String(20), nullable=False, default="aberta")
-    closed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    closed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)  # quitação
+    # Fechamento do mês (cobrança enviada) — crud_member.close_month
+    billed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     notes: Mapped[str | None] = mapped_column(Text, nullable=True)  # observação do admin
 
     member: Mapped["Member"] = relationship("Member", back_populates="tabs")
+
+
+class TabEntry(Base):
+    """
+    Lançamento no extrato da conta (só inserção, nunca alterado).
+    amount tem sinal: + aumenta o saldo devedor (consumo, ajuste de cobrança),
+    − reduz (pagamento, ajuste de desconto). A soma dos lançamentos = saldo da conta.
+    """
+    __tablename__ = "tab_entries"
+    __table_args__ = (
+        # Extrato de uma conta em ordem cronológica
+        Index("ix_tab_entries_tab_created_at", "tab_id", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(
+        String(36), primary_key=True, default=lambda: str(uuid.uuid4())
+    )
+    tab_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("member_tabs.id", ondelete="CASCADE"), nullable=False
+    )
+    # kind: consumo | pagamento | ajuste
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    amount: Mapped[float] = mapped_column(Numeric(10, 2), nullable=False)
+    order_id: Mapped[str | None] = mapped_column(
+        String(36), ForeignKey("orders.id", ondelete="SET NULL"), nullable=True
+    )  # só em consumo
+    notes: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_by: Mapped[str | None] = mapped_column(String(50), nullable=True)  # usuário do admin
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
@@ -0,0 +1,18 @@
+from datetime import datetime
+from sqlalchemy import String, Boolean, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class MenuChange(Base):
+    """Log de alterações do cardápio — `version` é monotônica e serve de cursor para o delta."""
+    __tablename__ = "menu_changes"
+
+    version: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    # entity: category | item
+    entity: Mapped[str] = mapped_column(String(10), nullable=False)
+    entity_id: Mapped[str] = mapped_column(String(36), nullable=False)
+    deleted: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, nullable=False, default=datetime.utcnow
+    )
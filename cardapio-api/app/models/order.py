@@ -1,20 +1,46 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, Text, Numeric, Integer, ForeignKey, DateTime
+from sqlalchemy import String, Text, Numeric, Integer, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base import Base
 
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        # Painel: pedidos ativos em ordem de chegada (crud_order.ACTIVE_FILTER)
+        Index(
+            "ix_orders_active_created_at", "created_at",
+            postgresql_where=text("status NOT IN ('entregue', 'cancelado')"),
+        ),
+        # TVs: pedidos prontos (crud_order.READY_FILTER)
+        Index("ix_orders_ready_created_at", "created_at", postgresql_where=text("status = 'pronto'")),
+        # Cliente: pedidos da sessão, mais recentes primeiro (também cobre buscas só por session_id)
+        Index("ix_orders_session_created_at", "session_id", text("created_at DESC")),
+        # Pedidos na conta de um membro por período (extratos, backfill de tab_id)
+        Index("ix_orders_member_payment_created_at", "member_id", "payment_method", "created_at"),
+        # Histórico por período
+        Index("ix_orders_created_at", "created_at"),
+        # Cursor de sincronização do painel (max/>= updated_at)
+        Index("ix_orders_updated_at", "updated_at"),
+        # Busca por nome do cliente (pg_trgm) — histórico e crud_order.search_by_customer
+        Index(
+            "ix_orders_customer_name_trgm", "customer_name",
+            postgresql_using="gin", postgresql_ops={"customer_name": "gin_trgm_ops"},
+        ),
+    )
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
-    session_id: Mapped[str] = mapped_column(String(36), nullable=False, index=True)
+    session_id: Mapped[str] = mapped_column(String(36), nullable=False)
     member_id: Mapped[str | None] = mapped_column(
-        String(36), ForeignKey("members.id", ondelete="SET NULL"), nullable=True, index=True
+        String(36), ForeignKey("members.id", ondelete="SET NULL"), nullable=True
     )  # None = pedido anônimo
+    # Conta mensal em que o pedido foi lançado (só payment_method = conta) — extrato por índice
+    tab_id: Mapped[str | None] = mapped_column(
+        String(36), ForeignKey("member_tabs.id", ondelete="SET NULL"), nullable=True, index=True
+    )
     # payment_method: pix | conta
     payment_method: Mapped[str] = mapped_column(String(10), nullable=False, default="pix")
     table_number: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,41 @@
+from datetime import date
+from sqlalchemy import String, Date, SmallInteger, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class SalesItemRollup(Base):
+    """
+    Vendas pré-agregadas por item, na hora local em que o pedido foi feito.
+    placed_* soma na criação; delivered_* / cancelled_* quando o pedido chega a
+    entregue / cancelado (sempre no mesmo balde da criação).
+    """
+    __tablename__ = "sales_item_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    hour: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    item_id: Mapped[str] = mapped_column(String(36), primary_key=True)  # sem FK: o histórico sobrevive ao item
+    payment_method: Mapped[str] = mapped_column(String(10), primary_key=True)
+
+    placed_quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    placed_revenue: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+    delivered_quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    delivered_revenue: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+    cancelled_quantity: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cancelled_revenue: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+
+
+class SalesOrderRollup(Base):
+    """Mesmos baldes no nível do pedido (contagem de pedidos, base do ticket médio)."""
+    __tablename__ = "sales_order_rollups"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    hour: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    payment_method: Mapped[str] = mapped_column(String(10), primary_key=True)
+
+    placed_orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    placed_revenue: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+    delivered_orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    delivered_revenue: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
+    cancelled_orders: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    cancelled_revenue: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False, default=0)
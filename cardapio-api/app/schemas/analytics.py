@@ -0,0 +1,23 @@
+from datetime import date
+from pydantic import BaseModel
+from typing import Optional
+
+
+class SalesBucket(BaseModel):
+    """Vendas líquidas (já descontados os cancelamentos) de um balde do relatório."""
+    key: str                                # dia (YYYY-MM-DD), hora (0-23), forma de pagamento ou item
+    orders: Optional[int] = None            # None ao agrupar por item
+    quantity: int
+    revenue: float
+    average_ticket: Optional[float] = None  # revenue / orders
+    cancelled_orders: Optional[int] = None
+    cancelled_revenue: float
+
+
+class SalesReport(BaseModel):
+    start_date: date
+    end_date: date
+    group_by: str
+    timezone: str
+    totals: SalesBucket
+    buckets: list[SalesBucket]
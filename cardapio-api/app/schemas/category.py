@@ -39,6 +39,31 @@ class CategoryResponse(CategoryBase):
         from_attributes = True
 
 
+class MenuItem(ItemInCategory):
+    """Item do cardápio público com o preço já resolvido para quem está vendo."""
+    effective_price: float  # member_price para membros logados (se houver), senão price
+
+
+class MenuCategory(CategoryBase):
+    """Categoria do cardápio público (GET /api/menu)."""
+    id: str
+    items: list[MenuItem] = []
+
+
+class MenuDeltaItem(MenuItem):
+    category_id: str
+
+
+class MenuDelta(BaseModel):
+    """Alterações do cardápio público desde uma versão (GET /api/menu/changes)."""
+    version: int                      # versão atual — usar como próximo `since`
+    full_refresh: bool = False        # True = cursor inválido/antigo demais, baixe /menu inteiro
+    categories: list[MenuCategory] = []    # categorias novas/alteradas (com seus itens ativos)
+    items: list[MenuDeltaItem] = []        # itens novos/alterados
+    removed_categories: list[str] = []     # excluídas ou desativadas
+    removed_items: list[str] = []          # excluídos, desativados ou em categoria inativa
+
+
 class CategorySimple(BaseModel):
     id: str
     name: str
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -32,6 +32,37 @@ class MemberResponse(BaseModel):
         from_attributes = True
 
 
+class MemberOverview(MemberResponse):
+    """Membro com a conta do mês atual e o saldo devedor de todas as contas (listagem do admin)."""
+    current_tab_id: Optional[str] = None
+    current_consumed: float = 0
+    current_paid: float = 0
+    current_status: Optional[str] = None
+    outstanding: float = 0
+
+
+class MemberOverviewPage(BaseModel):
+    total: int  # membros no filtro (todas as páginas)
+    items: list[MemberOverview]
+
+
+class MemberImportRow(BaseModel):
+    """Resultado de uma linha da importação em lote."""
+    row: int                      # linha da planilha (ou posição na lista JSON)
+    email: Optional[str] = None
+    status: str = "valido"        # criado | valido (dry_run) | erro
+    member_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class MemberImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    dry_run: bool = False
+    rows: list[MemberImportRow]
+
+
 class MemberLogin(BaseModel):
     email: str
     password: str
@@ -48,6 +79,7 @@ class MemberTabResponse(BaseModel):
     total_paid: float
     status: str
     closed_at: Optional[datetime]
+    billed_at: Optional[datetime] = None
     notes: Optional[str]
 
     class Config:
@@ -56,10 +88,51 @@ class MemberTabResponse(BaseModel):
 
 class MemberTabPayment(BaseModel):
     """Registra um pagamento (parcial ou total) na conta do membro."""
-    amount: float
+    amount: float = Field(..., gt=0)
     notes: Optional[str] = None
 
 
+class MemberTabAdjustment(BaseModel):
+    """Ajuste manual do consumo: positivo cobra a mais, negativo dá desconto/crédito."""
+    amount: float
+    notes: str = Field(..., min_length=1)  # motivo do ajuste (obrigatório)
+
+
 class MemberTabWithOrders(MemberTabResponse):
     """Tab com lista de pedidos (usada no extrato)."""
     orders: list = []  # lista de OrderSummary — evita importação circular
+
+
+# ─── Extrato (TabEntry) ───────────────────────────────────────────────────────
+
+class TabEntryResponse(BaseModel):
+    id: str
+    kind: str
+    amount: float  # + aumenta o saldo devedor, − reduz
+    order_id: Optional[str]
+    notes: Optional[str]
+    created_by: Optional[str]
+    created_at: datetime
+    balance_after: Optional[float] = None  # saldo acumulado (só no extrato completo)
+
+    class Config:
+        from_attributes = True
+
+
+class MemberTabStatement(MemberTabResponse):
+    """Conta com todos os lançamentos e o saldo acumulado após cada um."""
+    balance: float
+    entries: list[TabEntryResponse] = []
+
+    @classmethod
+    def build(cls, tab, entries) -> "MemberTabStatement":
+        running = 0.0
+        rows = []
+        for entry in entries:
+            running = round(running + float(entry.amount), 2)
+            rows.append(TabEntryResponse.model_validate(entry).model_copy(update={"balance_after": running}))
+        return cls(
+            **MemberTabResponse.model_validate(tab).model_dump(),
+            balance=round(float(tab.total_consumed) - float(tab.total_paid), 2),
+            entries=rows,
+        )
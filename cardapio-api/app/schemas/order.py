@@ -12,6 +12,26 @@ ORDER_STATUSES = [
     "conta",  # pedido lançado na conta — não precisa de pagamento pix
 ]
 
+# Máquina de estados do pedido: status atual -> status para onde pode ir.
+# entregue e cancelado são finais.
+ORDER_TRANSITIONS: dict[str, frozenset[str]] = {
+    "aguardando_pagamento": frozenset({"pagamento_declarado", "em_preparacao", "cancelado"}),
+    "pagamento_declarado": frozenset({"em_preparacao", "aguardando_pagamento", "cancelado"}),
+    "conta": frozenset({"em_preparacao", "cancelado"}),
+    "em_preparacao": frozenset({"pronto", "cancelado"}),
+    "pronto": frozenset({"entregue", "em_preparacao", "cancelado"}),
+    "entregue": frozenset(),
+    "cancelado": frozenset(),
+}
+
+# Status finais: o pedido sai do painel
+INACTIVE_STATUSES = ("entregue", "cancelado")
+
+
+def allowed_sources(new_status: str) -> list[str]:
+    """Status a partir dos quais é permitido ir para `new_status`."""
+    return [s for s, targets in ORDER_TRANSITIONS.items() if new_status in targets]
+
 
 class OrderItemCreate(BaseModel):
     item_id: str
@@ -121,3 +141,29 @@ class OrderSummary(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ActiveOrdersDelta(BaseModel):
+    """Sincronização incremental do painel: o que mudou desde o cursor enviado pelo cliente."""
+    cursor: datetime                 # enviar no próximo ?since=
+    orders: list[OrderResponse]      # pedidos ativos novos ou alterados (substituir pelo id)
+    removed: list[str]               # ids que saíram do painel (entregues/cancelados)
+
+
+class TvOrder(BaseModel):
+    """Projeção mínima para as TVs: só o que aparece na tela."""
+    id: str
+    table_number: int
+    customer_name: str
+    is_member: bool = False
+    ready_at: datetime               # updated_at do pedido ao ficar 'pronto'
+
+    @classmethod
+    def from_order(cls, order: OrderResponse) -> "TvOrder":
+        return cls(
+            id=order.id,
+            table_number=order.table_number,
+            customer_name=order.member_name or order.customer_name,
+            is_member=order.member_id is not None,
+            ready_at=order.updated_at,
+        )
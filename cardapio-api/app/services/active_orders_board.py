@@ -0,0 +1,147 @@
+"""
+Quadro de pedidos ativos em memória (read model do painel e das TVs).
+
+Carregado uma vez do banco na inicialização e mantido pelos eventos de pedido
+(criação e mudança de status, via publish_order_event). O painel e as TVs
+leem daqui em vez de remontar o mesmo conjunto no Postgres a cada poll.
+
+Cada processo tem o seu quadro: com vários workers, um worker só vê os eventos
+que ele mesmo publicou, por isso a reconciliação periódica com o banco corrige
+qualquer divergência em até BOARD_RECONCILE_SECONDS.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud import crud_order
+from app.db.session import AsyncSessionLocal
+from app.schemas.order import INACTIVE_STATUSES, OrderResponse, TvOrder
+
+logger = logging.getLogger(__name__)
+
+
+class ActiveOrdersBoard:
+    """Pedidos ativos por id, com o updated_at de cada um para descartar eventos atrasados."""
+
+    def __init__(self):
+        self._orders: dict[str, OrderResponse] = {}
+        # Saídas do quadro desde a última reconciliação (id -> updated_at da saída)
+        self._removed: dict[str, datetime] = {}
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def apply(self, order: OrderResponse) -> Optional[OrderResponse]:
+        """
+        Aplica o estado mais recente de um pedido (novo ou com status alterado).
+        Retorna a versão anterior que estava no quadro (None se não estava).
+        """
+        previous = self._orders.get(order.id)
+        if previous is not None and previous.updated_at > order.updated_at:
+            return previous  # evento fora de ordem: o quadro já tem algo mais novo
+
+        if order.status in INACTIVE_STATUSES:
+            self._orders.pop(order.id, None)
+            self._removed[order.id] = order.updated_at
+        else:
+            self._orders[order.id] = order
+        return previous
+
+    def active_orders(self) -> list[OrderResponse]:
+        """Pedidos ativos na ordem de chegada (mesma ordem de get_active_orders)."""
+        return sorted(self._orders.values(), key=lambda o: o.created_at)
+
+    def ready_orders(self) -> list[TvOrder]:
+        """Pedidos com status 'pronto', na projeção das TVs."""
+        return [TvOrder.from_order(o) for o in self.active_orders() if o.status == "pronto"]
+
+    def sync_cursor(self) -> Optional[datetime]:
+        """
+        Maior updated_at do que o quadro conhece (pedidos ativos e saídas desde a última
+        reconciliação): cursor que acompanha a lista servida daqui. None se o quadro está vazio.
+        """
+        return max(
+            [o.updated_at for o in self._orders.values()] + list(self._removed.values()),
+            default=None,
+        )
+
+    async def _load(self, db: AsyncSession) -> dict[str, OrderResponse]:
+        orders = await crud_order.get_active_orders(db)
+        return {o.id: OrderResponse.model_validate(o) for o in orders}
+
+    async def hydrate(self, db: AsyncSession) -> None:
+        """Carga inicial a partir do banco."""
+        self._orders = await self._load(db)
+        self._removed.clear()
+        self._loaded = True
+
+    async def reconcile(self, db: AsyncSession) -> int:
+        """
+        Compara o quadro com o banco e corrige as divergências.
+        Eventos aplicados durante a leitura prevalecem se forem mais novos que o banco.
+        Retorna quantos pedidos foram corrigidos.
+        """
+        started_at = datetime.utcnow()
+        removed_before = dict(self._removed)
+        db_orders = await self._load(db)
+
+        fixed = 0
+        merged: dict[str, OrderResponse] = {}
+        for order_id, order in db_orders.items():
+            current = self._orders.get(order_id)
+            if current is not None and current.updated_at > order.updated_at:
+                merged[order_id] = current
+                continue
+            removed_at = self._removed.get(order_id)
+            if current is None and removed_at is not None and removed_at >= order.updated_at:
+                continue  # saiu do quadro depois da leitura
+            if current != order:
+                fixed += 1
+            merged[order_id] = order
+
+        for order_id, current in self._orders.items():
+            if order_id in merged:
+                continue
+            if current.updated_at >= started_at - crud_order.SYNC_OVERLAP:
+                merged[order_id] = current  # criado/alterado durante a leitura (ou logo antes)
+            else:
+                fixed += 1  # não está mais ativo no banco
+
+        self._orders = merged
+        # Só esquece as saídas já cobertas por esta leitura
+        self._removed = {k: v for k, v in self._removed.items() if removed_before.get(k) != v}
+        self._loaded = True
+        return fixed
+
+
+# Instância global — compartilhada por todos os endpoints
+board = ActiveOrdersBoard()
+
+
+async def hydrate_on_startup() -> None:
+    """Carga inicial no lifespan. Se o banco não responder, os endpoints leem do banco até o próximo ciclo."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await board.hydrate(db)
+    except Exception:
+        logger.exception("Falha ao carregar o quadro de pedidos ativos")
+
+
+async def reconcile_loop() -> None:
+    """Tarefa de fundo: reconcilia o quadro com o banco periodicamente."""
+    while True:
+        await asyncio.sleep(settings.BOARD_RECONCILE_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                if not board.loaded:
+                    await board.hydrate(db)
+                else:
+                    fixed = await board.reconcile(db)
+                    if fixed:
+                        logger.warning("Quadro de pedidos ativos divergia do banco: %s pedidos corrigidos", fixed)
+        except Exception:
+            logger.exception("Falha ao reconciliar o quadro de pedidos ativos")
@@ -0,0 +1,93 @@
+"""
+Exportação de pedidos e itens para planilha (CSV ou XLSX).
+
+As linhas vêm do cursor do servidor em lotes (crud_order.stream_export_batches),
+então a memória fica limitada a um lote, qualquer que seja o período.
+O CSV é enviado à medida que os lotes chegam; o XLSX (zip) só pode ser enviado
+depois de fechado, mas é escrito incrementalmente em disco (openpyxl write-only).
+"""
+import asyncio
+import csv
+import io
+import os
+import tempfile
+from datetime import date
+from typing import AsyncIterator, Optional
+from app.crud import crud_order
+from app.db.session import AsyncSessionLocal
+
+EXPORT_HEADER = [
+    "pedido_id", "data_utc", "mesa", "cliente", "membro", "pagamento", "status",
+    "total_pedido", "item", "quantidade", "preco_unitario", "subtotal",
+]
+
+
+def _values(row, decimal_comma: bool) -> list:
+    """Valores de uma linha na ordem de EXPORT_HEADER."""
+    def money(value) -> object:
+        if value is None:
+            return None
+        value = round(float(value), 2)
+        return f"{value:.2f}".replace(".", ",") if decimal_comma else value
+
+    subtotal = row.unit_price * row.quantity if row.quantity is not None else None
+    return [
+        row.id,
+        row.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+        row.table_number,
+        row.customer_name,
+        row.member_name or "",
+        row.payment_method,
+        row.status,
+        money(row.total),
+        row.item_name or "",
+        row.quantity,
+        money(row.unit_price),
+        money(subtotal),
+    ]
+
+
+async def csv_chunks(start_date: Optional[date], end_date: Optional[date]) -> AsyncIterator[bytes]:
+    """
+    CSV no formato que o Excel em português abre direto: BOM UTF-8, separador `;`
+    e vírgula decimal. Um pedaço por lote lido do banco.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";")
+    writer.writerow(EXPORT_HEADER)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    # Sessão própria: a do Depends(get_db) é fechada antes de o corpo ser enviado
+    async with AsyncSessionLocal() as db:
+        async for batch in crud_order.stream_export_batches(db, start_date, end_date):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(_values(row, decimal_comma=True) for row in batch)
+            yield buffer.getvalue().encode("utf-8")
+
+
+async def build_xlsx(start_date: Optional[date], end_date: Optional[date]) -> str:
+    """
+    Escreve o XLSX num arquivo temporário e retorna o caminho (o chamador remove).
+    Requer openpyxl — ImportError se não estiver instalado.
+    """
+    from openpyxl import Workbook  # dependência usada só aqui
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Pedidos")
+    sheet.append(EXPORT_HEADER)
+
+    async with AsyncSessionLocal() as db:
+        async for batch in crud_order.stream_export_batches(db, start_date, end_date):
+            for row in batch:
+                sheet.append(_values(row, decimal_comma=False))
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        # Compactar o arquivo é CPU/disco: fora do event loop
+        await asyncio.to_thread(workbook.save, path)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
@@ -0,0 +1,96 @@
+"""
+Idempotência do POST /api/orders (cabeçalho Idempotency-Key).
+
+Celulares em Wi-Fi fraco reenviam o pedido; a mesma chave devolve a resposta
+original sem recalcular preços, inserir de novo ou notificar a cozinha outra vez.
+As chaves ficam na tabela `idempotency_keys` (com validade) e, na frente dela,
+num cache em memória para as repetições imediatas.
+"""
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud import crud_idempotency
+from app.db.session import AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+PURGE_INTERVAL_SECONDS = 3600
+
+
+class IdempotencyCache:
+    """LRU em memória: chave -> (session_id, resposta JSON, validade)."""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[str, str, datetime]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[tuple[str, str]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        session_id, body, expires_at = entry
+        if expires_at <= datetime.utcnow():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return session_id, body
+
+    def put(self, key: str, session_id: str, body: str, expires_at: datetime) -> None:
+        self._entries[key] = (session_id, body, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+
+_cache = IdempotencyCache(max_size=settings.IDEMPOTENCY_CACHE_SIZE)
+
+
+def expires_at() -> datetime:
+    return datetime.utcnow() + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS)
+
+
+def _check_session(key: str, stored_session_id: str, session_id: str) -> None:
+    if stored_session_id != session_id:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Idempotency-Key '{key}' já foi usada por outra sessão",
+        )
+
+
+async def find_replay(db: AsyncSession, key: str, session_id: str) -> Optional[str]:
+    """Resposta original (JSON) se a chave já foi usada — primeiro na memória, depois no banco."""
+    cached = _cache.get(key)
+    if cached is not None:
+        stored_session_id, body = cached
+        _check_session(key, stored_session_id, session_id)
+        return body
+
+    row = await crud_idempotency.get_valid(db, key)
+    if row is None:
+        return None
+    _check_session(key, row.session_id, session_id)
+    _cache.put(key, row.session_id, row.response_body, row.expires_at)
+    return row.response_body
+
+
+def remember(key: str, session_id: str, body: str, expires: datetime) -> None:
+    """Chamado após o commit do pedido."""
+    _cache.put(key, session_id, body, expires)
+
+
+async def purge_loop() -> None:
+    """Tarefa de fundo: remove chaves expiradas de hora em hora."""
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                removed = await crud_idempotency.purge_expired(db)
+            if removed:
+                logger.info("Idempotency keys expiradas removidas: %s", removed)
+        except Exception:
+            logger.exception("Falha ao limpar idempotency keys expiradas")
+        await asyncio.sleep(PURGE_INTERVAL_SECONDS)
@@ -0,0 +1,153 @@
+"""
+Importação de membros em lote (planilha CSV ou lista JSON).
+
+Todas as linhas são validadas antes de qualquer escrita: campos obrigatórios,
+e-mail repetido no próprio arquivo e e-mail já cadastrado (uma única consulta IN).
+As senhas das linhas válidas são processadas no pool de password_hasher e os membros
+entram num único INSERT de várias linhas. O relatório traz o resultado de cada linha.
+"""
+import csv
+import io
+import uuid
+from datetime import datetime
+from typing import Optional
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.crud import crud_member
+from app.schemas.member import MemberCreate, MemberImportReport, MemberImportRow
+from app.services.password_service import password_hasher
+
+# Cabeçalhos aceitos na planilha (português ou inglês) -> campo de MemberCreate
+CSV_COLUMNS = {
+    "nome": "name", "name": "name",
+    "email": "email", "e-mail": "email",
+    "senha": "password", "password": "password",
+    "telefone": "phone", "phone": "phone", "celular": "phone",
+}
+
+
+class MemberImportError(ValueError):
+    """Arquivo inválido como um todo (sem cabeçalho, colunas faltando, linhas demais)."""
+
+
+def _check_size(rows: list) -> list:
+    # O hash das senhas roda dentro da requisição: o limite a mantém abaixo do timeout do proxy
+    limit = settings.MEMBER_IMPORT_MAX_ROWS
+    if len(rows) > limit:
+        raise MemberImportError(f"Máximo de {limit} membros por importação — divida a planilha em partes")
+    return rows
+
+
+def parse_csv(content: bytes) -> list[tuple[int, dict]]:
+    """
+    Linhas da planilha como (número da linha, campos). Aceita ',' ou ';' como separador
+    (o Excel em português salva com ';') e UTF-8 com ou sem BOM.
+    """
+    text = content.decode("utf-8-sig")
+    first_line = text.split("\n", 1)[0]
+    delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+    reader = csv.reader(io.StringIO(text), delimiter=delimiter)
+
+    header = next(reader, None)
+    if not header:
+        raise MemberImportError("Planilha vazia")
+    fields = [CSV_COLUMNS.get(column.strip().lower()) for column in header]
+    required = {"name": "nome", "email": "email", "password": "senha"}
+    missing = [column for field, column in required.items() if field not in fields]
+    if missing:
+        raise MemberImportError(f"Colunas obrigatórias ausentes: {', '.join(missing)}")
+
+    rows = []
+    for values in reader:
+        if not any(value.strip() for value in values):
+            continue  # linha em branco
+        data = {field: value for field, value in zip(fields, values) if field}
+        # Linha 1 é o cabeçalho: o número bate com a linha da planilha
+        rows.append((reader.line_num, data))
+    return _check_size(rows)
+
+
+def parse_json(payload) -> list[tuple[int, dict]]:
+    """Lista de objetos {name, email, password, phone?}, numerados a partir de 1."""
+    if isinstance(payload, dict):
+        payload = payload.get("members")
+    if not isinstance(payload, list):
+        raise MemberImportError("Envie uma lista de membros (ou {\"members\": [...]})")
+    return _check_size([(i, item if isinstance(item, dict) else {}) for i, item in enumerate(payload, start=1)])
+
+
+def _validate(data: dict) -> tuple[Optional[MemberCreate], Optional[str]]:
+    cleaned = {k: v.strip() if isinstance(v, str) else v for k, v in data.items()}
+    if not cleaned.get("phone"):
+        cleaned.pop("phone", None)
+    try:
+        member = MemberCreate(**cleaned)
+    except ValidationError as e:
+        fields = sorted({str(err["loc"][0]) for err in e.errors() if err["loc"]})
+        return None, f"Campos inválidos ou ausentes: {', '.join(fields)}"
+    if not member.name or not member.password:
+        return None, "Nome e senha são obrigatórios"
+    if "@" not in member.email:
+        return None, "E-mail inválido"
+    return member, None
+
+
+async def import_members(
+    db: AsyncSession, rows: list[tuple[int, dict]], dry_run: bool = False
+) -> MemberImportReport:
+    report: list[MemberImportRow] = []
+    valid: list[tuple[MemberImportRow, MemberCreate]] = []
+    seen: set[str] = set()
+    for line, data in rows:
+        member, error = _validate(data)
+        result = MemberImportRow(row=line, email=member.email if member else data.get("email"))
+        if member and member.email in seen:
+            error = "E-mail repetido no arquivo"
+        if error:
+            result.status, result.error = "erro", error
+        else:
+            seen.add(member.email)
+            valid.append((result, member))
+        report.append(result)
+
+    # Uma única consulta para todos os e-mails do lote
+    existing = await crud_member.get_existing_emails(db, list(seen))
+    pending = []
+    for result, member in valid:
+        if member.email in existing:
+            result.status, result.error = "erro", "E-mail já cadastrado"
+        elif not dry_run:
+            pending.append((result, member))
+
+    if pending:
+        hashes = await password_hasher.hash_many([member.password for _, member in pending])
+        now = datetime.utcnow()
+        values = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": member.name,
+                "email": member.email,
+                "hashed_password": hashed,
+                "phone": member.phone,
+                "is_active": True,
+                "created_at": now,
+            }
+            for (_, member), hashed in zip(pending, hashes)
+        ]
+        created = await crud_member.create_many(db, values)
+        for result, member in pending:
+            member_id = created.get(member.email)
+            if member_id:
+                result.status, result.member_id = "criado", member_id
+            else:
+                # Cadastrado por outra requisição entre a validação e o INSERT
+                result.status, result.error = "erro", "E-mail já cadastrado"
+
+    return MemberImportReport(
+        total=len(report),
+        created=sum(1 for r in report if r.status == "criado"),
+        failed=sum(1 for r in report if r.status == "erro"),
+        dry_run=dry_run,
+        rows=report,
+    )
@@ -0,0 +1,221 @@
+"""
+Snapshot em memória do cardápio público (GET /api/menu).
+
+Guarda o JSON final já serializado junto com um número de versão. Qualquer
+escrita em categorias/itens registra uma linha em `menu_changes` (crud_category /
+crud_item) e o endpoint que a fez chama `menu_cache.invalidate()` depois do commit,
+descartando o snapshot; a próxima leitura reconstrói com uma única consulta ao banco.
+
+Cada versão tem duas visões pré-computadas: a anônima (preço normal) e a de
+membro (member_price quando o item tiver), expostas em `effective_price`.
+
+A versão do snapshot é a última `menu_changes.version` — o cliente a recebe no
+cabeçalho X-Menu-Version e depois busca só o delta em /api/menu/changes?since=.
+"""
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+from pydantic import TypeAdapter
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.models.category import Category
+from app.models.item import Item
+from app.models.menu_change import MenuChange
+from app.schemas.category import MenuCategory, MenuItem, MenuDelta, MenuDeltaItem
+
+_menu_adapter = TypeAdapter(list[MenuCategory])
+
+# Acima disso o delta não compensa: o cliente recebe full_refresh e baixa /menu
+MAX_DELTA_CHANGES = 500
+# Quantos cursores `since` diferentes ficam memorizados por versão
+MAX_CACHED_DELTAS = 64
+
+
+@dataclass(frozen=True)
+class MenuView:
+    body: bytes  # JSON final, pronto para enviar
+    etag: str
+
+
+@dataclass(frozen=True)
+class MenuSnapshot:
+    version: int
+    anonymous: MenuView
+    member: MenuView
+
+    def view(self, is_member: bool) -> MenuView:
+        return self.member if is_member else self.anonymous
+
+
+def effective_price(item: Item, is_member: bool) -> float:
+    """Mesma regra de preço usada na criação do pedido."""
+    if is_member and item.member_price is not None:
+        return float(item.member_price)
+    return float(item.price)
+
+
+def _menu_item(item: Item, is_member: bool) -> dict:
+    return {
+        "id": item.id,
+        "name": item.name,
+        "description": item.description,
+        "price": float(item.price),
+        "member_price": float(item.member_price) if item.member_price is not None else None,
+        "effective_price": effective_price(item, is_member),
+        "image_url": item.image_url,
+        "active": item.active,
+    }
+
+
+def _menu_category(cat: Category, is_member: bool) -> MenuCategory:
+    return MenuCategory(
+        id=cat.id,
+        name=cat.name,
+        description=cat.description,
+        active=cat.active,
+        items=[MenuItem(**_menu_item(i, is_member)) for i in cat.items if i.active],
+    )
+
+
+def _serialize(categories: list[Category], is_member: bool) -> MenuView:
+    body = _menu_adapter.dump_json([_menu_category(cat, is_member) for cat in categories])
+    return MenuView(body=body, etag=f'"menu-{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+async def _latest_version(db: AsyncSession) -> int:
+    result = await db.execute(select(func.max(MenuChange.version)))
+    return result.scalar_one_or_none() or 0
+
+
+async def _load_categories(db: AsyncSession) -> list[Category]:
+    """Categorias ativas com seus itens (uma consulta + selectinload)."""
+    result = await db.execute(
+        select(Category)
+        .where(Category.active == True)
+        .options(selectinload(Category.items))
+        .order_by(Category.name)
+    )
+    return list(result.scalars().all())
+
+
+async def _build_deltas(db: AsyncSession, since: int) -> tuple[bytes, bytes]:
+    """Monta o delta (anônimo, membro) a partir do log de alterações."""
+    result = await db.execute(
+        select(MenuChange)
+        .where(MenuChange.version > since)
+        .order_by(MenuChange.version.asc())
+        .limit(MAX_DELTA_CHANGES + 1)
+    )
+    changes = list(result.scalars().all())
+
+    if not changes:
+        latest = await _latest_version(db)
+        # Cursor do futuro (ex.: banco recriado): força o cliente a recarregar tudo
+        delta = MenuDelta(version=latest, full_refresh=since > latest)
+        body = delta.model_dump_json().encode()
+        return body, body
+
+    if len(changes) > MAX_DELTA_CHANGES:
+        body = MenuDelta(version=await _latest_version(db), full_refresh=True).model_dump_json().encode()
+        return body, body
+
+    version = changes[-1].version
+    category_ids = {c.entity_id for c in changes if c.entity == "category"}
+    item_ids = {c.entity_id for c in changes if c.entity == "item"}
+
+    categories: list[Category] = []
+    if category_ids:
+        result = await db.execute(
+            select(Category)
+            .where(Category.id.in_(category_ids))
+            .options(selectinload(Category.items))
+            .order_by(Category.name)
+        )
+        categories = [c for c in result.scalars().all() if c.active]
+
+    items: list[Item] = []
+    if item_ids:
+        result = await db.execute(
+            select(Item).where(Item.id.in_(item_ids)).options(selectinload(Item.category))
+        )
+        items = [i for i in result.scalars().all() if i.active and i.category.active]
+
+    removed_categories = sorted(category_ids - {c.id for c in categories})
+    removed_items = sorted(item_ids - {i.id for i in items})
+
+    def _body(is_member: bool) -> bytes:
+        return MenuDelta(
+            version=version,
+            categories=[_menu_category(c, is_member) for c in categories],
+            items=[
+                MenuDeltaItem(**_menu_item(i, is_member), category_id=i.category_id)
+                for i in items
+            ],
+            removed_categories=removed_categories,
+            removed_items=removed_items,
+        ).model_dump_json().encode()
+
+    return _body(False), _body(True)
+
+
+class MenuCache:
+    """Cache do cardápio público — um snapshot por versão, reconstruído sob demanda."""
+
+    def __init__(self):
+        # Geração local: muda a cada invalidate() e detecta escritas durante um rebuild
+        self._generation = 0
+        self._snapshot: Optional[MenuSnapshot] = None
+        self._deltas: dict[int, tuple[bytes, bytes]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def version(self) -> Optional[int]:
+        """Versão do snapshot atual (None se ainda não foi construído)."""
+        return self._snapshot.version if self._snapshot else None
+
+    def invalidate(self) -> None:
+        """Chamado após cada escrita no cardápio: snapshot e deltas descartados."""
+        self._generation += 1
+        self._snapshot = None
+        self._deltas = {}
+
+    async def get(self, db: AsyncSession) -> MenuSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        # Um único rebuild por vez: as demais requisições aguardam o mesmo resultado
+        async with self._lock:
+            if self._snapshot is not None:
+                return self._snapshot
+            generation = self._generation
+            # A versão é lida antes dos dados: o snapshot é no mínimo tão novo quanto ela
+            version = await _latest_version(db)
+            categories = await _load_categories(db)
+            snapshot = MenuSnapshot(
+                version=version,
+                anonymous=_serialize(categories, is_member=False),
+                member=_serialize(categories, is_member=True),
+            )
+            # Se houve escrita durante o rebuild, não guarda um snapshot já obsoleto
+            if generation == self._generation:
+                self._snapshot = snapshot
+            return snapshot
+
+    async def get_changes(self, db: AsyncSession, since: int, is_member: bool) -> bytes:
+        """Delta desde `since`, memorizado por cursor até a próxima escrita."""
+        cached = self._deltas.get(since)
+        if cached is None:
+            generation = self._generation
+            cached = await _build_deltas(db, since)
+            if generation == self._generation:
+                if len(self._deltas) >= MAX_CACHED_DELTAS:
+                    self._deltas = {}
+                self._deltas[since] = cached
+        return cached[1] if is_member else cached[0]
+
+
+# Instância global — compartilhada por todos os endpoints
+menu_cache = MenuCache()
@@ -1,6 +1,9 @@
 import json
+from collections import defaultdict
 from typing import Dict
 from fastapi import WebSocket
+from app.services.active_orders_board import board
+from app.schemas.order import TvOrder
 
 
 class ConnectionManager:
@@ -27,5 +30,77 @@ class ConnectionManager:
                 self.disconnect(connection)
 
 
-# Instância global — compartilhada por todos os endpoints
-manager = ConnectionManager()
+class SubscriptionManager:
+    """
+    Conexões WebSocket dos clientes, inscritas por tópico ("order:<id>" ou "session:<id>").
+    Cada cliente só recebe os eventos do próprio pedido/sessão, no lugar do polling.
+    """
+
+    def __init__(self):
+        self.subscriptions: Dict[str, set[WebSocket]] = defaultdict(set)
+
+    async def connect(self, websocket: WebSocket, topic: str):
+        await websocket.accept()
+        self.subscriptions[topic].add(websocket)
+
+    def disconnect(self, websocket: WebSocket, topic: str):
+        connections = self.subscriptions.get(topic)
+        if connections is None:
+            return
+        connections.discard(websocket)
+        if not connections:
+            del self.subscriptions[topic]
+
+    async def publish(self, topic: str, event: str, data: dict):
+        """Envia um evento JSON para os clientes inscritos no tópico (se houver)."""
+        connections = self.subscriptions.get(topic)
+        if not connections:
+            return
+        message = json.dumps({"event": event, "data": data})
+        for connection in list(connections):
+            try:
+                await connection.send_text(message)
+            except Exception:
+                self.disconnect(connection, topic)
+
+
+# Instâncias globais — compartilhadas por todos os endpoints
+manager = ConnectionManager()          # painel do restaurante
+tv_manager = ConnectionManager()       # TVs do balcão
+subscriptions = SubscriptionManager()  # clientes (pedido/sessão)
+
+
+async def _publish_tv_event(order, previous) -> None:
+    """
+    TVs só recebem entradas e saídas da lista de prontos:
+    ficou_pronto (projeção TvOrder) | saiu_de_pronto ({"id": ...}).
+    """
+    # Sem versão anterior no quadro (ainda não carregou, ou o pedido é novo) não dá para
+    # saber se estava na TV: não anuncia saída — a TV corrige no polling ou ao reconectar
+    was_ready = previous is not None and previous.status == "pronto"
+    is_ready = order.status == "pronto"
+
+    if is_ready and not was_ready:
+        await tv_manager.broadcast("ficou_pronto", TvOrder.from_order(order).model_dump(mode="json"))
+    elif was_ready and not is_ready:
+        await tv_manager.broadcast("saiu_de_pronto", {"id": order.id})
+
+
+async def publish_order_event(event: str, order, staff_data: dict) -> None:
+    """
+    Saída única dos eventos de pedido: o painel recebe os dados completos e os
+    clientes inscritos no pedido ou na sessão recebem só o novo status.
+    Também mantém o quadro de pedidos ativos em memória.
+    """
+    previous = board.apply(order)
+    await manager.broadcast(event, staff_data)
+    await _publish_tv_event(order, previous)
+
+    customer_data = {
+        "order_id": order.id,
+        "session_id": order.session_id,
+        "status": order.status,
+        "updated_at": order.updated_at.isoformat() if order.updated_at else None,
+    }
+    await subscriptions.publish(f"order:{order.id}", event, customer_data)
+    await subscriptions.publish(f"session:{order.session_id}", event, customer_data)
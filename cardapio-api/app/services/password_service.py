@@ -0,0 +1,146 @@
+"""
+Hash e verificação de senhas (bcrypt) fora do event loop.
+
+Cada operação custa ~100–300 ms de CPU; chamada direto num handler async, trava
+todas as outras requisições (inclusive o envio pelos WebSockets) nesse intervalo.
+
+- password_executor: logins e cadastros avulsos. Poucas threads dedicadas (o bcrypt
+  libera o GIL enquanto calcula) e uma fila limitada: passando de LOGIN_BCRYPT_MAX_PENDING
+  a requisição recebe 503 na hora, e uma rajada de logins não toma a CPU dos pedidos.
+- password_hasher: lotes (importação de membros), divididos entre IMPORT_HASH_PROCESSES processos.
+"""
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+
+class PasswordQueueFull(Exception):
+    """Fila de senhas cheia — vira 503 com Retry-After (handler em main.py)."""
+
+
+class PasswordExecutor:
+    """
+    Threads dedicadas ao bcrypt, no máximo `max_workers` operações ao mesmo tempo.
+    A espera por uma vaga acontece no event loop (semáforo), onde é medida; com
+    `max_pending` operações entre aguardando e executando, as seguintes são recusadas.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._slots = asyncio.Semaphore(max_workers)
+        self._pending = 0
+        self._running = 0
+        # Métricas acumuladas desde o início do processo
+        self._peak_pending = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._pending >= self._max_pending:
+            self._rejected += 1
+            raise PasswordQueueFull()
+
+        self._pending += 1
+        self._peak_pending = max(self._peak_pending, self._pending)
+        queued_at = time.perf_counter()
+        try:
+            async with self._slots:
+                started_at = time.perf_counter()
+                self._wait_seconds += started_at - queued_at
+                self._running += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._get_executor(), fn, *args)
+                finally:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_seconds += time.perf_counter() - started_at
+        finally:
+            self._pending -= 1
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    def stats(self) -> dict:
+        """Profundidade da fila agora e médias de espera/execução desde o início."""
+        completed = self._completed or 1
+        return {
+            "workers": self._max_workers,
+            "max_pending": self._max_pending,
+            "running": self._running,
+            "queued": self._pending - self._running,
+            "peak_pending": self._peak_pending,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "avg_wait_ms": round(self._wait_seconds / completed * 1000, 1),
+            "avg_run_ms": round(self._run_seconds / completed * 1000, 1),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _hash_batch(passwords: list[str]) -> list[str]:
+    """Executado nos processos do pool (precisa ser função de módulo)."""
+    return [get_password_hash(password) for password in passwords]
+
+
+class PasswordHasher:
+    """Pool de processos para gerar hashes bcrypt em lote, em paralelo."""
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: não herda o estado do processo do servidor (event loop, conexões)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """Hashes na mesma ordem da entrada, um bloco contíguo de senhas por processo."""
+        if not passwords:
+            return []
+        size = -(-len(passwords) // self._max_workers)  # divisão arredondada para cima
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        batches = await asyncio.gather(*(
+            loop.run_in_executor(executor, _hash_batch, passwords[i:i + size])
+            for i in range(0, len(passwords), size)
+        ))
+        return [hashed for batch in batches for hashed in batch]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Instâncias globais — threads e processos só são criados no primeiro uso
+password_executor = PasswordExecutor(
+    max_workers=settings.LOGIN_BCRYPT_THREADS,
+    max_pending=settings.LOGIN_BCRYPT_MAX_PENDING,
+)
+password_hasher = PasswordHasher(max_workers=settings.IMPORT_HASH_PROCESSES)
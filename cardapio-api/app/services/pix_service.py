@@ -3,24 +3,45 @@ Gerador de payload Pix Estático (BR Code / EMV QR Code).
 Implementação direta sem dependências externas — segue a especificação
 do Banco Central do Brasil (Resolução BCB nº 1/2020).
 """
-import qrcode
-import io
+import asyncio
 import base64
+import hashlib
+import io
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Optional
+import qrcode
 from app.core.config import settings
 
+QR_FORMATS = ("png", "svg")
+
+
+def _build_crc16_table() -> list[int]:
+    """Tabela de 256 entradas do CRC16-CCITT (polinômio 0x1021)."""
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC16_TABLE = _build_crc16_table()
+
+
+def _crc16_update(crc: int, data: str) -> int:
+    """Continua o CRC16-CCITT a partir do estado `crc`, um byte por consulta à tabela."""
+    table = _CRC16_TABLE
+    for char in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[((crc >> 8) ^ ord(char)) & 0xFF]
+    return crc
+
 
 def _crc16_ccitt(data: str) -> str:
     """Calcula o CRC16-CCITT-FALSE do payload Pix."""
-    crc = 0xFFFF
-    for char in data:
-        crc ^= ord(char) << 8
-        for _ in range(8):
-            if crc & 0x8000:
-                crc = (crc << 1) ^ 0x1021
-            else:
-                crc <<= 1
-            crc &= 0xFFFF
-    return format(crc, "04X")
+    return format(_crc16_update(0xFFFF, data), "04X")
 
 
 def _tlv(field_id: str, value: str) -> str:
@@ -28,43 +49,69 @@ def _tlv(field_id: str, value: str) -> str:
     return f"{field_id}{len(value):02d}{value}"
 
 
+class PixEncoder:
+    """
+    Gerador de payload BR Code com as partes fixas pré-calculadas.
+
+    Tudo que vem antes do valor (formato, chave Pix, MCC, moeda) é montado uma
+    vez, junto com o estado parcial do CRC sobre esse prefixo. A cada cobrança
+    só o valor (54), os campos fixos seguintes e o txid (62) passam pelo CRC.
+    """
+
+    def __init__(self, chave: str, nome: str, cidade: str):
+        # Campo 26: Merchant Account Information (chave Pix, máximo 77 chars)
+        merchant_account = _tlv("26", _tlv("00", "BR.GOV.BCB.PIX") + _tlv("01", chave[:77]))
+        self._prefix = (
+            "000201"                       # Payload Format Indicator
+            + "010212"                     # Point of Initiation (12 = estático)
+            + merchant_account             # Conta do recebedor (chave Pix)
+            + "52040000"                   # Merchant Category Code
+            + "5303986"                    # Moeda: BRL (986)
+        )
+        self._prefix_crc = _crc16_update(0xFFFF, self._prefix)
+        self._after_amount = (
+            "5802BR"                       # País: BR
+            + _tlv("59", nome[:25])        # Nome do recebedor
+            + _tlv("60", cidade[:15])      # Cidade do recebedor
+        )
+
+    @classmethod
+    def from_settings(cls) -> "PixEncoder":
+        return cls(settings.PIX_KEY, settings.RESTAURANT_NAME, settings.RESTAURANT_CITY)
+
+    def payload(self, total: float, order_id: str) -> str:
+        # Campo 62: Additional Data Field (txid — máx 25 chars, sem hífen)
+        txid = order_id.replace("-", "")[:25]
+        tail = (
+            _tlv("54", f"{total:.2f}")     # Valor da cobrança
+            + self._after_amount
+            + _tlv("62", _tlv("05", txid)) # ID da transação
+            + "6304"                       # CRC placeholder (o próprio campo 63 entra na conta)
+        )
+        crc = _crc16_update(self._prefix_crc, tail)
+        return f"{self._prefix}{tail}{crc:04X}"
+
+    def payloads(self, cobrancas: Iterable[tuple[float, str]]) -> list[str]:
+        """Gera vários payloads de uma vez a partir de pares (valor, identificador)."""
+        payload = self.payload
+        return [payload(total, order_id) for total, order_id in cobrancas]
+
+
+# Montado uma vez na inicialização — chave, nome e cidade vêm do .env
+pix_encoder = PixEncoder.from_settings()
+
+
 def gerar_payload_pix(total: float, order_id: str) -> str:
     """
     Gera o payload BR Code do Pix Estático com valor dinâmico.
     100% local — sem API de banco, sem custo, sem dependência externa.
     """
-    # Campo 26: Merchant Account Information (chave Pix)
-    gui = "BR.GOV.BCB.PIX"
-    chave = settings.PIX_KEY[:77]  # máximo permitido
-    merchant_account = _tlv("26", _tlv("00", gui) + _tlv("01", chave))
-
-    # Campo 54: valor da transação (ex: "42.50")
-    amount_str = f"{total:.2f}"
-
-    # Campo 62: Additional Data Field (txid — identificador do pedido)
-    txid = order_id.replace("-", "")[:25]  # máx 25 chars, sem hífen
-    additional_data = _tlv("62", _tlv("05", txid))
-
-    # Monta o payload SEM o CRC (o próprio campo 63 entra na conta)
-    nome = settings.RESTAURANT_NAME[:25]
-    cidade = settings.RESTAURANT_CITY[:15]
-
-    payload = (
-        "000201"                          # Payload Format Indicator
-        + "010212"                         # Point of Initiation (12 = estático)
-        + merchant_account                 # Conta do recebedor (chave Pix)
-        + "52040000"                       # Merchant Category Code
-        + "5303986"                        # Moeda: BRL (986)
-        + _tlv("54", amount_str)           # Valor da cobrança
-        + "5802BR"                         # País: BR
-        + _tlv("59", nome)                 # Nome do recebedor
-        + _tlv("60", cidade)               # Cidade do recebedor
-        + additional_data                  # ID da transação
-        + "6304"                           # CRC placeholder (4 chars vêm abaixo)
-    )
+    return pix_encoder.payload(total, order_id)
+
 
-    # Adiciona o CRC16 calculado sobre o payload + "6304"
-    return payload + _crc16_ccitt(payload)
+def gerar_payloads_pix(cobrancas: Iterable[tuple[float, str]]) -> list[str]:
+    """Versão em lote de gerar_payload_pix: recebe pares (valor, identificador)."""
+    return pix_encoder.payloads(cobrancas)
 
 
 def gerar_qr_code_base64(payload: str) -> str:
@@ -78,3 +125,114 @@ def gerar_qr_code_base64(payload: str) -> str:
     buffer.seek(0)
     b64 = base64.b64encode(buffer.read()).decode("utf-8")
     return f"data:image/png;base64,{b64}"
+
+
+def gerar_qr_code_svg(payload: str) -> str:
+    """
+    Converte o payload Pix em SVG (texto), sem passar pelo PIL: um único <path>
+    com um retângulo por sequência de módulos escuros de cada linha.
+    Mais barato de gerar que o PNG e escala sem perder nitidez.
+    """
+    qr = qrcode.QRCode(border=4)
+    qr.add_data(payload)
+    qr.make(fit=True)
+    matrix = qr.get_matrix()
+    size = len(matrix)
+
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" '
+        f'shape-rendering="crispEdges"><rect width="100%" height="100%" fill="#fff"/>'
+        f'<path d="{"".join(runs)}"/></svg>'
+    )
+
+
+def _render_qr(payload: str, formato: str) -> str:
+    """Executado nos processos do pool (precisa ser função de módulo)."""
+    if formato == "svg":
+        return gerar_qr_code_svg(payload)
+    return gerar_qr_code_base64(payload)
+
+
+class QrCodeRenderer:
+    """
+    Renderiza QR Codes fora do event loop, num pool de processos limitado,
+    com cache LRU endereçado pelo hash do payload. Pedidos simultâneos do mesmo
+    QR compartilham a mesma renderização.
+    """
+
+    def __init__(self, max_workers: int, cache_size: int):
+        self._max_workers = max_workers
+        self._cache_size = cache_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: não herda o estado do processo do servidor (event loop, conexões)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    @staticmethod
+    def _key(payload: str, formato: str) -> str:
+        return hashlib.sha256(f"{formato}:{payload}".encode("utf-8")).hexdigest()
+
+    def _on_done(self, key: str, future: asyncio.Future) -> None:
+        self._pending.pop(key, None)
+        if future.cancelled() or future.exception() is not None:
+            return
+        self._cache[key] = future.result()
+        self._cache.move_to_end(key)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    async def render(self, payload: str, formato: str = "png") -> str:
+        """PNG (data URI base64) ou SVG (texto) do payload, servido da memória quando possível."""
+        if formato not in QR_FORMATS:
+            raise ValueError(f"Formato de QR Code inválido: {formato}")
+
+        key = self._key(payload, formato)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_executor(), _render_qr, payload, formato)
+            self._pending[key] = future
+            future.add_done_callback(lambda f, key=key: self._on_done(key, f))
+        # shield: um cliente que desconecta não cancela a renderização dos demais
+        return await asyncio.shield(future)
+
+    async def render_many(self, payloads: list[str], formato: str = "png") -> list[str]:
+        """Renderiza vários QR Codes em paralelo no pool (mesma ordem da entrada)."""
+        return list(await asyncio.gather(*(self.render(p, formato) for p in payloads)))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Instância global — o pool de processos só é criado na primeira renderização
+qr_renderer = QrCodeRenderer(
+    max_workers=settings.QR_RENDER_WORKERS,
+    cache_size=settings.QR_CACHE_SIZE,
+)
@@ -0,0 +1,83 @@
+"""
+Fechamento mensal das contas dos membros.
+
+Depois do UPDATE em lote (crud_member.close_month), as cobranças de todas as contas
+com saldo devedor são geradas de uma vez: os payloads Pix numa única passada do
+encoder e os QR Codes em paralelo no pool de processos do qr_renderer. O resultado
+sai como JSON ou como um ZIP com uma imagem por membro e uma planilha de resumo.
+"""
+import asyncio
+import base64
+import csv
+import io
+import re
+import unicodedata
+import zipfile
+from app.services.pix_service import gerar_payloads_pix, qr_renderer
+
+
+def tab_txid(tab_id: str) -> str:
+    """Identificador da cobrança de uma conta (o mesmo do Pix avulso de quitação)."""
+    return f"CONTA-{tab_id[:8].upper()}"
+
+
+async def build_charges(rows, formato: str = "png") -> list[dict]:
+    """Cobrança Pix (payload + QR Code) de cada conta fechada com saldo devedor."""
+    due = [row for row in rows if row.balance > 0]
+    payloads = gerar_payloads_pix((float(row.balance), tab_txid(row.id)) for row in due)
+    qr_codes = await qr_renderer.render_many(payloads, formato)
+    qr_key = f"qr_code_{'svg' if formato == 'svg' else 'base64'}"
+    return [
+        {
+            "tab_id": row.id,
+            "member_id": row.member_id,
+            "member_name": row.name,
+            "email": row.email,
+            "phone": row.phone,
+            "saldo_devedor": round(float(row.balance), 2),
+            "pix_payload": payload,
+            qr_key: qr_code,
+        }
+        for row, payload, qr_code in zip(due, payloads, qr_codes)
+    ]
+
+
+# ─── Pacote ZIP ──────────────────────────────────────────────────────────────
+
+def _slug(name: str) -> str:
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]+", "-", ascii_name.lower()).strip("-") or "membro"
+
+
+def _image(charge: dict, formato: str) -> bytes:
+    if formato == "svg":
+        return charge["qr_code_svg"].encode("utf-8")
+    return base64.b64decode(charge["qr_code_base64"].split(",", 1)[1])
+
+
+def _zip_bundle(charges: list[dict], formato: str) -> bytes:
+    buffer = io.BytesIO()
+    summary = io.StringIO()
+    writer = csv.writer(summary, delimiter=";")
+    writer.writerow(["membro", "email", "telefone", "saldo_devedor", "arquivo", "pix_copia_e_cola"])
+
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as bundle:
+        for charge in charges:
+            filename = f"{_slug(charge['member_name'])}-{charge['tab_id'][:8]}.{formato}"
+            bundle.writestr(f"qrcodes/{filename}", _image(charge, formato))
+            writer.writerow([
+                charge["member_name"],
+                charge["email"],
+                charge["phone"] or "",
+                f"{charge['saldo_devedor']:.2f}".replace(".", ","),
+                filename,
+                charge["pix_payload"],
+            ])
+        # BOM: o Excel abre o CSV em UTF-8 com acentos corretos
+        bundle.writestr("cobrancas.csv", "\ufeff" + summary.getvalue())
+    return buffer.getvalue()
+
+
+async def zip_bundle(charges: list[dict], formato: str = "png") -> bytes:
+    """ZIP com os QR Codes (qrcodes/) e o resumo cobrancas.csv, montado fora do event loop."""
+    return await asyncio.to_thread(_zip_bundle, charges, formato)
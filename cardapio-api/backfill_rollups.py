@@ -0,0 +1,41 @@
+"""
+Recalcula os rollups de vendas (sales_item_rollups / sales_order_rollups)
+a partir dos pedidos existentes.
+
+Necessário uma vez depois da migração 007 e seguro rodar de novo a qualquer
+momento (ex.: depois de trocar TIMEZONE): cada dia é apagado e recalculado na
+sua própria transação, sem perder os pedidos feitos enquanto roda. O lock é por
+dia local: só os pedidos e mudanças de status desse mesmo dia esperam o recálculo
+dele (uma varredura de um dia) — recalcular o histórico não trava o dia corrente.
+
+Uso: python backfill_rollups.py [--start 2026-01-01] [--end 2026-01-31]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import date
+
+# Garante que o diretório raiz está no path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.db.session import engine, AsyncSessionLocal
+from app.crud import crud_sales_rollup
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--start", type=date.fromisoformat, help="primeiro dia local (padrão: primeiro pedido)")
+    parser.add_argument("--end", type=date.fromisoformat, help="último dia local (padrão: último pedido)")
+    args = parser.parse_args()
+
+    print(f"Recalculando rollups de vendas (fuso {settings.TIMEZONE})...")
+    async with AsyncSessionLocal() as session:
+        item_rows, order_rows = await crud_sales_rollup.rebuild(session, args.start, args.end)
+    print(f"[OK] {item_rows} linhas por item, {order_rows} linhas por pedido")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
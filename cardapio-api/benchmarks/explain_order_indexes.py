@@ -0,0 +1,135 @@
+"""
+EXPLAIN das consultas quentes de pedidos com e sem os índices da migração
+006_order_hot_indexes (painel, TV, sessão do cliente, histórico e cursor de sync).
+
+Tudo roda numa única transação encerrada com ROLLBACK: opcionalmente insere
+pedidos sintéticos (--seed N), roda ANALYZE, mostra o plano "depois" (com os
+índices), remove os índices novos e mostra o plano "antes". Nada fica gravado,
+mas o DROP INDEX trava a tabela orders até o fim — não rode em produção no
+horário de movimento.
+
+Requer Postgres (DATABASE_URL do .env) com a migração 006 aplicada.
+
+Uso: python benchmarks/explain_order_indexes.py [--seed 50000] [--analyze]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Garante que o diretório raiz está no path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects import postgresql
+from app.db.session import engine
+from app.models import category, item, order, user, member  # noqa: importa todos os modelos
+from app.models.member import Member
+from app.models.order import Order
+from app.crud.crud_order import ACTIVE_FILTER, READY_FILTER
+
+NEW_INDEXES = [
+    "ix_orders_active_created_at",
+    "ix_orders_ready_created_at",
+    "ix_orders_session_created_at",
+    "ix_orders_created_at",
+    "ix_orders_updated_at",
+]
+
+# Distribuição típica: quase tudo já entregue/cancelado, poucos pedidos ativos
+SEED_SQL = """
+    INSERT INTO orders (id, session_id, payment_method, table_number, customer_name,
+                        status, total, created_at, updated_at)
+    SELECT 'bench-' || g,
+           'bench-sessao-' || (g % :sessions),
+           'pix',
+           1 + g % 30,
+           'Cliente ' || g,
+           CASE WHEN g % 200 = 0 THEN 'em_preparacao'
+                WHEN g % 200 = 1 THEN 'pronto'
+                WHEN g % 200 = 2 THEN 'aguardando_pagamento'
+                WHEN g % 20 = 3 THEN 'cancelado'
+                ELSE 'entregue' END,
+           10 + g % 90,
+           now() - make_interval(secs => (:total - g) * 60),
+           now() - make_interval(secs => (:total - g) * 60)
+    FROM generate_series(1, :total) AS g
+"""
+
+
+def _hot_queries(session_id: str) -> dict[str, object]:
+    """As mesmas consultas (filtros e ordenação) emitidas por crud_order."""
+    return {
+        "painel (get_active_orders)": select(Order).where(ACTIVE_FILTER).order_by(Order.created_at.asc()),
+        "tv (get_ready_tv)": (
+            select(Order.id, Order.table_number, func.coalesce(Member.name, Order.customer_name), Order.updated_at)
+            .outerjoin(Member, Member.id == Order.member_id)
+            .where(READY_FILTER)
+            .order_by(Order.created_at.asc())
+        ),
+        "sessão (get_by_session)": (
+            select(Order).where(Order.session_id == session_id).order_by(Order.created_at.desc())
+        ),
+        "histórico (últimos 7 dias)": (
+            select(Order)
+            .where(Order.created_at >= datetime.utcnow() - timedelta(days=7))
+            .order_by(Order.created_at.desc())
+        ),
+        "cursor de sync (get_sync_cursor)": select(func.max(Order.updated_at)),
+    }
+
+
+def _sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+async def _explain(conn, stmt, analyze: bool) -> list[str]:
+    options = "ANALYZE, BUFFERS" if analyze else "COSTS"
+    result = await conn.execute(text(f"EXPLAIN ({options}) {_sql(stmt)}"))
+    return [row[0] for row in result]
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, default=0, help="pedidos sintéticos a inserir (descartados no fim)")
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE (executa as consultas)")
+    args = parser.parse_args()
+
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        try:
+            if args.seed:
+                await conn.execute(text(SEED_SQL), {"total": args.seed, "sessions": max(args.seed // 3, 1)})
+                print(f"[OK] {args.seed} pedidos sintéticos inseridos (serão descartados)")
+            await conn.execute(text("ANALYZE orders"))
+
+            session_id = (await conn.execute(select(Order.session_id).limit(1))).scalar_one_or_none() or "-"
+            queries = _hot_queries(session_id)
+
+            plans: dict[str, dict[str, list[str]]] = {name: {} for name in queries}
+            for name, stmt in queries.items():
+                plans[name]["depois"] = await _explain(conn, stmt, args.analyze)
+
+            for index_name in NEW_INDEXES:
+                await conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+            # Sem os índices novos a sessão volta a usar o índice antigo só de session_id
+            await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_orders_session_id ON orders (session_id)"))
+
+            for name, stmt in queries.items():
+                plans[name]["antes"] = await _explain(conn, stmt, args.analyze)
+        finally:
+            await trans.rollback()
+
+    for name, by_phase in plans.items():
+        print(f"\n=== {name} ===")
+        for phase in ("antes", "depois"):
+            print(f"--- {phase}")
+            for line in by_phase[phase]:
+                print(f"    {line}")
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
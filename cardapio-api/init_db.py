@@ -13,7 +13,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.db.base import Base
 from app.db.session import engine
-from app.models import category, item, order, user, member  # noqa: importa todos os modelos
+from app.models import category, item, order, user, member, menu_change, idempotency_key, sales_rollup  # noqa: importa todos os modelos
 from app.core.security import get_password_hash
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
@@ -48,6 +48,55 @@ async def apply_migrations(conn) -> None:
         "ALTER TABLE items ADD COLUMN IF NOT EXISTS member_price NUMERIC(10, 2)",
         "ALTER TABLE orders ADD COLUMN IF NOT EXISTS payment_method VARCHAR NOT NULL DEFAULT 'pix'",
         "ALTER TABLE orders ADD COLUMN IF NOT EXISTS member_id VARCHAR",
+        # v2 - Uma conta por membro por mês (UPSERT em add_to_tab): junta duplicadas antes
+        """UPDATE member_tabs t SET total_consumed = d.consumed, total_paid = d.paid
+           FROM (SELECT min(id) AS keep_id, sum(total_consumed) AS consumed, sum(total_paid) AS paid
+                 FROM member_tabs GROUP BY member_id, year, month HAVING count(*) > 1) d
+           WHERE t.id = d.keep_id""",
+        """DELETE FROM member_tabs t USING member_tabs k
+           WHERE t.member_id = k.member_id AND t.year = k.year AND t.month = k.month AND t.id > k.id""",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_member_tabs_member_year_month ON member_tabs (member_id, year, month)",
+        # v3 - Índices das consultas quentes de pedidos (painel, TV, sessão, histórico)
+        "CREATE INDEX IF NOT EXISTS ix_orders_active_created_at ON orders (created_at) WHERE status NOT IN ('entregue', 'cancelado')",
+        "CREATE INDEX IF NOT EXISTS ix_orders_ready_created_at ON orders (created_at) WHERE status = 'pronto'",
+        "CREATE INDEX IF NOT EXISTS ix_orders_session_created_at ON orders (session_id, created_at DESC)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_created_at ON orders (created_at)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_updated_at ON orders (updated_at)",
+        "DROP INDEX IF EXISTS ix_orders_session_id",
+        # v4 - Busca por nome/e-mail com pg_trgm
+        "CREATE INDEX IF NOT EXISTS ix_orders_customer_name_trgm ON orders USING gin (customer_name gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_members_name_trgm ON members USING gin (name gin_trgm_ops)",
+        "CREATE INDEX IF NOT EXISTS ix_members_email_trgm ON members USING gin (email gin_trgm_ops)",
+        # v5 - Pedido ligado à conta do membro (extrato por orders.tab_id)
+        "ALTER TABLE orders ADD COLUMN IF NOT EXISTS tab_id VARCHAR(36) REFERENCES member_tabs(id) ON DELETE SET NULL",
+        "CREATE INDEX IF NOT EXISTS ix_orders_tab_id ON orders (tab_id)",
+        "CREATE INDEX IF NOT EXISTS ix_orders_member_payment_created_at ON orders (member_id, payment_method, created_at)",
+        "DROP INDEX IF EXISTS ix_orders_member_id",
+        """UPDATE orders o SET tab_id = t.id FROM member_tabs t
+           WHERE o.payment_method = 'conta' AND o.tab_id IS NULL AND o.member_id = t.member_id
+             AND o.created_at >= make_date(t.year, t.month, 1)
+             AND o.created_at < make_date(t.year, t.month, 1) + interval '1 month'""",
+        # v6 - Extrato das contas (tab_entries): lançamentos das contas que ainda não têm nenhum
+        """INSERT INTO tab_entries (id, tab_id, kind, amount, order_id, notes, created_at)
+           SELECT gen_random_uuid()::text, s.tab_id, s.kind, s.amount, s.order_id, s.notes, s.created_at
+           FROM (
+               SELECT o.tab_id, 'consumo' AS kind, o.total AS amount, o.id AS order_id,
+                      NULL::text AS notes, o.created_at
+               FROM orders o WHERE o.tab_id IS NOT NULL
+               UNION ALL
+               SELECT t.id, 'ajuste', t.total_consumed - coalesce(sum(o.total), 0), NULL,
+                      'Consumo anterior ao extrato detalhado', now() AT TIME ZONE 'UTC'
+               FROM member_tabs t LEFT JOIN orders o ON o.tab_id = t.id
+               GROUP BY t.id
+               HAVING t.total_consumed <> coalesce(sum(o.total), 0)
+               UNION ALL
+               SELECT t.id, 'pagamento', -t.total_paid, NULL, t.notes,
+                      coalesce(t.closed_at, now() AT TIME ZONE 'UTC')
+               FROM member_tabs t WHERE t.total_paid > 0
+           ) s
+           WHERE NOT EXISTS (SELECT 1 FROM tab_entries e WHERE e.tab_id = s.tab_id)""",
+        # v7 - Fechamento mensal das contas
+        "ALTER TABLE member_tabs ADD COLUMN IF NOT EXISTS billed_at TIMESTAMP",
     ]
     for sql in migrations:
         try:
@@ -60,6 +109,8 @@ async def apply_migrations(conn) -> None:
 async def main():
     print("Criando tabelas no banco de dados...")
     async with engine.begin() as conn:
+        # Os índices de busca (gin_trgm_ops) dependem da extensão já existir
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
         await apply_migrations(conn)
     print("Tabelas criadas com sucesso!")
@@ -0,0 +1,129 @@
+"""Quadro de pedidos ativos em memória: eventos, leitura do painel/TV e reconciliação (user-013)."""
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app.models.order import Order
+from app.schemas.order import OrderResponse
+from app.services.active_orders_board import ActiveOrdersBoard, board
+
+pytestmark = pytest.mark.anyio
+
+T0 = datetime(2026, 3, 1, 12, 0, 0)
+
+
+def _order(order_id: str, status: str, updated_at: datetime, created_at: datetime = T0) -> OrderResponse:
+    return OrderResponse(
+        id=order_id, session_id="s", table_number=1, customer_name="Lia", observations=None,
+        status=status, total=10, payment_method="pix", pix_payload=None,
+        created_at=created_at, updated_at=updated_at,
+    )
+
+
+async def _create_order(client, item_id: str, customer_name: str = "Mel") -> dict:
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-quadro",
+        "table_number": 8,
+        "customer_name": customer_name,
+        "payment_method": "pix",
+        "items": [{"item_id": item_id, "quantity": 1}],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+# ─── Regras do quadro (sem banco) ─────────────────────────────────────────────
+
+def test_apply_keeps_newest_version_and_drops_finished_orders():
+    quadro = ActiveOrdersBoard()
+    later = _order("b", "aguardando_pagamento", T0, created_at=T0 + timedelta(minutes=1))
+    quadro.apply(later)
+    quadro.apply(_order("a", "em_preparacao", T0))
+    assert [o.id for o in quadro.active_orders()] == ["a", "b"]  # ordem de chegada
+
+    quadro.apply(_order("a", "pronto", T0 + timedelta(seconds=2)))
+    previous = quadro.apply(_order("a", "em_preparacao", T0 + timedelta(seconds=1)))  # evento atrasado
+    assert previous.status == "pronto"
+    assert [o.id for o in quadro.ready_orders()] == ["a"]
+
+    quadro.apply(_order("a", "entregue", T0 + timedelta(seconds=3)))
+    assert [o.id for o in quadro.active_orders()] == ["b"]
+    assert quadro.ready_orders() == []
+
+
+# ─── Com banco ────────────────────────────────────────────────────────────────
+
+async def test_panel_and_tv_are_served_from_the_board(client, db, menu_item, admin_headers):
+    await board.hydrate(db)
+    order = await _create_order(client, menu_item.id)
+    for status in ("em_preparacao", "pronto"):
+        await client.patch(f"/api/orders/{order['id']}/status", json={"status": status})
+
+    # Mudança direta no banco (sem evento) não aparece até a reconciliação
+    await db.execute(update(Order).where(Order.id == order["id"]).values(customer_name="Outro nome"))
+    await db.commit()
+
+    panel = (await client.get("/api/restaurant/orders", headers=admin_headers)).json()
+    assert [(o["id"], o["customer_name"]) for o in panel] == [(order["id"], "Mel")]
+    tv = (await client.get("/api/tv/ready-orders")).json()
+    assert [o["id"] for o in tv] == [order["id"]]
+
+
+async def test_reconcile_fixes_drift_but_keeps_newer_events(client, db, menu_item):
+    await board.hydrate(db)
+    kept = await _create_order(client, menu_item.id, "Nina")
+    missed = await _create_order(client, menu_item.id, "Otto")
+    gone = await _create_order(client, menu_item.id, "Pia")
+
+    # Outro worker: "missed" chegou sem evento aqui; "gone" foi cancelado sem evento aqui
+    board._orders.pop(missed["id"])
+    await db.execute(update(Order).where(Order.id == gone["id"]).values(status="cancelado"))
+    # O quadro está à frente do banco para "kept" (evento mais novo que a leitura)
+    newer = board._orders[kept["id"]].model_copy(
+        update={"status": "em_preparacao", "updated_at": datetime.utcnow() + timedelta(minutes=1)}
+    )
+    board.apply(newer)
+    # "gone" fica fora da janela de sobreposição, como se tivesse mudado há tempo
+    await db.execute(
+        update(Order).where(Order.id == gone["id"]).values(updated_at=Order.updated_at - timedelta(hours=1))
+    )
+    await db.commit()
+    board._orders[gone["id"]] = board._orders[gone["id"]].model_copy(
+        update={"updated_at": board._orders[gone["id"]].updated_at - timedelta(hours=1)}
+    )
+
+    fixed = await board.reconcile(db)
+    assert fixed == 2
+    assert {o.id: o.status for o in board.active_orders()} == {
+        kept["id"]: "em_preparacao",
+        missed["id"]: "aguardando_pagamento",
+    }
+
+
+async def test_full_list_cursor_matches_what_the_board_served(client, db, menu_item, admin_headers):
+    await board.hydrate(db)
+    served = await _create_order(client, menu_item.id, "Quim")
+    missed = await _create_order(client, menu_item.id, "Rosa")
+    # Outro worker mudou "missed" depois: o banco está à frente deste quadro
+    board._orders.pop(missed["id"])
+    later = datetime.utcnow() + timedelta(minutes=10)
+    await db.execute(update(Order).where(Order.id == missed["id"]).values(updated_at=later))
+    await db.commit()
+
+    full = await client.get("/api/restaurant/orders", headers=admin_headers)
+    assert [o["id"] for o in full.json()] == [served["id"]]
+    cursor = datetime.fromisoformat(full.headers["X-Sync-Cursor"])
+    assert cursor == board._orders[served["id"]].updated_at  # não o max(updated_at) do banco
+
+    # Por isso o delta seguinte traz o que o quadro não mostrou
+    delta = (await client.get("/api/restaurant/orders", params={"since": cursor.isoformat()}, headers=admin_headers)).json()
+    assert missed["id"] in {o["id"] for o in delta["orders"]}
+
+
+async def test_empty_board_serves_list_and_cursor_from_the_database(client, db, menu_item, admin_headers):
+    await board.hydrate(db)
+    order = await _create_order(client, menu_item.id, "Sol")
+    board._orders.clear()  # quadro vazio (pedido visto só por outro worker)
+
+    full = await client.get("/api/restaurant/orders", headers=admin_headers)
+    assert [o["id"] for o in full.json()] == [order["id"]]
+    assert full.headers["X-Sync-Cursor"] == full.json()[0]["updated_at"]
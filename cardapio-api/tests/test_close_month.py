@@ -0,0 +1,111 @@
+"""Fechamento mensal das contas em lote com as cobranças Pix (user-022)."""
+import io
+import uuid
+import zipfile
+from datetime import datetime
+import pytest
+from app.models.member import Member, MemberTab
+from app.services.pix_service import gerar_payload_pix
+from app.services.tab_closing_service import tab_txid
+
+pytestmark = pytest.mark.anyio
+
+CLOSE_URL = "/api/restaurant/tabs/close-month"
+PAID_AT = datetime(2026, 1, 20, 18, 0)
+
+
+@pytest.fixture
+async def january_tabs(db) -> dict[str, MemberTab]:
+    """Janeiro/2026: Bruna deve 30, Caio está quitado; a conta de fevereiro não entra."""
+    tabs = {}
+    for name, month, consumed, paid, status, closed_at in (
+        ("Bruna Araújo", 1, 50, 20, "parcial", None),
+        ("Caio", 1, 40, 40, "paga", PAID_AT),
+        ("Bruna Araújo", 2, 15, 0, "aberta", None),
+    ):
+        member = Member(id=str(uuid.uuid4()), name=name, email=f"{uuid.uuid4().hex[:8]}@teste.com", hashed_password="x")
+        tab = MemberTab(
+            id=str(uuid.uuid4()), member_id=member.id, year=2026, month=month,
+            total_consumed=consumed, total_paid=paid, status=status, closed_at=closed_at,
+        )
+        db.add_all([member, tab])
+        tabs[f"{name}-{month}"] = tab
+    await db.commit()
+    return tabs
+
+
+async def test_close_month_bills_every_tab_and_charges_balances(client, db, admin_headers, january_tabs):
+    response = await client.post(CLOSE_URL, params={"year": 2026, "month": 1}, headers=admin_headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["contas_fechadas"] == 2
+    assert body["total_devedor"] == 30.0
+
+    [charge] = body["cobrancas"]
+    due = january_tabs["Bruna Araújo-1"]
+    assert (charge["tab_id"], charge["member_name"], charge["saldo_devedor"]) == (due.id, "Bruna Araújo", 30.0)
+    assert charge["pix_payload"] == gerar_payload_pix(30.0, tab_txid(due.id))
+    assert charge["qr_code_base64"].startswith("data:image/png;base64,")
+
+    # Mesmo payload do Pix avulso de quitação da conta
+    single = await client.get(f"/api/restaurant/members/{due.member_id}/tabs/{due.id}/pix", headers=admin_headers)
+    assert single.json()["pix_payload"] == charge["pix_payload"]
+
+    for tab in january_tabs.values():
+        await db.refresh(tab)
+    assert january_tabs["Bruna Araújo-1"].billed_at is not None
+    assert january_tabs["Caio-1"].billed_at is not None
+    assert january_tabs["Bruna Araújo-2"].billed_at is None
+
+
+async def test_closing_leaves_the_payment_state_alone(client, db, admin_headers, january_tabs):
+    """Fechar o mês marca só billed_at: status/closed_at seguem sendo o pagamento."""
+    await client.post(CLOSE_URL, params={"year": 2026, "month": 1}, headers=admin_headers)
+    due, paid = january_tabs["Bruna Araújo-1"], january_tabs["Caio-1"]
+    for tab in (due, paid):
+        await db.refresh(tab)
+    assert (due.status, due.closed_at) == ("parcial", None)
+    assert (paid.status, paid.closed_at) == ("paga", PAID_AT)
+
+    # A cobrança do fechamento, quando paga, quita a conta pelo caminho de sempre
+    response = await client.post(
+        f"/api/restaurant/members/{due.member_id}/tabs/{due.id}/pay", json={"amount": 30}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["status"] == "paga"
+    assert response.json()["closed_at"] is not None
+
+
+async def test_closing_again_keeps_the_billing_date(client, db, admin_headers, january_tabs):
+    await client.post(CLOSE_URL, params={"year": 2026, "month": 1}, headers=admin_headers)
+    tab = january_tabs["Caio-1"]
+    await db.refresh(tab)
+    billed_at = tab.billed_at
+
+    again = await client.post(CLOSE_URL, params={"year": 2026, "month": 1}, headers=admin_headers)
+    assert again.json()["contas_fechadas"] == 2
+    await db.refresh(tab)
+    assert tab.billed_at == billed_at
+
+
+async def test_zip_bundle_has_one_qr_per_charge_and_a_summary(client, admin_headers, january_tabs):
+    response = await client.post(
+        CLOSE_URL, params={"year": 2026, "month": 1, "formato": "zip", "qr": "svg"}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+
+    bundle = zipfile.ZipFile(io.BytesIO(response.content))
+    due = january_tabs["Bruna Araújo-1"]
+    image = f"qrcodes/bruna-araujo-{due.id[:8]}.svg"
+    assert sorted(bundle.namelist()) == ["cobrancas.csv", image]
+    assert bundle.read(image).startswith(b"<svg")
+
+    header, row = bundle.read("cobrancas.csv").decode("utf-8-sig").splitlines()
+    assert header.startswith("membro;email")
+    assert row.split(";")[:1] + row.split(";")[3:5] == ["Bruna Araújo", "30,00", image.split("/")[1]]
+
+
+async def test_year_and_month_go_together(client, admin_headers):
+    response = await client.post(CLOSE_URL, params={"year": 2026}, headers=admin_headers)
+    assert response.status_code == 400
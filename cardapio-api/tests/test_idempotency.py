@@ -0,0 +1,86 @@
+"""POST /api/orders com Idempotency-Key: reenvio devolve o pedido original (user-008)."""
+import asyncio
+import uuid
+import pytest
+from sqlalchemy import func, select
+from app.models.order import Order
+from app.services import idempotency_service
+
+pytestmark = pytest.mark.anyio
+
+
+def _order_payload(item_id: str, session_id: str = "sessao-1") -> dict:
+    return {
+        "session_id": session_id,
+        "table_number": 4,
+        "customer_name": "Bia",
+        "payment_method": "pix",
+        "items": [{"item_id": item_id, "quantity": 2}],
+    }
+
+
+async def _count_orders(db) -> int:
+    return (await db.execute(select(func.count()).select_from(Order))).scalar_one()
+
+
+async def test_retry_with_same_key_replays_original_order(client, db, menu_item):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    first = await client.post("/api/orders", json=_order_payload(menu_item.id), headers=headers)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    # Da memória e, depois de limpar o cache, do banco
+    for clear_cache in (False, True):
+        if clear_cache:
+            idempotency_service._cache._entries.clear()
+        retry = await client.post("/api/orders", json=_order_payload(menu_item.id), headers=headers)
+        assert retry.status_code == 201
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert retry.json() == first.json()
+
+    assert await _count_orders(db) == 1
+
+
+async def test_same_key_from_another_session_is_rejected(client, menu_item):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    await client.post("/api/orders", json=_order_payload(menu_item.id), headers=headers)
+    other = await client.post("/api/orders", json=_order_payload(menu_item.id, "sessao-2"), headers=headers)
+    assert other.status_code == 422
+
+
+async def test_lost_claim_returns_the_winners_order(client, db, menu_item, monkeypatch):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    winner = await client.post("/api/orders", json=_order_payload(menu_item.id), headers=headers)
+
+    # O perdedor conferiu a chave antes do commit do vencedor: a primeira busca não acha nada
+    real_find_replay = idempotency_service.find_replay
+    calls = []
+
+    async def find_replay_after_race(db, key, session_id):
+        calls.append(key)
+        if len(calls) == 1:
+            return None
+        return await real_find_replay(db, key, session_id)
+
+    monkeypatch.setattr(idempotency_service, "find_replay", find_replay_after_race)
+    idempotency_service._cache._entries.clear()
+
+    loser = await client.post("/api/orders", json=_order_payload(menu_item.id), headers=headers)
+    assert len(calls) == 2  # chegou ao claim, perdeu e buscou a resposta do vencedor
+    assert loser.status_code == 201
+    assert loser.headers["Idempotent-Replayed"] == "true"
+    assert loser.json()["id"] == winner.json()["id"]
+    assert await _count_orders(db) == 1  # o pedido do perdedor foi desfeito
+
+
+async def test_concurrent_retries_create_one_order(client, db, menu_item):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    responses = await asyncio.gather(*(
+        client.post("/api/orders", json=_order_payload(menu_item.id), headers=headers)
+        for _ in range(4)
+    ))
+
+    assert [r.status_code for r in responses] == [201] * 4
+    assert len({r.json()["id"] for r in responses}) == 1
+    assert sum("Idempotent-Replayed" not in r.headers for r in responses) == 1
+    assert await _count_orders(db) == 1
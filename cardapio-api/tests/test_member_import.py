@@ -0,0 +1,92 @@
+"""Importação de membros em lote (user-024)."""
+import pytest
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.security import verify_password
+from app.models.member import Member
+from app.services import member_import_service
+
+pytestmark = pytest.mark.anyio
+
+IMPORT_URL = "/api/restaurant/members/import"
+
+PLANILHA = (
+    "\ufeffNome;E-mail;Senha;Telefone\n"
+    "Rita;rita@teste.com;segredo1;11999990000\n"
+    "Rita de novo;rita@teste.com;segredo2;\n"      # e-mail repetido no arquivo
+    "Sem senha;semsenha@teste.com;;\n"
+    "\n"
+    "Já existe;ana@teste.com;segredo3;\n"
+    "Saulo;saulo@teste.com;segredo4;\n"
+).encode("utf-8")
+
+
+@pytest.fixture
+async def existing_member(db):
+    db.add(Member(name="Ana", email="ana@teste.com", hashed_password="x"))
+    await db.commit()
+
+
+async def _members(db) -> dict[str, Member]:
+    db.expire_all()
+    return {m.email: m for m in (await db.execute(select(Member))).scalars()}
+
+
+async def test_csv_import_reports_each_row(client, db, admin_headers, existing_member):
+    response = await client.post(
+        IMPORT_URL, files={"file": ("membros.csv", PLANILHA, "text/csv")}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["total"], report["created"], report["failed"]) == (5, 2, 3)
+    assert [(r["row"], r["status"], r["error"]) for r in report["rows"]] == [
+        (2, "criado", None),
+        (3, "erro", "E-mail repetido no arquivo"),
+        (4, "erro", "Nome e senha são obrigatórios"),
+        (6, "erro", "E-mail já cadastrado"),
+        (7, "criado", None),
+    ]
+
+    members = await _members(db)
+    assert set(members) == {"ana@teste.com", "rita@teste.com", "saulo@teste.com"}
+    assert members["rita@teste.com"].phone == "11999990000"
+    assert verify_password("segredo4", members["saulo@teste.com"].hashed_password)
+
+
+async def test_dry_run_only_validates(client, db, admin_headers):
+    response = await client.post(
+        IMPORT_URL, params={"dry_run": "true"}, content=PLANILHA,
+        headers={**admin_headers, "Content-Type": "text/csv"},
+    )
+    report = response.json()
+    assert report["dry_run"] is True
+    assert [r["status"] for r in report["rows"]] == ["valido", "erro", "erro", "valido", "valido"]
+    assert await _members(db) == {}
+
+
+async def test_json_import(client, db, admin_headers):
+    response = await client.post(IMPORT_URL, json={"members": [
+        {"name": "Tom", "email": "tom@teste.com", "password": "abc123"},
+        {"name": "Sem arroba", "email": "invalido", "password": "abc123"},
+    ]}, headers=admin_headers)
+    report = response.json()
+    assert [(r["row"], r["status"]) for r in report["rows"]] == [(1, "criado"), (2, "erro")]
+    assert set(await _members(db)) == {"tom@teste.com"}
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"content": b"nome;email\nRita;rita@teste.com\n", "headers": {"Content-Type": "text/csv"}},
+    {"content": b"nao e json", "headers": {"Content-Type": "application/json"}},
+    {"json": {"members": "nada"}},
+])
+async def test_invalid_files_are_400(client, admin_headers, kwargs):
+    headers = {**admin_headers, **kwargs.pop("headers", {})}
+    assert (await client.post(IMPORT_URL, headers=headers, **kwargs)).status_code == 400
+
+
+def test_row_limit(monkeypatch):
+    monkeypatch.setattr(settings, "MEMBER_IMPORT_MAX_ROWS", 3)
+    rows = [{"name": "x", "email": f"{i}@t.com", "password": "x"} for i in range(4)]
+    assert len(member_import_service.parse_json(rows[:3])) == 3
+    with pytest.raises(member_import_service.MemberImportError, match="divida a planilha"):
+        member_import_service.parse_json(rows)
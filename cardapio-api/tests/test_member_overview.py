@@ -0,0 +1,74 @@
+"""Listagem dos membros com conta do mês e saldo devedor numa consulta (user-023)."""
+import uuid
+from datetime import datetime
+import pytest
+from app.models.member import Member, MemberTab
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def members(db):
+    """
+    Ana: mês atual 30 (pagou 10) + 5 de uma conta antiga -> deve 25.
+    Bia: sem contas. Caio (inativo): deve 50 de uma conta antiga. Duda: mês atual 12, quitado.
+    """
+    now = datetime.utcnow()
+    rows = []
+    for name, active, tabs in (
+        ("Ana", True, [(now.year, now.month, 30, 10), (2020, 1, 15, 10)]),
+        ("Bia", True, []),
+        ("Caio", False, [(2020, 1, 50, 0)]),
+        ("Duda", True, [(now.year, now.month, 12, 12)]),
+    ):
+        member = Member(
+            id=str(uuid.uuid4()), name=name, email=f"{name.lower()}@teste.com", hashed_password="x", is_active=active,
+        )
+        rows.append(member)
+        rows += [
+            MemberTab(id=str(uuid.uuid4()), member_id=member.id, year=year, month=month,
+                      total_consumed=consumed, total_paid=paid, status="aberta")
+            for year, month, consumed, paid in tabs
+        ]
+    db.add_all(rows)
+    await db.commit()
+
+
+async def _overview(client, headers, **params) -> dict:
+    response = await client.get("/api/restaurant/members/overview", params=params, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_overview_has_current_tab_and_outstanding_balance(client, admin_headers, members):
+    page = await _overview(client, admin_headers)
+    assert page["total"] == 4
+    by_name = {m["name"]: m for m in page["items"]}
+    assert (by_name["Ana"]["current_consumed"], by_name["Ana"]["current_paid"], by_name["Ana"]["outstanding"]) == (30, 10, 25)
+    assert by_name["Ana"]["current_tab_id"] is not None
+    assert (by_name["Bia"]["current_tab_id"], by_name["Bia"]["outstanding"]) == (None, 0)
+    assert (by_name["Caio"]["current_consumed"], by_name["Caio"]["outstanding"]) == (0, 50)
+    assert (by_name["Duda"]["current_status"], by_name["Duda"]["outstanding"]) == ("aberta", 0)
+
+
+@pytest.mark.parametrize("sort,expected", [
+    ("name", ["Ana", "Bia", "Caio", "Duda"]),
+    ("balance", ["Caio", "Ana", "Bia", "Duda"]),
+    ("current", ["Ana", "Duda", "Bia", "Caio"]),
+])
+async def test_overview_sorting(client, admin_headers, members, sort, expected):
+    page = await _overview(client, admin_headers, sort=sort)
+    assert [m["name"] for m in page["items"]] == expected
+
+
+async def test_overview_pages_and_filter(client, admin_headers, members):
+    first = await _overview(client, admin_headers, limit=2)
+    second = await _overview(client, admin_headers, limit=2, offset=2)
+    assert [m["name"] for m in first["items"] + second["items"]] == ["Ana", "Bia", "Caio", "Duda"]
+    assert first["total"] == second["total"] == 4
+
+    beyond = await _overview(client, admin_headers, limit=2, offset=10)
+    assert (beyond["total"], beyond["items"]) == (4, [])
+
+    inactive = await _overview(client, admin_headers, is_active="false")
+    assert (inactive["total"], [m["name"] for m in inactive["items"]]) == (1, ["Caio"])
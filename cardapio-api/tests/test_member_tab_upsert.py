@@ -0,0 +1,56 @@
+"""Conta mensal do membro: add_to_tab cria ou soma com um único UPSERT (user-005)."""
+import asyncio
+import pytest
+from sqlalchemy import select
+from app.crud import crud_member
+from app.db.session import AsyncSessionLocal
+from app.models.member import MemberTab
+
+pytestmark = pytest.mark.anyio
+
+
+async def _order_on_tab(member_id: str, amount: float) -> str:
+    # Cada pedido na sua própria sessão/transação, como requisições simultâneas
+    async with AsyncSessionLocal() as session:
+        tab_id = await crud_member.add_to_tab(session, member_id, amount)
+        await session.commit()
+        return tab_id
+
+
+async def test_first_orders_of_the_month_create_a_single_tab(db, member_row):
+    amounts = [10, 12.5, 7, 30, 0.5, 20, 15, 8]
+    tab_ids = await asyncio.gather(*(_order_on_tab(member_row.id, a) for a in amounts))
+
+    assert len(set(tab_ids)) == 1
+    tabs = (await db.execute(select(MemberTab).where(MemberTab.member_id == member_row.id))).scalars().all()
+    assert len(tabs) == 1
+    assert float(tabs[0].total_consumed) == sum(amounts)
+    assert tabs[0].status == "aberta"
+
+
+async def test_new_order_reopens_a_settled_tab(db, member_row):
+    tab_id = await _order_on_tab(member_row.id, 20)
+    tab = await db.get(MemberTab, tab_id)
+    tab.total_paid, tab.status = 20, "paga"
+    await db.commit()
+
+    assert await _order_on_tab(member_row.id, 5) == tab_id
+    await db.refresh(tab)
+    assert float(tab.total_consumed) == 25
+    assert tab.status == "parcial"
+
+
+async def test_order_on_tab_accrues_in_the_same_transaction(client, db, menu_item, member_row):
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-1",
+        "table_number": 3,
+        "customer_name": "Ana",
+        "member_id": member_row.id,
+        "payment_method": "conta",
+        "items": [{"item_id": menu_item.id, "quantity": 3}],
+    })
+    assert response.status_code == 201
+    assert response.json()["status"] == "conta"
+
+    tab = (await db.execute(select(MemberTab).where(MemberTab.member_id == member_row.id))).scalar_one()
+    assert float(tab.total_consumed) == 24  # preço de membro
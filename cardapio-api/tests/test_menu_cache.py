@@ -0,0 +1,25 @@
+"""Snapshot do cardápio público descartado pelas escritas do admin (user-003)."""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _menu(client) -> dict[str, list[dict]]:
+    response = await client.get("/api/menu")
+    assert response.status_code == 200
+    return {c["name"]: c["items"] for c in response.json()}
+
+
+async def test_admin_writes_replace_the_cached_menu(client, admin_headers, menu_item):
+    assert (await _menu(client))["Lanches"][0]["effective_price"] == 10  # snapshot em memória
+
+    response = await client.put(f"/api/items/{menu_item.id}", json={"price": 12}, headers=admin_headers)
+    assert response.status_code == 200
+    assert (await _menu(client))["Lanches"][0]["effective_price"] == 12
+
+    response = await client.post("/api/categories", json={"name": "Bebidas", "active": True}, headers=admin_headers)
+    assert response.status_code == 201
+    assert "Bebidas" in await _menu(client)
+
+    assert (await client.delete(f"/api/items/{menu_item.id}", headers=admin_headers)).status_code == 204
+    assert (await _menu(client))["Lanches"] == []
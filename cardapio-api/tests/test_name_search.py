@@ -0,0 +1,84 @@
+"""Busca de membros e pedidos por nome com pg_trgm (user-019)."""
+import uuid
+import pytest
+from app.db import search
+from app.db.search import like_pattern, supports_trigram
+from app.models.member import Member
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def trigram(db) -> None:
+    """Para os testes que dependem de pg_trgm (tolerância a erros de digitação)."""
+    if not await supports_trigram(db):
+        pytest.skip("pg_trgm não instalada neste Postgres")
+
+
+@pytest.fixture
+def without_trigram(db, monkeypatch):
+    """Busca como num Postgres sem a extensão."""
+    monkeypatch.setattr(search, "_trigram_by_url", {str(db.get_bind().url): False})
+
+
+@pytest.fixture
+async def members(db) -> dict[str, Member]:
+    rows = {
+        name: Member(id=str(uuid.uuid4()), name=name, email=email, hashed_password="x")
+        for name, email in (
+            ("Mariana Souza", "mari@teste.com"),
+            ("Mario Andrade", "mario@teste.com"),
+            ("João Pereira", "joao.100%@teste.com"),
+        )
+    }
+    db.add_all(rows.values())
+    await db.commit()
+    return rows
+
+
+async def _search(client, headers, path: str, q: str, **params) -> list[dict]:
+    response = await client.get(f"/api/restaurant/{path}/search", params={"q": q, **params}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_like_wildcards_in_the_term_are_escaped():
+    assert like_pattern("100%_a\\b") == "%100\\%\\_a\\\\b%"
+
+
+async def test_member_search_ranks_by_similarity_and_tolerates_typos(client, admin_headers, members, trigram):
+    found = await _search(client, admin_headers, "members", "Mariana Sousa")  # erro de digitação
+    assert found[0]["name"] == "Mariana Souza"
+
+    by_email = await _search(client, admin_headers, "members", "mario@")
+    assert [m["name"] for m in by_email][0] == "Mario Andrade"
+
+    page = await _search(client, admin_headers, "members", "Mari", limit=1, offset=1)
+    assert len(page) == 1
+
+
+async def test_wildcards_do_not_match_everything(client, admin_headers, members):
+    found = await _search(client, admin_headers, "members", "0%")
+    assert [m["name"] for m in found] == ["João Pereira"]
+
+
+async def test_order_search_by_customer_name(client, admin_headers, menu_item, trigram):
+    for name in ("Beatriz Lima", "Bernardo", "Carla"):
+        await client.post("/api/orders", json={
+            "session_id": "sessao-busca", "table_number": 1, "customer_name": name,
+            "payment_method": "pix", "items": [{"item_id": menu_item.id, "quantity": 1}],
+        })
+    found = await _search(client, admin_headers, "orders", "beatris")
+    assert [o["customer_name"] for o in found][0] == "Beatriz Lima"
+    assert "Carla" not in {o["customer_name"] for o in found}
+
+
+async def test_search_requires_a_term(client, admin_headers):
+    response = await client.get("/api/restaurant/members/search", params={"q": "a"}, headers=admin_headers)
+    assert response.status_code == 422
+
+
+async def test_without_the_extension_search_falls_back_to_contains(client, admin_headers, members, without_trigram):
+    found = await _search(client, admin_headers, "members", "mari")
+    assert sorted(m["name"] for m in found) == ["Mariana Souza", "Mario Andrade"]
+    assert await _search(client, admin_headers, "members", "Mariana Sousa") == []  # sem tolerância a erros
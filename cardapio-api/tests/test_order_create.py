@@ -0,0 +1,82 @@
+"""Criação do pedido e dos itens num único INSERT (user-004)."""
+import uuid
+import pytest
+from sqlalchemy import event, func, select
+from app.db.session import engine
+from app.models.item import Item
+from app.models.order import Order, OrderItem
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def statements():
+    """SQL enviado ao banco durante o teste."""
+    sent: list[str] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield sent
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+async def test_order_and_items_are_inserted_in_one_statement(client, db, menu_item, statements):
+    soda = Item(id=str(uuid.uuid4()), category_id=menu_item.category_id, name="Refri", price=5.5, active=True)
+    db.add(soda)
+    await db.commit()
+    statements.clear()
+
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-1",
+        "table_number": 7,
+        "customer_name": "Duda",
+        "payment_method": "pix",
+        "items": [{"item_id": menu_item.id, "quantity": 2}, {"item_id": soda.id, "quantity": 3}],
+    })
+    assert response.status_code == 201
+    order = response.json()
+
+    # Só os INSERTs do pedido em si (outras tabelas, como os rollups, podem ser gravadas na mesma transação)
+    inserts = [s for s in statements if "INSERT INTO orders " in s or "INSERT INTO order_items " in s]
+    assert len(inserts) == 1
+    assert "orders" in inserts[0] and "order_items" in inserts[0]
+
+    assert float(order["total"]) == 2 * 10 + 3 * 5.5
+    assert order["status"] == "aguardando_pagamento"
+    assert order["pix_payload"]
+    assert sorted((i["item_name"], i["quantity"], float(i["unit_price"])) for i in order["items"]) == [
+        ("Refri", 3, 5.5), ("X-Burguer", 2, 10.0),
+    ]
+
+    # A resposta montada em memória bate com o que foi gravado
+    stored = await db.get(Order, order["id"])
+    assert float(stored.total) == float(order["total"])
+    rows = (await db.execute(select(func.count()).where(OrderItem.order_id == order["id"]))).scalar_one()
+    assert rows == 2
+
+
+async def test_member_pays_member_price(client, menu_item, member_row):
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-1",
+        "table_number": 1,
+        "customer_name": "Ana",
+        "member_id": member_row.id,
+        "payment_method": "pix",
+        "items": [{"item_id": menu_item.id, "quantity": 2}],
+    })
+    assert response.status_code == 201
+    assert float(response.json()["total"]) == 16
+    assert float(response.json()["items"][0]["unit_price"]) == 8
+
+
+async def test_unknown_item_is_404(client, menu_item):
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-1",
+        "table_number": 1,
+        "customer_name": "Ana",
+        "payment_method": "pix",
+        "items": [{"item_id": "nao-existe", "quantity": 1}],
+    })
+    assert response.status_code == 404
@@ -0,0 +1,66 @@
+"""ETag fraco e 304 no acompanhamento de pedidos (user-011)."""
+import pytest
+from app.api.http_cache import etag_matches, weak_etag
+
+pytestmark = pytest.mark.anyio
+
+
+async def _create_order(client, item_id: str, session_id: str = "sessao-etag") -> dict:
+    response = await client.post("/api/orders", json={
+        "session_id": session_id,
+        "table_number": 5,
+        "customer_name": "Eva",
+        "payment_method": "pix",
+        "items": [{"item_id": item_id, "quantity": 1}],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_etag_matching_is_weak_and_accepts_lists():
+    etag = weak_etag("2026-01-01T12:00:00", 3)
+    assert etag == 'W/"2026-01-01T12:00:00-3"'
+    assert etag_matches(etag, etag)
+    assert etag_matches('"2026-01-01T12:00:00-3"', etag)
+    assert etag_matches('W/"outro", ' + etag, etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('W/"outro"', etag)
+
+
+async def test_order_poll_returns_304_until_the_order_changes(client, menu_item):
+    order = await _create_order(client, menu_item.id)
+    url = f"/api/orders/{order['id']}"
+
+    first = await client.get(url)
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "no-cache"
+    etag = first.headers["etag"]
+
+    cached = await client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+    await client.patch(f"{url}/status", json={"status": "em_preparacao"})
+    changed = await client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["status"] == "em_preparacao"
+    assert changed.headers["etag"] != etag
+
+
+async def test_session_poll_changes_when_an_order_is_added(client, menu_item):
+    await _create_order(client, menu_item.id)
+    url = "/api/orders/session/sessao-etag"
+
+    etag = (await client.get(url)).headers["etag"]
+    assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+
+    await _create_order(client, menu_item.id)
+    changed = await client.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert len(changed.json()) == 2
+
+
+async def test_unknown_order_is_404(client):
+    assert (await client.get("/api/orders/nao-existe")).status_code == 404
@@ -0,0 +1,87 @@
+"""Eventos de pedido por WebSocket para o painel e para os clientes inscritos (user-010)."""
+import json
+import pytest
+from app.services.notification_service import manager, subscriptions
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeWebSocket:
+    """Guarda as mensagens enviadas; `broken` simula uma conexão que caiu."""
+
+    def __init__(self, broken: bool = False):
+        self.broken = broken
+        self.messages: list[dict] = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        if self.broken:
+            raise RuntimeError("conexão fechada")
+        self.messages.append(json.loads(text))
+
+
+@pytest.fixture
+async def subscribe():
+    """Inscreve sockets falsos e os remove ao fim do teste."""
+    subscribed: list[tuple[FakeWebSocket, str]] = []
+
+    async def _subscribe(topic: str, broken: bool = False) -> FakeWebSocket:
+        websocket = FakeWebSocket(broken)
+        await subscriptions.connect(websocket, topic)
+        subscribed.append((websocket, topic))
+        return websocket
+
+    yield _subscribe
+    for websocket, topic in subscribed:
+        subscriptions.disconnect(websocket, topic)
+
+
+async def test_customers_receive_only_their_order_events(client, menu_item, subscribe):
+    session_socket = await subscribe("session:sessao-ws")
+    panel = FakeWebSocket()
+    await manager.connect(panel)
+    try:
+        order = (await client.post("/api/orders", json={
+            "session_id": "sessao-ws",
+            "table_number": 3,
+            "customer_name": "Duda",
+            "payment_method": "pix",
+            "items": [{"item_id": menu_item.id, "quantity": 1}],
+        })).json()
+        order_socket = await subscribe(f"order:{order['id']}")
+        other_order = await subscribe("order:outro-pedido")
+
+        await client.patch(f"/api/orders/{order['id']}/status", json={"status": "em_preparacao"})
+    finally:
+        manager.disconnect(panel)
+
+    assert [m["event"] for m in session_socket.messages] == ["novo_pedido", "status_atualizado"]
+    assert order_socket.messages == [{
+        "event": "status_atualizado",
+        "data": {
+            "order_id": order["id"],
+            "session_id": "sessao-ws",
+            "status": "em_preparacao",
+            "updated_at": order_socket.messages[0]["data"]["updated_at"],
+        },
+    }]
+    assert other_order.messages == []
+
+    # O painel continua recebendo os dados completos
+    assert panel.messages[-1]["data"]["customer_name"] == "Duda"
+
+
+async def test_broken_connection_is_dropped(subscribe):
+    healthy = await subscribe("order:x")
+    await subscribe("order:x", broken=True)
+
+    await subscriptions.publish("order:x", "status_atualizado", {"status": "pronto"})
+    assert len(subscriptions.subscriptions["order:x"]) == 1
+    assert healthy.messages == [{"event": "status_atualizado", "data": {"status": "pronto"}}]
+
+
+async def test_publish_without_subscribers_is_a_noop():
+    await subscriptions.publish("order:ninguem", "status_atualizado", {})
+    assert "order:ninguem" not in subscriptions.subscriptions
@@ -0,0 +1,73 @@
+"""Exportação de pedidos e itens em CSV/XLSX (user-017)."""
+import csv
+import io
+import uuid
+from datetime import date, datetime
+import pytest
+from sqlalchemy import update
+from app.crud import crud_order
+from app.models.item import Item
+from app.models.order import Order
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def exported_orders(client, db, menu_item, member_row) -> list[str]:
+    """Um pedido de membro com dois itens em 10/02 e um anônimo em 11/02."""
+    suco = Item(id=str(uuid.uuid4()), category_id=menu_item.category_id, name="Suco; laranja", price=5.5, active=True)
+    db.add(suco)
+    await db.commit()
+
+    ids = []
+    for day, extra, items in (
+        (10, {"member_id": member_row.id, "payment_method": "conta"},
+         [{"item_id": menu_item.id, "quantity": 2}, {"item_id": suco.id, "quantity": 1}]),
+        (11, {"payment_method": "pix"}, [{"item_id": suco.id, "quantity": 3}]),
+    ):
+        order = (await client.post("/api/orders", json={
+            "session_id": "sessao-export", "table_number": day, "customer_name": "Téo", "items": items, **extra,
+        })).json()
+        await db.execute(update(Order).where(Order.id == order["id"]).values(created_at=datetime(2026, 2, day, 23, 30)))
+        ids.append(order["id"])
+    await db.commit()
+    return ids
+
+
+async def test_csv_opens_in_excel_pt_br(client, admin_headers, exported_orders):
+    response = await client.get(
+        "/api/restaurant/export", params={"start_date": "2026-02-10", "end_date": "2026-02-10"}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="pedidos_2026-02-10_2026-02-10.csv"' in response.headers["content-disposition"]
+    assert response.content.startswith("\ufeff".encode("utf-8"))
+
+    header, *rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig")), delimiter=";"))
+    assert header[:3] == ["pedido_id", "data_utc", "mesa"]
+    assert {row[0] for row in rows} == {exported_orders[0]}  # o dia 11 fica fora (período semiaberto)
+    by_item = {row[8]: row for row in rows}
+    assert by_item["X-Burguer"][4] == "Ana"
+    assert by_item["X-Burguer"][9:] == ["2", "8,00", "16,00"]  # preço de membro
+    assert by_item["Suco; laranja"][11] == "5,50"              # separador dentro do campo fica entre aspas
+    assert by_item["Suco; laranja"][7] == "21,50"
+
+
+async def test_xlsx_has_numeric_cells(client, admin_headers, exported_orders):
+    openpyxl = pytest.importorskip("openpyxl")
+    response = await client.get("/api/restaurant/export", params={"formato": "xlsx"}, headers=admin_headers)
+    assert response.status_code == 200
+
+    sheet = openpyxl.load_workbook(io.BytesIO(response.content)).active
+    header, *rows = list(sheet.iter_rows(values_only=True))
+    assert header[0] == "pedido_id"
+    assert len(rows) == 3
+    assert [row[0] for row in rows] == [exported_orders[0]] * 2 + [exported_orders[1]]
+    assert rows[-1][9:] == (3, 5.5, 16.5)
+
+
+async def test_export_reads_in_batches(db, exported_orders):
+    batches = [
+        batch async for batch in crud_order.stream_export_batches(db, date(2026, 2, 1), None, batch_size=2)
+    ]
+    assert [len(batch) for batch in batches] == [2, 1]
@@ -0,0 +1,74 @@
+"""Histórico paginado por keyset e exportação em NDJSON (user-016)."""
+import json
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app.models.order import Order
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def history(client, db, menu_item) -> list[str]:
+    """Sete pedidos, três com o mesmo created_at; devolve os ids na ordem esperada do histórico."""
+    ids = []
+    for n in range(7):
+        response = await client.post("/api/orders", json={
+            "session_id": "sessao-historico",
+            "table_number": n + 1,
+            "customer_name": f"Cliente {n}",
+            "payment_method": "pix",
+            "items": [{"item_id": menu_item.id, "quantity": 1}],
+        })
+        ids.append(response.json()["id"])
+
+    base = datetime(2026, 2, 10, 20, 0)
+    created = {order_id: base + timedelta(minutes=n) for n, order_id in enumerate(ids)}
+    for order_id in ids[2:5]:
+        created[order_id] = base + timedelta(minutes=2)  # empate no created_at
+    for order_id, created_at in created.items():
+        await db.execute(update(Order).where(Order.id == order_id).values(created_at=created_at))
+    await db.commit()
+    return sorted(ids, key=lambda i: (created[i], i), reverse=True)
+
+
+async def test_pages_cover_history_once_in_order(client, admin_headers, history):
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = await client.get("/api/restaurant/history", params=params, headers=admin_headers)
+        assert page.status_code == 200
+        seen += [o["id"] for o in page.json()]
+        cursor = page.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == history
+
+
+async def test_filters_apply_to_pages(client, admin_headers, history):
+    page = await client.get(
+        "/api/restaurant/history",
+        params={"start_date": "2026-02-10", "end_date": "2026-02-10", "customer_name": "cliente 6"},
+        headers=admin_headers,
+    )
+    assert [o["id"] for o in page.json()] == [history[0]]
+    assert "X-Next-Cursor" not in page.headers
+
+    other_day = await client.get("/api/restaurant/history", params={"start_date": "2026-02-11"}, headers=admin_headers)
+    assert other_day.json() == []
+
+
+async def test_ndjson_streams_the_whole_range(client, admin_headers, history):
+    response = await client.get(
+        "/api/restaurant/history", params={"formato": "ndjson", "limit": 2}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == history
+    assert rows[0]["items"][0]["quantity"] == 1
+
+
+async def test_invalid_cursor_is_400(client, admin_headers):
+    response = await client.get("/api/restaurant/history", params={"cursor": "nao-e-cursor"}, headers=admin_headers)
+    assert response.status_code == 400
@@ -0,0 +1,94 @@
+"""Transições de status num único UPDATE condicional (user-009)."""
+import asyncio
+import pytest
+from app.crud import crud_order
+from app.db.session import AsyncSessionLocal
+
+pytestmark = pytest.mark.anyio
+
+
+async def _create_order(client, item_id: str) -> dict:
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-1",
+        "table_number": 2,
+        "customer_name": "Caio",
+        "payment_method": "pix",
+        "items": [{"item_id": item_id, "quantity": 1}],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+async def _patch_status(client, order_id: str, status: str):
+    return await client.patch(f"/api/orders/{order_id}/status", json={"status": status})
+
+
+async def test_disallowed_transition_is_rejected_with_409(client, menu_item):
+    order = await _create_order(client, menu_item.id)
+    assert order["status"] == "aguardando_pagamento"
+
+    response = await _patch_status(client, order["id"], "entregue")
+    assert response.status_code == 409
+    assert "aguardando_pagamento" in response.json()["detail"]
+
+    unchanged = await client.get(f"/api/orders/{order['id']}")
+    assert unchanged.json()["status"] == "aguardando_pagamento"
+
+
+async def test_final_status_cannot_change(client, menu_item):
+    order = await _create_order(client, menu_item.id)
+    assert (await _patch_status(client, order["id"], "cancelado")).status_code == 200
+    assert (await _patch_status(client, order["id"], "em_preparacao")).status_code == 409
+
+
+async def test_unknown_order_is_404(client):
+    assert (await _patch_status(client, "nao-existe", "em_preparacao")).status_code == 404
+
+
+async def test_only_one_of_two_concurrent_transitions_wins(client, menu_item):
+    order = await _create_order(client, menu_item.id)
+    for status in ("em_preparacao", "pronto"):
+        assert (await _patch_status(client, order["id"], status)).status_code == 200
+
+    # Dois atendentes ao mesmo tempo: um entrega, outro cancela
+    delivered, cancelled = await asyncio.gather(
+        _patch_status(client, order["id"], "entregue"),
+        _patch_status(client, order["id"], "cancelado"),
+    )
+    codes = sorted([delivered.status_code, cancelled.status_code])
+    assert codes == [200, 409]
+
+    winner = delivered if delivered.status_code == 200 else cancelled
+    final = await client.get(f"/api/orders/{order['id']}")
+    assert final.json()["status"] == winner.json()["status"]
+
+
+async def test_waiting_transition_rechecks_status_after_the_lock(client, menu_item):
+    """Transação B espera o lock da A; quando A confirma, o UPDATE de B já não encontra a origem."""
+    order = await _create_order(client, menu_item.id)
+    for status in ("em_preparacao", "pronto"):
+        await _patch_status(client, order["id"], status)
+
+    async with AsyncSessionLocal() as first, AsyncSessionLocal() as second:
+        delivered = await crud_order.update_status(first, order["id"], "entregue", commit=False)
+        assert delivered.status == "entregue"
+
+        cancel = asyncio.create_task(crud_order.update_status(second, order["id"], "cancelado"))
+        await asyncio.sleep(0.2)
+        assert not cancel.done()  # bloqueada no lock da linha
+
+        await first.commit()
+        assert await cancel is None
+        assert await crud_order.get_status(second, order["id"]) == "entregue"
+
+
+async def test_declare_payment_only_from_awaiting_payment(client, menu_item):
+    order = await _create_order(client, menu_item.id)
+    declared = await client.post(f"/api/orders/{order['id']}/declare-payment")
+    assert declared.status_code == 200
+    assert declared.json()["status"] == "pagamento_declarado"
+
+    again = await client.post(f"/api/orders/{order['id']}/declare-payment")
+    assert again.status_code == 400
+    assert again.json()["detail"] == "Pedido não está aguardando pagamento"
+    assert (await client.post("/api/orders/nao-existe/declare-payment")).status_code == 404
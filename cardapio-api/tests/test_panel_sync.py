@@ -0,0 +1,77 @@
+"""Sincronização incremental do painel por cursor (user-012)."""
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import update
+from app.models.order import Order
+
+pytestmark = pytest.mark.anyio
+
+
+async def _create_order(client, item_id: str, customer_name: str) -> dict:
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-painel",
+        "table_number": 7,
+        "customer_name": customer_name,
+        "payment_method": "pix",
+        "items": [{"item_id": item_id, "quantity": 1}],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+async def _age_orders(db) -> None:
+    """Empurra todos os pedidos uma hora para trás, para fora da janela de sobreposição."""
+    await db.execute(update(Order).values(updated_at=Order.updated_at - timedelta(hours=1)))
+    await db.commit()
+
+
+async def test_panel_requires_login(client):
+    assert (await client.get("/api/restaurant/orders")).status_code == 401
+
+
+async def test_full_list_sends_cursor_and_delta_returns_only_changes(client, db, menu_item, admin_headers):
+    first = await _create_order(client, menu_item.id, "Fabi")
+    second = await _create_order(client, menu_item.id, "Gil")
+    delivered = await _create_order(client, menu_item.id, "Hugo")
+    await _age_orders(db)
+    recent = await _create_order(client, menu_item.id, "Kika")
+
+    full = await client.get("/api/restaurant/orders", headers=admin_headers)
+    assert full.status_code == 200
+    assert {o["id"] for o in full.json()} == {first["id"], second["id"], delivered["id"], recent["id"]}
+    cursor = full.headers["X-Sync-Cursor"]
+
+    # Nada mudou: só o pedido dentro da janela de sobreposição volta, cursor mantido
+    unchanged = (await client.get("/api/restaurant/orders", params={"since": cursor}, headers=admin_headers)).json()
+    assert [o["id"] for o in unchanged["orders"]] == [recent["id"]]
+    assert unchanged["removed"] == []
+    assert unchanged["cursor"] == cursor
+
+    await client.patch(f"/api/orders/{second['id']}/status", json={"status": "em_preparacao"})
+    for status in ("em_preparacao", "pronto", "entregue"):
+        await client.patch(f"/api/orders/{delivered['id']}/status", json={"status": status})
+    new = await _create_order(client, menu_item.id, "Iara")
+
+    delta = (await client.get("/api/restaurant/orders", params={"since": cursor}, headers=admin_headers)).json()
+    assert {o["id"]: o["status"] for o in delta["orders"]} == {
+        second["id"]: "em_preparacao",
+        recent["id"]: "aguardando_pagamento",
+        new["id"]: "aguardando_pagamento",
+    }
+    assert delta["removed"] == [delivered["id"]]
+    assert delta["cursor"] > cursor
+
+
+async def test_delta_converts_cursor_with_timezone_to_utc(client, db, menu_item, admin_headers):
+    await _create_order(client, menu_item.id, "Juca")
+    cursor = datetime.fromisoformat(
+        (await client.get("/api/restaurant/orders", headers=admin_headers)).headers["X-Sync-Cursor"]
+    )
+
+    # 10 s depois do cursor, em horário de Brasília: o pedido fica fora da janela de 5 s.
+    # Se o fuso fosse ignorado, o cursor cairia 3 h antes e o pedido voltaria.
+    brasilia = timezone(timedelta(hours=-3))
+    since = (cursor + timedelta(seconds=10)).replace(tzinfo=timezone.utc).astimezone(brasilia)
+    delta = await client.get("/api/restaurant/orders", params={"since": since.isoformat()}, headers=admin_headers)
+    assert delta.status_code == 200
+    assert delta.json()["orders"] == []
@@ -0,0 +1,55 @@
+"""bcrypt de login/cadastro fora do event loop, com fila limitada (user-025)."""
+import asyncio
+import time
+import pytest
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.services.password_service import PasswordExecutor, PasswordQueueFull, password_executor
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_hash_and_verify_round_trip():
+    executor = PasswordExecutor(max_workers=2, max_pending=4)
+    try:
+        hashed = await executor.hash("segredo")
+        assert await executor.verify("segredo", hashed)
+        assert not await executor.verify("outra", hashed)
+    finally:
+        executor.shutdown()
+    assert executor.stats()["completed"] == 3
+
+
+async def test_operations_beyond_the_limit_are_rejected():
+    executor = PasswordExecutor(max_workers=1, max_pending=2)
+    try:
+        results = await asyncio.gather(
+            *(executor._run(time.sleep, 0.1) for _ in range(3)), return_exceptions=True
+        )
+    finally:
+        executor.shutdown()
+
+    assert sum(isinstance(r, PasswordQueueFull) for r in results) == 1
+    stats = executor.stats()
+    assert (stats["completed"], stats["rejected"], stats["peak_pending"]) == (2, 1, 2)
+    assert (stats["running"], stats["queued"]) == (0, 0)
+    assert stats["avg_wait_ms"] > 0  # a segunda esperou a primeira (1 thread)
+
+
+async def test_login_uses_the_executor_and_full_queue_is_503(client, db, admin_headers, monkeypatch):
+    db.add(User(username="caixa", hashed_password=get_password_hash("senha-caixa")))
+    await db.commit()
+    form = {"username": "caixa", "password": "senha-caixa"}
+
+    ok = await client.post("/api/auth/login", data=form)
+    assert ok.status_code == 200 and ok.json()["access_token"]
+    wrong = await client.post("/api/auth/login", data={**form, "password": "errada"})
+    assert wrong.status_code == 401
+
+    monkeypatch.setattr(password_executor, "_max_pending", 0)
+    busy = await client.post("/api/auth/login", data=form)
+    assert busy.status_code == 503
+    assert busy.headers["Retry-After"] == "1"
+
+    metrics = (await client.get("/api/restaurant/metrics/passwords", headers=admin_headers)).json()
+    assert metrics["rejected"] >= 1 and metrics["completed"] >= 2
@@ -0,0 +1,100 @@
+"""
+PixEncoder (user-007) comparado com a implementação original, bit a bit.
+Não usa banco: roda sempre, mesmo sem TEST_DATABASE_URL.
+"""
+import uuid
+import pytest
+from app.services.pix_service import PixEncoder, _crc16_ccitt, _tlv, gerar_payload_pix
+from app.core.config import settings
+
+
+# ─── Implementação original (referência) ───────────────────────────────────────
+
+def _crc16_bitwise(data: str) -> str:
+    crc = 0xFFFF
+    for char in data:
+        crc ^= ord(char) << 8
+        for _ in range(8):
+            if crc & 0x8000:
+                crc = (crc << 1) ^ 0x1021
+            else:
+                crc <<= 1
+            crc &= 0xFFFF
+    return format(crc, "04X")
+
+
+def _payload_original(chave: str, nome: str, cidade: str, total: float, order_id: str) -> str:
+    merchant_account = _tlv("26", _tlv("00", "BR.GOV.BCB.PIX") + _tlv("01", chave[:77]))
+    txid = order_id.replace("-", "")[:25]
+    payload = (
+        "000201"
+        + "010212"
+        + merchant_account
+        + "52040000"
+        + "5303986"
+        + _tlv("54", f"{total:.2f}")
+        + "5802BR"
+        + _tlv("59", nome[:25])
+        + _tlv("60", cidade[:15])
+        + _tlv("62", _tlv("05", txid))
+        + "6304"
+    )
+    return payload + _crc16_bitwise(payload)
+
+
+# ─── Casos ────────────────────────────────────────────────────────────────────
+
+RECEBEDORES = [
+    ("chave@restaurante.com.br", "Restaurante", "Sao Paulo"),
+    ("+5511999998888", "Café São João Ação", "São Paulo"),             # acentos
+    ("a" * 90, "N" * 40, "C" * 30),                                     # acima dos limites (77/25/15)
+    ("x" * 77, "N" * 25, "C" * 15),                                     # exatamente nos limites
+    ("123e4567-e89b-12d3-a456-426614174000", "Açaí & Pão — Ñandú ☕", "Brasília"),
+]
+
+COBRANCAS = [
+    (0.0, "1"),
+    (0.01, str(uuid.UUID(int=0))),
+    (10.0, "pedido-1"),
+    (42.5, "CONTA-ABCDEF12"),
+    (1234.567, "f" * 40),                                                 # txid truncado em 25
+    (99999.99, "-" * 10 + "abc"),
+    (7.005, str(uuid.uuid4())),
+]
+
+
+@pytest.mark.parametrize("chave,nome,cidade", RECEBEDORES)
+def test_payload_matches_original_implementation(chave, nome, cidade):
+    encoder = PixEncoder(chave, nome, cidade)
+    for total, order_id in COBRANCAS:
+        assert encoder.payload(total, order_id) == _payload_original(chave, nome, cidade, total, order_id)
+
+
+@pytest.mark.parametrize("chave,nome,cidade", RECEBEDORES)
+def test_batch_matches_single_payloads(chave, nome, cidade):
+    encoder = PixEncoder(chave, nome, cidade)
+    assert encoder.payloads(COBRANCAS) == [encoder.payload(t, o) for t, o in COBRANCAS]
+
+
+@pytest.mark.parametrize("data", [
+    "",
+    "A",
+    "123456789",
+    "0002010102122633",
+    "Ação ñ ☕ 𝄞",
+    "".join(chr(c) for c in range(256)),
+])
+def test_table_crc_matches_bitwise_crc(data):
+    assert _crc16_ccitt(data) == _crc16_bitwise(data)
+
+
+def test_known_crc_value():
+    # CRC16-CCITT-FALSE de "123456789" (valor de verificação da especificação)
+    assert _crc16_ccitt("123456789") == "29B1"
+
+
+def test_module_helper_uses_settings():
+    expected = _payload_original(
+        settings.PIX_KEY, settings.RESTAURANT_NAME, settings.RESTAURANT_CITY, 35.9, "pedido-xyz"
+    )
+    assert gerar_payload_pix(35.9, "pedido-xyz") == expected
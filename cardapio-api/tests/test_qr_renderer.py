@@ -0,0 +1,88 @@
+"""QR Codes renderizados fora do event loop, com cache LRU (user-006)."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services import pix_service
+from app.services.pix_service import QrCodeRenderer
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Renderizador com threads no lugar do pool de processos, contando as renderizações."""
+    calls: list[str] = []
+    real_render = pix_service._render_qr
+
+    def counting_render(payload: str, formato: str) -> str:
+        calls.append(payload)
+        return real_render(payload, formato)
+
+    monkeypatch.setattr(pix_service, "_render_qr", counting_render)
+    executor = ThreadPoolExecutor(max_workers=2)
+    renderer = QrCodeRenderer(max_workers=2, cache_size=2)
+    monkeypatch.setattr(renderer, "_get_executor", lambda: executor)
+    yield renderer, calls
+    executor.shutdown()
+
+
+async def test_repeated_qr_is_served_from_cache(renders):
+    renderer, calls = renders
+    first = await renderer.render("payload-1", "svg")
+    second = await renderer.render("payload-1", "svg")
+    assert first == second
+    assert calls == ["payload-1"]
+
+    # Mesmo payload em outro formato é outra entrada
+    png = await renderer.render("payload-1", "png")
+    assert png.startswith("data:image/png;base64,")
+    assert calls == ["payload-1", "payload-1"]
+
+
+async def test_concurrent_requests_share_one_render(renders):
+    renderer, calls = renders
+    results = await asyncio.gather(*(renderer.render("payload-2", "svg") for _ in range(5)))
+    assert len(set(results)) == 1
+    assert calls == ["payload-2"]
+
+
+async def test_least_recently_used_entry_is_evicted(renders):
+    renderer, calls = renders
+    for payload in ("a", "b", "a", "c"):  # cache de 2: "b" é o menos usado quando "c" entra
+        await renderer.render(payload, "svg")
+    await renderer.render("a", "svg")
+    await renderer.render("b", "svg")
+    assert calls == ["a", "b", "c", "b"]
+
+
+async def test_invalid_format_is_rejected(renders):
+    renderer, _ = renders
+    with pytest.raises(ValueError):
+        await renderer.render("payload", "gif")
+
+
+async def test_process_pool_renders_svg():
+    renderer = QrCodeRenderer(max_workers=1, cache_size=4)
+    try:
+        svg = await renderer.render("00020101021126", "svg")
+    finally:
+        renderer.shutdown()
+    assert svg.startswith("<svg") and "<path" in svg
+
+
+async def test_order_qr_endpoint(client, menu_item):
+    order = (await client.post("/api/orders", json={
+        "session_id": "sessao-1",
+        "table_number": 1,
+        "customer_name": "Ana",
+        "payment_method": "pix",
+        "items": [{"item_id": menu_item.id, "quantity": 1}],
+    })).json()
+
+    svg = await client.get(f"/api/orders/{order['id']}/qr")
+    assert svg.status_code == 200
+    assert svg.headers["content-type"].startswith("image/svg+xml")
+
+    png = await client.get(f"/api/orders/{order['id']}/qr", params={"formato": "png"})
+    assert png.json()["qr_code_base64"].startswith("data:image/png;base64,")
+    assert (await client.get("/api/orders/nao-existe/qr")).status_code == 404
@@ -0,0 +1,151 @@
+"""Rollups de vendas atualizados com os pedidos e relatório lido só deles (user-018)."""
+import uuid
+from datetime import date, datetime
+import pytest
+from sqlalchemy import event, text, update
+from sqlalchemy.exc import DBAPIError
+from app.crud import crud_sales_rollup
+from app.crud.crud_sales_rollup import local_bucket
+from app.db.session import AsyncSessionLocal, engine
+from app.models.order import Order
+from app.schemas.order import OrderItemResponse, OrderResponse
+
+pytestmark = pytest.mark.anyio
+
+GROUPS = ("day", "hour", "payment_method", "item")
+
+
+async def _create_order(client, item_id: str, quantity: int, **extra) -> dict:
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-vendas",
+        "table_number": 1,
+        "customer_name": "Vera",
+        "payment_method": "pix",
+        "items": [{"item_id": item_id, "quantity": quantity}],
+        **extra,
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+async def _set_status(client, order_id: str, *statuses: str) -> None:
+    for status in statuses:
+        assert (await client.patch(f"/api/orders/{order_id}/status", json={"status": status})).status_code == 200
+
+
+async def _reports(client, headers) -> dict:
+    return {
+        group: (await client.get("/api/restaurant/analytics/sales", params={"group_by": group}, headers=headers)).json()
+        for group in GROUPS
+    }
+
+
+@pytest.fixture
+async def sales(client, menu_item, member_row):
+    """Pix entregue (2 × 10), pix cancelado (1 × 10) e conta de membro em aberto (3 × 8)."""
+    delivered = await _create_order(client, menu_item.id, 2)
+    await _set_status(client, delivered["id"], "em_preparacao", "pronto", "entregue")
+    cancelled = await _create_order(client, menu_item.id, 1)
+    await _set_status(client, cancelled["id"], "cancelado")
+    await _create_order(client, menu_item.id, 3, member_id=member_row.id, payment_method="conta")
+
+
+def test_bucket_uses_local_day_and_hour():
+    # 02:30 UTC ainda é o dia anterior em São Paulo (UTC-3)
+    assert local_bucket(datetime(2026, 2, 11, 2, 30)) == (date(2026, 2, 10), 23)
+
+
+async def test_report_is_net_of_cancellations(client, admin_headers, sales):
+    reports = await _reports(client, admin_headers)
+
+    totals = reports["day"]["totals"]
+    assert totals["orders"] == 2
+    assert totals["quantity"] == 5
+    assert totals["revenue"] == 44.0
+    assert totals["average_ticket"] == 22.0
+    assert (totals["cancelled_orders"], totals["cancelled_revenue"]) == (1, 10.0)
+
+    by_method = {b["key"]: b for b in reports["payment_method"]["buckets"]}
+    assert (by_method["pix"]["orders"], by_method["pix"]["revenue"]) == (1, 20.0)
+    assert (by_method["conta"]["orders"], by_method["conta"]["revenue"]) == (1, 24.0)
+
+    [item] = reports["item"]["buckets"]
+    assert (item["key"], item["quantity"], item["revenue"], item["orders"]) == ("X-Burguer", 5, 44.0, None)
+
+
+async def test_rebuild_matches_incremental_rollups(client, db, admin_headers, sales):
+    incremental = await _reports(client, admin_headers)
+    await crud_sales_rollup.rebuild(db)
+    assert await _reports(client, admin_headers) == incremental
+
+
+async def test_invalid_period_is_400(client, admin_headers):
+    response = await client.get(
+        "/api/restaurant/analytics/sales",
+        params={"start_date": "2026-02-10", "end_date": "2026-02-01"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 400
+
+
+async def test_rebuild_only_touches_the_requested_days(client, db, admin_headers, menu_item):
+    """Pedidos em dois dias locais; o rebuild de um dia não mexe no outro."""
+    for day in (10, 11):
+        order = await _create_order(client, menu_item.id, 1)
+        await db.execute(
+            update(Order).where(Order.id == order["id"]).values(created_at=datetime(2026, 2, day, 15, 0))
+        )
+    # Os rollups incrementais ficaram no dia de hoje; só o dia 10 é recalculado
+    await db.commit()
+    await crud_sales_rollup.rebuild(db, date(2026, 2, 10), date(2026, 2, 10))
+
+    params = {"start_date": "2026-02-10", "end_date": "2026-02-11", "group_by": "day"}
+    report = (await client.get("/api/restaurant/analytics/sales", params=params, headers=admin_headers)).json()
+    assert [(b["key"], b["orders"]) for b in report["buckets"]] == [("2026-02-10", 1)]
+
+
+def _order_at(placed_at: datetime, items: list[OrderItemResponse]) -> OrderResponse:
+    return OrderResponse(
+        id="p", session_id="s", table_number=1, customer_name="Zé", observations=None,
+        status="aguardando_pagamento", total=30, payment_method="pix", pix_payload=None,
+        created_at=placed_at, updated_at=placed_at, items=items,
+    )
+
+
+async def test_item_rows_are_written_in_item_id_order(db):
+    """Linhas do mesmo balde sempre na mesma ordem: pedidos concorrentes não se travam."""
+    ids = sorted(str(uuid.uuid4()) for _ in range(3))
+    order = _order_at(datetime(2026, 2, 10, 15), [
+        OrderItemResponse(id=str(n), item_id=item_id, item_name="x", quantity=1, unit_price=10)
+        for n, item_id in enumerate(reversed(ids))
+    ])
+    sent: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        sent.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await crud_sales_rollup.record(db, order, "placed")
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+        await db.rollback()
+
+    [item_params] = [params for statement, params in sent if "sales_item_rollups" in statement]
+    assert [value for value in item_params if value in ids] == ids
+
+
+async def test_rebuild_of_a_day_only_holds_that_day(database):
+    """Enquanto um dia é recalculado, pedidos de outro dia gravam; os do mesmo dia esperam."""
+    async with AsyncSessionLocal() as rebuilding, AsyncSessionLocal() as other_day, AsyncSessionLocal() as same_day:
+        await crud_sales_rollup._lock_day(rebuilding, date(2026, 2, 10), shared=False)
+        try:
+            await crud_sales_rollup.record(other_day, _order_at(datetime(2026, 2, 11, 15), []), "placed")
+            await other_day.commit()
+
+            await same_day.execute(text("SET LOCAL lock_timeout = '200ms'"))
+            with pytest.raises(DBAPIError, match="lock timeout"):
+                await crud_sales_rollup.record(same_day, _order_at(datetime(2026, 2, 10, 15), []), "placed")
+            await same_day.rollback()
+        finally:
+            await rebuilding.rollback()
@@ -0,0 +1,127 @@
+"""Extrato da conta: pagamentos e ajustes aplicados por _apply_entry (user-021)."""
+import asyncio
+import uuid
+from datetime import datetime
+import pytest
+from app.crud import crud_member
+from app.db.session import AsyncSessionLocal
+from app.models.member import MemberTab
+from app.schemas.member import MemberTabAdjustment, MemberTabPayment
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def tab(db, member_row) -> MemberTab:
+    now = datetime.utcnow()
+    tab = MemberTab(
+        id=str(uuid.uuid4()), member_id=member_row.id, month=now.month, year=now.year,
+        total_consumed=50, total_paid=0, status="aberta",
+    )
+    db.add(tab)
+    await db.commit()
+    return tab
+
+
+def _pay(amount: float) -> MemberTabPayment:
+    return MemberTabPayment(amount=amount)
+
+
+def _adjust(amount: float) -> MemberTabAdjustment:
+    return MemberTabAdjustment(amount=amount, notes="ajuste de teste")
+
+
+async def test_payments_update_totals_and_status(db, tab):
+    partial = await crud_member.register_payment(db, tab.id, _pay(20), created_by="admin")
+    assert (float(partial.total_consumed), float(partial.total_paid)) == (50, 20)
+    assert partial.status == "parcial"
+    assert partial.closed_at is None
+
+    settled = await crud_member.register_payment(db, tab.id, _pay(30))
+    assert float(settled.total_paid) == 50
+    assert settled.status == "paga"
+    assert settled.closed_at is not None
+
+    entries = await crud_member.get_entries(db, tab.id)
+    assert [(e.kind, float(e.amount)) for e in entries] == [("pagamento", -20), ("pagamento", -30)]
+    assert entries[0].created_by == "admin"
+
+
+async def test_closed_at_keeps_the_original_settlement(db, tab):
+    settled = await crud_member.register_payment(db, tab.id, _pay(50))
+    settled_at = settled.closed_at
+
+    # Pagamento a mais e desconto numa conta já quitada não mudam a data da quitação
+    overpaid = await crud_member.register_payment(db, tab.id, _pay(5))
+    assert (overpaid.status, overpaid.closed_at) == ("paga", settled_at)
+    discounted = await crud_member.adjust_tab(db, tab.id, _adjust(-10))
+    assert (discounted.status, discounted.closed_at) == ("paga", settled_at)
+    assert float(discounted.total_consumed) == 40
+
+
+async def test_adjustment_reopens_and_new_settlement_is_recorded(db, tab):
+    settled = await crud_member.register_payment(db, tab.id, _pay(50))
+
+    reopened = await crud_member.adjust_tab(db, tab.id, _adjust(15))
+    assert float(reopened.total_consumed) == 65
+    assert reopened.status == "parcial"
+    assert reopened.closed_at is None
+
+    resettled = await crud_member.register_payment(db, tab.id, _pay(15))
+    assert resettled.status == "paga"
+    assert resettled.closed_at >= settled.closed_at
+
+
+async def test_adjustment_cannot_make_consumption_negative(db, tab):
+    assert await crud_member.adjust_tab(db, tab.id, _adjust(-60)) is None
+    await db.refresh(tab)
+    assert float(tab.total_consumed) == 50
+    assert await crud_member.get_entries(db, tab.id) == []
+
+
+async def test_unknown_tab_returns_none(db):
+    assert await crud_member.register_payment(db, "nao-existe", _pay(10)) is None
+
+
+async def test_concurrent_payments_are_not_lost(db, tab):
+    async def pay(amount: float):
+        async with AsyncSessionLocal() as session:
+            return await crud_member.register_payment(session, tab.id, _pay(amount))
+
+    await asyncio.gather(*(pay(5) for _ in range(6)))
+    await db.refresh(tab)
+    assert float(tab.total_paid) == 30
+    assert tab.status == "parcial"
+    assert len(await crud_member.get_entries(db, tab.id)) == 6
+
+
+async def test_statement_shows_entries_with_running_balance(client, db, menu_item, member_row, admin_headers):
+    await client.post("/api/orders", json={
+        "session_id": "sessao-extrato", "table_number": 1, "customer_name": "Ana", "member_id": member_row.id,
+        "payment_method": "conta", "items": [{"item_id": menu_item.id, "quantity": 3}],
+    })
+    tab = await crud_member.get_current_tab(db, member_row.id)
+    base = f"/api/restaurant/members/{member_row.id}/tabs/{tab.id}"
+
+    assert (await client.post(f"{base}/pay", json={"amount": 10}, headers=admin_headers)).status_code == 200
+    adjusted = await client.post(f"{base}/adjust", json={"amount": -4, "notes": "cortesia"}, headers=admin_headers)
+    assert adjusted.status_code == 200
+    refused = await client.post(f"{base}/adjust", json={"amount": -100, "notes": "erro"}, headers=admin_headers)
+    assert refused.status_code == 400
+
+    statement = (await client.get(f"{base}/statement", headers=admin_headers)).json()
+    assert [(e["kind"], e["amount"], e["balance_after"]) for e in statement["entries"]] == [
+        ("consumo", 24.0, 24.0), ("pagamento", -10.0, 14.0), ("ajuste", -4.0, 10.0),
+    ]
+    assert statement["balance"] == 10.0
+    assert statement["entries"][2]["created_by"] == "admin"
+
+
+async def test_new_order_on_settled_tab_clears_closed_at(client, db, menu_item, member_row, tab):
+    await crud_member.register_payment(db, tab.id, _pay(50))
+    await client.post("/api/orders", json={
+        "session_id": "sessao-reaberta", "table_number": 1, "customer_name": "Ana", "member_id": member_row.id,
+        "payment_method": "conta", "items": [{"item_id": menu_item.id, "quantity": 1}],
+    })
+    await db.refresh(tab)
+    assert (tab.status, tab.closed_at, float(tab.total_consumed)) == ("parcial", None, 58)
@@ -0,0 +1,53 @@
+"""Pedidos ligados à conta do membro por orders.tab_id (user-020)."""
+import pytest
+from sqlalchemy import select
+from app.core.security import create_access_token
+from app.crud import crud_member
+from app.models.order import Order
+
+pytestmark = pytest.mark.anyio
+
+
+async def _create_order(client, item_id: str, member_id: str, payment_method: str) -> dict:
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-conta",
+        "table_number": 2,
+        "customer_name": "Ana",
+        "member_id": member_id,
+        "payment_method": payment_method,
+        "items": [{"item_id": item_id, "quantity": 1}],
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+async def test_tab_statement_lists_the_orders_charged_to_it(client, db, menu_item, member_row, admin_headers):
+    on_tab = [await _create_order(client, menu_item.id, member_row.id, "conta") for _ in range(2)]
+    await _create_order(client, menu_item.id, member_row.id, "pix")  # membro pagando na hora: fora da conta
+
+    tab = await crud_member.get_current_tab(db, member_row.id)
+    stored = (await db.execute(select(Order.id, Order.tab_id).where(Order.member_id == member_row.id))).all()
+    assert {order_id for order_id, tab_id in stored if tab_id == tab.id} == {o["id"] for o in on_tab}
+    assert sum(1 for _, tab_id in stored if tab_id is None) == 1
+
+    statement = await client.get(
+        f"/api/restaurant/members/{member_row.id}/tabs/{tab.id}/orders", headers=admin_headers
+    )
+    assert statement.status_code == 200
+    assert sorted(o["id"] for o in statement.json()) == sorted(o["id"] for o in on_tab)
+
+    member_headers = {"Authorization": f"Bearer {create_access_token({'sub': member_row.id, 'role': 'member'})}"}
+    mine = await client.get("/api/members/me/tab/orders", headers=member_headers)
+    assert sorted(o["id"] for o in mine.json()) == sorted(o["id"] for o in on_tab)
+
+
+async def test_member_without_tab_has_no_tab_orders(client, member_row):
+    member_headers = {"Authorization": f"Bearer {create_access_token({'sub': member_row.id, 'role': 'member'})}"}
+    assert (await client.get("/api/members/me/tab/orders", headers=member_headers)).json() == []
+
+
+async def test_tab_of_another_member_is_404(client, db, menu_item, member_row, admin_headers):
+    await _create_order(client, menu_item.id, member_row.id, "conta")
+    tab = await crud_member.get_current_tab(db, member_row.id)
+    response = await client.get(f"/api/restaurant/members/outro/tabs/{tab.id}/orders", headers=admin_headers)
+    assert response.status_code == 404
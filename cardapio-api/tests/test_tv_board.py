@@ -0,0 +1,90 @@
+"""Projeção enxuta das TVs e canal de eventos só de prontos (user-014)."""
+import json
+import pytest
+from app.services.active_orders_board import board
+from app.services.notification_service import tv_manager
+
+pytestmark = pytest.mark.anyio
+
+TV_FIELDS = {"id", "table_number", "customer_name", "is_member", "ready_at"}
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.messages: list[dict] = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.messages.append(json.loads(text))
+
+
+@pytest.fixture
+async def tv():
+    websocket = FakeWebSocket()
+    await tv_manager.connect(websocket)
+    yield websocket
+    tv_manager.disconnect(websocket)
+
+
+async def _create_order(client, item_id: str, **extra) -> dict:
+    response = await client.post("/api/orders", json={
+        "session_id": "sessao-tv",
+        "table_number": 9,
+        "customer_name": "Rui",
+        "payment_method": "pix",
+        "items": [{"item_id": item_id, "quantity": 1}],
+        **extra,
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+async def _set_status(client, order_id: str, *statuses: str) -> None:
+    for status in statuses:
+        assert (await client.patch(f"/api/orders/{order_id}/status", json={"status": status})).status_code == 200
+
+
+@pytest.mark.parametrize("from_board", [True, False])
+async def test_tv_list_has_only_the_displayed_fields(client, db, menu_item, member_row, from_board):
+    if from_board:
+        await board.hydrate(db)
+    waiting = await _create_order(client, menu_item.id)
+    ready = await _create_order(
+        client, menu_item.id, member_id=member_row.id, payment_method="conta", customer_name="apelido"
+    )
+    await _set_status(client, ready["id"], "em_preparacao", "pronto")
+    assert board.loaded is from_board
+
+    tv_list = (await client.get("/api/tv/ready-orders")).json()
+    assert len(tv_list) == 1
+    assert set(tv_list[0]) == TV_FIELDS
+    assert tv_list[0]["id"] == ready["id"]
+    assert tv_list[0]["customer_name"] == "Ana"  # nome do membro
+    assert tv_list[0]["is_member"] is True
+    assert waiting["id"] not in {o["id"] for o in tv_list}
+
+
+async def test_tv_socket_only_gets_ready_transitions(client, db, menu_item, tv):
+    await board.hydrate(db)
+    order = await _create_order(client, menu_item.id)
+    await _set_status(client, order["id"], "em_preparacao")
+    assert tv.messages == []
+
+    await _set_status(client, order["id"], "pronto")
+    await _set_status(client, order["id"], "entregue")
+
+    ready, left = tv.messages
+    assert ready["event"] == "ficou_pronto"
+    assert set(ready["data"]) == TV_FIELDS
+    assert ready["data"]["id"] == order["id"]
+    assert left == {"event": "saiu_de_pronto", "data": {"id": order["id"]}}
+
+
+async def test_no_leave_event_when_previous_state_is_unknown(client, menu_item, tv):
+    order = await _create_order(client, menu_item.id)
+    # Quadro não carregado e sem versão anterior do pedido: não se sabe se estava na TV
+    board._orders.clear()
+    await _set_status(client, order["id"], "cancelado")
+    assert tv.messages == []
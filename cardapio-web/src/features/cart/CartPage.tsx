@@ -1,8 +1,8 @@
-import { useState } from 'react'
+import { useState, useEffect } from 'react'
 import { useMutation } from '@tanstack/react-query'
 import { ArrowLeft, Minus, Plus, Trash2, BookOpen } from 'lucide-react'
 import { useCartStore, useMemberStore } from '@/store/cartStore'
-import { useSession, getTableNumber } from '@/hooks/useSession'
+import { useSession, getTableNumber, generateUUID } from '@/hooks/useSession'
 import { orderApi } from '@/services/api'
 
 interface Props {
@@ -18,6 +18,9 @@ export default function CartPage({ onBack, onOrderCreated, onOrderLancadoNaConta
     const tableNumber = getTableNumber()
     const [customerName, setCustomerName] = useState('')
     const [observations, setObservations] = useState('')
+    // Uma chave por tentativa de checkout: reenvios (Wi-Fi fraco, toque duplo) não duplicam o pedido
+    const [idempotencyKey, setIdempotencyKey] = useState(generateUUID)
+    useEffect(() => setIdempotencyKey(generateUUID()), [items, observations])
 
     // Pedido via Pix (padrão)
     const mutation = useMutation({
@@ -31,7 +34,7 @@ export default function CartPage({ onBack, onOrderCreated, onOrderLancadoNaConta
                 payment_method: 'pix',
                 ...(isLoggedIn() && member?.id ? { member_id: member.id } : {}),
                 items: items.map((i) => ({ item_id: i.id, quantity: i.quantity })),
-            })
+            }, idempotencyKey)
         },
         onSuccess: (order) => {
             localStorage.setItem('cardapio_active_order', order.id)
@@ -51,7 +54,7 @@ export default function CartPage({ onBack, onOrderCreated, onOrderLancadoNaConta
                 payment_method: 'conta',
                 member_id: member?.id,
                 items: items.map((i) => ({ item_id: i.id, quantity: i.quantity })),
-            }),
+            }, idempotencyKey),
         onSuccess: (order) => {
             localStorage.setItem('cardapio_active_order', order.id)
             clearCart()
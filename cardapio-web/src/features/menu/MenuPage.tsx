@@ -1,8 +1,8 @@
 import { useState, useMemo, useEffect, useRef } from 'react'
-import { useQuery } from '@tanstack/react-query'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { Plus, Minus, Search, X, ShoppingBag, ChevronRight, User } from 'lucide-react'
 import { menuApi } from '@/services/api'
-import type { Category, Item } from '@/services/api'
+import type { Category, Item, MenuCopy, MenuDelta } from '@/services/api'
 import { useCartStore, useMemberStore } from '@/store/cartStore'
 import { getTableNumber } from '@/hooks/useSession'
 
@@ -122,6 +122,29 @@ function ProductModal({
     )
 }
 
+// Aplica um delta de /menu/changes sobre a cópia local; null = não encaixa (baixar tudo de novo)
+function applyMenuDelta(current: Category[], delta: MenuDelta): Category[] | null {
+    const removedItems = new Set(delta.removed_items)
+    const movedTo = new Map(delta.items.map((i) => [i.id, i.category_id]))
+    const byId = new Map(current.map((c) => [c.id, {
+        ...c,
+        items: c.items.filter((i) => !removedItems.has(i.id) && (movedTo.get(i.id) ?? c.id) === c.id),
+    }]))
+    delta.removed_categories.forEach((id) => byId.delete(id))
+    delta.categories.forEach((c) => byId.set(c.id, c))
+
+    for (const item of delta.items) {
+        const cat = byId.get(item.category_id)
+        if (!cat) return null
+        const index = cat.items.findIndex((i) => i.id === item.id)
+        const items = [...cat.items]
+        if (index >= 0) items[index] = item
+        else items.push(item)
+        byId.set(cat.id, { ...cat, items })
+    }
+    return [...byId.values()].sort((a, b) => a.name.localeCompare(b.name))
+}
+
 // ─── Página Principal ─────────────────────────────────────────────────────────
 export default function MenuPage({ onOpenCart, onMemberLogin, onMemberAccount }: Props) {
     const tableNumber = getTableNumber()
@@ -132,17 +155,27 @@ export default function MenuPage({ onOpenCart, onMemberLogin, onMemberAccount }:
     const [activeCategory, setActiveCategory] = useState<string>('')
     const categoryRefs = useRef<Record<string, HTMLElement | null>>({})
 
-    // Resolve o preço a exibir para um item (membro ou normal)
-    const getEffectivePrice = (item: Item): number => {
-        if (isLoggedIn() && item.member_price !== undefined && item.member_price !== null) {
-            return item.member_price
-        }
-        return item.price
-    }
+    // Preço a exibir para um item: a API já resolve (membro ou normal) em effective_price
+    const getEffectivePrice = (item: Item): number => item.effective_price ?? item.price
 
+    const queryClient = useQueryClient()
     const { data: categories = [], isLoading, isError } = useQuery({
-        queryKey: ['menu'],
-        queryFn: menuApi.getMenu,
+        queryKey: ['menu', isLoggedIn()],
+        // Primeira carga traz o cardápio inteiro; depois só o que mudou desde a versão local
+        queryFn: async ({ queryKey }) => {
+            const current = queryClient.getQueryData<MenuCopy>(queryKey)
+            if (current) {
+                const delta = await menuApi.getMenuChanges(current.version)
+                if (!delta.full_refresh) {
+                    if (delta.version === current.version) return current
+                    const merged = applyMenuDelta(current.categories, delta)
+                    if (merged) return { categories: merged, version: delta.version }
+                }
+            }
+            return menuApi.getMenu()
+        },
+        select: (menu) => menu.categories,
+        refetchInterval: 60000,
     })
 
     // Filtra categorias e itens
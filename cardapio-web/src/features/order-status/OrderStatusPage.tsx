@@ -1,4 +1,5 @@
-import { useQuery } from '@tanstack/react-query'
+import { useState, useEffect } from 'react'
+import { useQuery, useQueryClient } from '@tanstack/react-query'
 import type { Order } from '@/services/api'
 import { orderApi } from '@/services/api'
 import { CheckCircle, Clock, ChefHat, Bell, Package, MessageCircle } from 'lucide-react'
@@ -43,12 +44,54 @@ interface Props {
 }
 
 export default function OrderStatusPage({ orderId, onNewOrder }: Props) {
+    const queryClient = useQueryClient()
+    const [isLive, setIsLive] = useState(false)
+
     const { data: order } = useQuery({
         queryKey: ['order', orderId],
         queryFn: () => orderApi.getOrder(orderId),
-        refetchInterval: 5000, // polling a cada 5 segundos
+        // Com o WebSocket conectado só busca quando chega um evento; sem ele, volta ao polling
+        refetchInterval: isLive ? false : 5000,
     })
 
+    // WebSocket do pedido: avisa quando o status muda
+    useEffect(() => {
+        let socket: WebSocket | null = null
+        let reconnectTimeout: ReturnType<typeof setTimeout>
+        let closed = false
+
+        const refetch = () => queryClient.invalidateQueries({ queryKey: ['order', orderId] })
+
+        const connect = () => {
+            const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000/api'
+            const wsUrl = apiUrl.replace('http', 'ws').replace('/api', '') + `/api/ws/orders/${orderId}`
+
+            socket = new WebSocket(wsUrl)
+
+            socket.onopen = () => {
+                setIsLive(true)
+                refetch() // cobre mudanças ocorridas enquanto estava desconectado
+            }
+
+            socket.onmessage = refetch
+
+            socket.onclose = () => {
+                setIsLive(false)
+                if (!closed) reconnectTimeout = setTimeout(connect, 3000)
+            }
+
+            socket.onerror = () => socket?.close()
+        }
+
+        connect()
+
+        return () => {
+            closed = true
+            clearTimeout(reconnectTimeout)
+            if (socket) socket.close()
+        }
+    }, [orderId, queryClient])
+
     if (!order) {
         return (
             <div className="flex items-center justify-center min-h-screen">
@@ -1,6 +1,6 @@
 import { useState } from 'react'
-import { useQuery } from '@tanstack/react-query'
-import { Search, Calendar, User } from 'lucide-react'
+import { useInfiniteQuery } from '@tanstack/react-query'
+import { Search, Calendar, User, Download } from 'lucide-react'
 import { restaurantApi } from '@/services/api'
 
 export default function HistoryPage() {
@@ -11,16 +11,41 @@ export default function HistoryPage() {
     // Estado para disparar a busca apenas quando clicar ou mudar filtros significativos
     const [searchTrigger, setSearchTrigger] = useState(0)
 
-    const { data: orders, isLoading } = useQuery({
+    // Paginado por cursor: "Carregar mais" busca a página seguinte
+    const { data, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
         queryKey: ['restaurant-history', searchTrigger],
-        queryFn: () => {
+        queryFn: ({ pageParam }) => {
             const params: any = {}
             if (startDate) params.start_date = startDate
             if (endDate) params.end_date = endDate
             if (customerName) params.customer_name = customerName
+            if (pageParam) params.cursor = pageParam
             return restaurantApi.getHistory(params)
         },
+        initialPageParam: null as string | null,
+        getNextPageParam: (lastPage) => lastPage.nextCursor,
     })
+    const orders = data?.pages.flatMap((page) => page.orders)
+
+    const [isExporting, setIsExporting] = useState(false)
+
+    const handleExport = async () => {
+        setIsExporting(true)
+        try {
+            const params: any = {}
+            if (startDate) params.start_date = startDate
+            if (endDate) params.end_date = endDate
+            const blob = await restaurantApi.exportOrders(params)
+            const url = URL.createObjectURL(blob)
+            const link = document.createElement('a')
+            link.href = url
+            link.download = `pedidos_${startDate || 'inicio'}_${endDate || 'hoje'}.csv`
+            link.click()
+            URL.revokeObjectURL(url)
+        } finally {
+            setIsExporting(false)
+        }
+    }
 
     const handleSearch = (e: React.FormEvent) => {
         e.preventDefault()
@@ -41,7 +66,7 @@ export default function HistoryPage() {
                     Filtrar Histórico
                 </h2>
 
-                <form onSubmit={handleSearch} className="grid grid-cols-1 md:grid-cols-4 gap-4 items-end">
+                <form onSubmit={handleSearch} className="grid grid-cols-1 md:grid-cols-5 gap-4 items-end">
                     <div>
                         <label className="block text-sm font-medium text-gray-700 mb-1">Início</label>
                         <div className="relative">
@@ -89,6 +114,16 @@ export default function HistoryPage() {
                         <Search size={18} />
                         Buscar
                     </button>
+
+                    <button
+                        type="button"
+                        onClick={handleExport}
+                        disabled={isExporting}
+                        className="py-2 px-6 rounded-xl border border-gray-200 text-gray-700 font-medium hover:bg-gray-50 flex items-center justify-center gap-2 disabled:opacity-50"
+                    >
+                        <Download size={18} />
+                        {isExporting ? 'Exportando...' : 'Exportar CSV'}
+                    </button>
                 </form>
             </div>
 
@@ -152,6 +187,17 @@ export default function HistoryPage() {
                         </tbody>
                     </table>
                 </div>
+                {hasNextPage && (
+                    <div className="p-4 border-t border-gray-100 text-center">
+                        <button
+                            onClick={() => fetchNextPage()}
+                            disabled={isFetchingNextPage}
+                            className="px-6 py-2 rounded-xl border border-gray-200 text-gray-700 font-medium hover:bg-gray-50 disabled:opacity-50"
+                        >
+                            {isFetchingNextPage ? 'Carregando...' : 'Carregar mais'}
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     )
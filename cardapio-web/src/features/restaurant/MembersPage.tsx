@@ -1,9 +1,10 @@
 import { useState } from 'react'
-import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
-import { Plus, X, Check, Trash2, ToggleLeft, ToggleRight, ChevronDown, ChevronUp, QrCode, CreditCard, Eye } from 'lucide-react'
+import { useQuery, useInfiniteQuery, useMutation, useQueryClient } from '@tanstack/react-query'
+import { Plus, X, Check, Trash2, ToggleLeft, ToggleRight, ChevronDown, ChevronUp, QrCode, CreditCard, Eye, Upload } from 'lucide-react'
 import { adminMembersApi } from '@/services/api'
-import type { Member, MemberTab, Order } from '@/services/api'
+import type { Member, MemberOverview, MemberTab, Order } from '@/services/api'
 import { QRCodeSVG } from 'qrcode.react'
+import { isAxiosError } from 'axios'
 
 const MONTH_NAMES = [
     '', 'Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho',
@@ -50,7 +51,10 @@ function MemberTabsModal({ member, onClose }: { member: Member; onClose: () => v
     const payMutation = useMutation({
         mutationFn: ({ tabId, amount }: { tabId: string; amount: number }) =>
             adminMembersApi.registerPayment(member.id, tabId, { amount }),
-        onSuccess: () => qc.invalidateQueries({ queryKey: ['member-tabs', member.id] }),
+        onSuccess: () => {
+            qc.invalidateQueries({ queryKey: ['member-tabs', member.id] })
+            qc.invalidateQueries({ queryKey: ['admin-members'] })
+        },
     })
 
     const pixMutation = useMutation({
@@ -256,15 +260,35 @@ function NewMemberForm({ onSave, onClose }: { onSave: (data: { name: string; ema
 }
 
 // ─── Página Principal ─────────────────────────────────────────────────────────
+const MEMBERS_PAGE_SIZE = 50
+
+const formatMoney = (value: number) => `R$ ${value.toFixed(2).replace('.', ',')}`
+
 export default function MembersPage() {
     const qc = useQueryClient()
     const [showForm, setShowForm] = useState(false)
     const [viewingTabs, setViewingTabs] = useState<Member | null>(null)
 
-    const { data: members = [], isLoading } = useQuery({
-        queryKey: ['admin-members'],
-        queryFn: adminMembersApi.listMembers,
+    const [sort, setSort] = useState<'name' | 'balance' | 'current'>('name')
+    const [onlyActive, setOnlyActive] = useState(false)
+
+    // Uma consulta por página já traz a conta do mês e o saldo devedor de cada membro
+    const { data, isLoading, fetchNextPage, hasNextPage, isFetchingNextPage } = useInfiniteQuery({
+        queryKey: ['admin-members', sort, onlyActive],
+        queryFn: ({ pageParam }) => adminMembersApi.getOverview({
+            limit: MEMBERS_PAGE_SIZE,
+            offset: pageParam,
+            sort,
+            ...(onlyActive ? { is_active: true } : {}),
+        }),
+        initialPageParam: 0,
+        getNextPageParam: (lastPage, pages) => {
+            const loaded = pages.reduce((n, page) => n + page.items.length, 0)
+            return loaded < lastPage.total ? loaded : undefined
+        },
     })
+    const members = data?.pages.flatMap((page) => page.items) ?? []
+    const total = data?.pages[0]?.total ?? 0
 
     const invalidate = () => qc.invalidateQueries({ queryKey: ['admin-members'] })
 
@@ -284,6 +308,21 @@ export default function MembersPage() {
         onSuccess: invalidate,
     })
 
+    const importMembers = useMutation({
+        mutationFn: adminMembersApi.importMembers,
+        onSuccess: (report) => {
+            invalidate()
+            const errors = report.rows
+                .filter((r) => r.status === 'erro')
+                .map((r) => `Linha ${r.row}: ${r.error}`)
+            alert([`${report.created} de ${report.total} membros cadastrados.`, ...errors].join('\n'))
+        },
+        // Arquivo recusado como um todo (ex.: linhas demais): mostra o motivo da API
+        onError: (error) => alert(
+            (isAxiosError(error) && error.response?.data?.detail) || 'Não foi possível importar a planilha.'
+        ),
+    })
+
     return (
         <>
             {showForm && (
@@ -304,14 +343,49 @@ export default function MembersPage() {
                 <div className="flex items-center justify-between">
                     <div>
                         <h2 className="text-lg font-bold text-gray-900">Membros</h2>
-                        <p className="text-xs text-gray-500">{members.length} cadastrado{members.length !== 1 ? 's' : ''}</p>
+                        <p className="text-xs text-gray-500">{total} cadastrado{total !== 1 ? 's' : ''}</p>
+                    </div>
+                    <div className="flex items-center gap-2">
+                        <label
+                            title="Planilha CSV com as colunas nome;email;senha;telefone"
+                            className={`flex items-center gap-1.5 text-sm px-3 py-2 rounded-xl border border-gray-200 text-gray-700 hover:bg-gray-50 cursor-pointer ${importMembers.isPending ? 'opacity-50 pointer-events-none' : ''}`}
+                        >
+                            <Upload size={16} /> {importMembers.isPending ? 'Importando...' : 'Importar'}
+                            <input
+                                type="file"
+                                accept=".csv,text/csv"
+                                className="hidden"
+                                onChange={(e) => {
+                                    const file = e.target.files?.[0]
+                                    if (file) importMembers.mutate(file)
+                                    e.target.value = ''
+                                }}
+                            />
+                        </label>
+                        <button
+                            onClick={() => setShowForm(true)}
+                            className="btn-primary flex items-center gap-1.5 text-sm px-3 py-2"
+                        >
+                            <Plus size={16} /> Novo Membro
+                        </button>
                     </div>
-                    <button
-                        onClick={() => setShowForm(true)}
-                        className="btn-primary flex items-center gap-1.5 text-sm px-3 py-2"
+                </div>
+
+                {/* Ordenação e filtro */}
+                <div className="flex items-center gap-3 text-sm">
+                    <select
+                        value={sort}
+                        onChange={(e) => setSort(e.target.value as typeof sort)}
+                        className="border border-gray-200 rounded-xl px-3 py-2 text-gray-700 focus:outline-none focus:ring-2 focus:ring-primary-400"
                     >
-                        <Plus size={16} /> Novo Membro
-                    </button>
+                        <option value="name">Nome</option>
+                        <option value="balance">Maior saldo devedor</option>
+                        <option value="current">Maior consumo no mês</option>
+                    </select>
+                    <label className="flex items-center gap-1.5 text-gray-600">
+                        <input type="checkbox" checked={onlyActive} onChange={(e) => setOnlyActive(e.target.checked)} />
+                        Só ativos
+                    </label>
                 </div>
 
                 {isLoading ? (
@@ -325,7 +399,7 @@ export default function MembersPage() {
                     </div>
                 ) : (
                     <div className="space-y-2">
-                        {members.map((member: Member) => (
+                        {members.map((member: MemberOverview) => (
                             <div key={member.id} className={`card p-4 flex items-center gap-3 ${!member.is_active ? 'opacity-50' : ''}`}>
                                 {/* Avatar */}
                                 <div className="w-10 h-10 rounded-full bg-primary-100 flex items-center justify-center text-primary-700 font-bold text-sm flex-shrink-0">
@@ -339,6 +413,14 @@ export default function MembersPage() {
                                     {member.phone && <p className="text-xs text-gray-400">{member.phone}</p>}
                                 </div>
 
+                                {/* Conta do mês e saldo devedor */}
+                                <div className="text-right text-xs flex-shrink-0">
+                                    <p className="text-gray-500">Mês: {formatMoney(member.current_consumed)}</p>
+                                    {member.outstanding > 0 && (
+                                        <p className="font-semibold text-red-500">Deve {formatMoney(member.outstanding)}</p>
+                                    )}
+                                </div>
+
                                 {/* Ações */}
                                 <div className="flex items-center gap-1">
                                     <button
@@ -366,6 +448,17 @@ export default function MembersPage() {
                                 </div>
                             </div>
                         ))}
+                        {hasNextPage && (
+                            <div className="pt-2 text-center">
+                                <button
+                                    onClick={() => fetchNextPage()}
+                                    disabled={isFetchingNextPage}
+                                    className="px-6 py-2 rounded-xl border border-gray-200 text-gray-700 font-medium hover:bg-gray-50 disabled:opacity-50"
+                                >
+                                    {isFetchingNextPage ? 'Carregando...' : 'Carregar mais'}
+                                </button>
+                            </div>
+                        )}
                     </div>
                 )}
             </div>
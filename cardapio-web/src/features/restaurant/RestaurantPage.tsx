@@ -2,7 +2,7 @@ import { useState, useEffect, useRef } from 'react'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { LogIn, Bell, AlertCircle, ClipboardList, UtensilsCrossed, LogOut, QrCode, Users } from 'lucide-react'
 import { restaurantApi, orderApi } from '@/services/api'
-import type { Order } from '@/services/api'
+import type { Order, ActiveOrdersDelta } from '@/services/api'
 import ProductsPage from '@/features/restaurant/ProductsPage'
 import LinksPage from '@/features/restaurant/LinksPage'
 import HistoryPage from '@/features/restaurant/HistoryPage'
@@ -179,15 +179,36 @@ function OrderCard({ order }: { order: Order }) {
     )
 }
 
+// Aplica um delta da sincronização incremental sobre a lista que o painel já tem
+function mergeOrders(current: Order[], delta: ActiveOrdersDelta): Order[] {
+    const byId = new Map(current.map((o) => [o.id, o]))
+    delta.removed.forEach((id) => byId.delete(id))
+    delta.orders.forEach((o) => byId.set(o.id, o))
+    return [...byId.values()].sort((a, b) => a.created_at.localeCompare(b.created_at))
+}
+
 export default function RestaurantPage() {
     const [token, setToken] = useState(localStorage.getItem('restaurant_token') || '')
     const [activeTab, setActiveTab] = useState<'orders' | 'products' | 'links' | 'history' | 'members'>('orders')
     const wsRef = useRef<WebSocket | null>(null)
     const queryClient = useQueryClient()
 
+    const syncCursorRef = useRef<string | null>(null)
+
     const { data: orders, isLoading } = useQuery({
         queryKey: ['restaurant-orders'],
-        queryFn: restaurantApi.getActiveOrders,
+        // Primeira carga traz a lista completa; depois só o que mudou desde o cursor
+        queryFn: async () => {
+            const current = queryClient.getQueryData<Order[]>(['restaurant-orders'])
+            if (!current || !syncCursorRef.current) {
+                const { orders, cursor } = await restaurantApi.getActiveOrders()
+                syncCursorRef.current = cursor
+                return orders
+            }
+            const delta = await restaurantApi.getActiveOrderChanges(syncCursorRef.current)
+            syncCursorRef.current = delta.cursor
+            return mergeOrders(current, delta)
+        },
         enabled: !!token,
         refetchInterval: 10000,
     })
@@ -2,6 +2,7 @@ import { useState, useEffect, useRef } from 'react'
 import { useQuery, useQueryClient } from '@tanstack/react-query'
 import { Package, BellRing, Volume2, Play } from 'lucide-react'
 import { tvApi } from '@/services/api'
+import type { TvOrder } from '@/services/api'
 
 export default function TvDashboard() {
     const [isStarted, setIsStarted] = useState(false)
@@ -12,7 +13,8 @@ export default function TvDashboard() {
     const { data: readyOrders = [] } = useQuery({
         queryKey: ['tv-orders'],
         queryFn: tvApi.getReadyOrders,
-        refetchInterval: 10000,
+        // Com o WebSocket de TV os eventos chegam na hora; o polling só corrige eventuais perdas
+        refetchInterval: 60000,
     })
 
     const hasSpeechSynthesis = typeof window !== 'undefined' &&
@@ -60,19 +62,29 @@ export default function TvDashboard() {
 
         const connect = () => {
             const apiUrl = import.meta.env.VITE_API_URL || 'http://localhost:8000/api'
-            const wsUrl = apiUrl.replace('http', 'ws').replace('/api', '') + '/api/ws/restaurant'
+            const wsUrl = apiUrl.replace('http', 'ws').replace('/api', '') + '/api/ws/tv'
 
             socket = new WebSocket(wsUrl)
             wsRef.current = socket
 
+            // Reconectou: pode ter perdido eventos enquanto estava fora
+            socket.onopen = () => queryClient.invalidateQueries({ queryKey: ['tv-orders'] })
+
             socket.onmessage = (event) => {
                 const msg = JSON.parse(event.data)
-                if (msg.event === 'status_atualizado' && msg.data.status === 'pronto') {
-                    queryClient.invalidateQueries({ queryKey: ['tv-orders'] })
-                    if (msg.data.order_id !== lastReadyIdRef.current) {
-                        lastReadyIdRef.current = msg.data.order_id
-                        announceOrder(msg.data.customer_name)
+                if (msg.event === 'ficou_pronto') {
+                    const order: TvOrder = msg.data
+                    queryClient.setQueryData<TvOrder[]>(['tv-orders'], (current = []) =>
+                        current.some((o) => o.id === order.id) ? current : [...current, order]
+                    )
+                    if (order.id !== lastReadyIdRef.current) {
+                        lastReadyIdRef.current = order.id
+                        announceOrder(order.customer_name)
                     }
+                } else if (msg.event === 'saiu_de_pronto') {
+                    queryClient.setQueryData<TvOrder[]>(['tv-orders'], (current = []) =>
+                        current.filter((o) => o.id !== msg.data.id)
+                    )
                 }
             }
 
@@ -175,10 +187,10 @@ export default function TvDashboard() {
                                 className="bg-slate-900 border-2 border-slate-800 rounded-[40px] p-10 flex flex-col items-center text-center shadow-2xl animate-in zoom-in duration-500"
                             >
                                 <div className="text-slate-400 text-2xl font-bold uppercase mb-4 tracking-widest">
-                                    {order.member_id ? 'Membro' : 'Cliente'}
+                                    {order.is_member ? 'Membro' : 'Cliente'}
                                 </div>
                                 <div className="text-6xl font-black text-white mb-6 break-words w-full">
-                                    {(order.member_name || order.customer_name || '').split(' ')[0]}
+                                    {(order.customer_name || '').split(' ')[0]}
                                 </div>
                                 <div className="bg-green-500/10 text-green-400 px-8 py-4 rounded-2xl text-3xl font-black uppercase border border-green-500/20">
                                     PRONTO
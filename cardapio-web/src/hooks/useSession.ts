@@ -1,7 +1,7 @@
 // Hook para gerenciar o UUID de sessão único do cliente no localStorage
 import { useEffect, useState } from 'react'
 
-function generateUUID(): string {
+export function generateUUID(): string {
     return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, (c) => {
         const r = (Math.random() * 16) | 0
         const v = c === 'x' ? r : (r & 0x3) | 0x8
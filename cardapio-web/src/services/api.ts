@@ -14,6 +14,7 @@ export interface Item {
     description?: string
     price: number
     member_price?: number  // defineão de preço de membro (null = sem desconto)
+    effective_price?: number  // preço aplicável a quem está vendo (só no /menu)
     image_url?: string
     active: boolean
     category_id: string
@@ -51,6 +52,21 @@ export interface Order {
     items: OrderItem[]
 }
 
+export interface ActiveOrdersDelta {
+    cursor: string
+    orders: Order[]     // novos ou alterados (substituem pelo id)
+    removed: string[]   // ids que saíram do painel
+}
+
+// Projeção mínima exibida nas TVs
+export interface TvOrder {
+    id: string
+    table_number: number
+    customer_name: string
+    is_member: boolean
+    ready_at: string
+}
+
 export interface OrderItem {
     id: string
     item_id: string
@@ -59,13 +75,39 @@ export interface OrderItem {
     item_name?: string
 }
 
+// Cópia local do cardápio + versão (X-Menu-Version), usada como cursor do /menu/changes
+export interface MenuCopy {
+    categories: Category[]
+    version: number
+}
+
+export interface MenuDelta {
+    version: number             // próximo `since`
+    full_refresh: boolean       // cursor inválido/antigo demais: baixar /menu inteiro
+    categories: Category[]      // novas/alteradas, com seus itens ativos
+    items: Item[]               // novos/alterados (category_id diz onde ficam)
+    removed_categories: string[]
+    removed_items: string[]
+}
+
 export const menuApi = {
-    getMenu: () => api.get<Category[]>('/menu').then((r) => r.data),
+    getMenu: () =>
+        api.get<Category[]>('/menu').then((r): MenuCopy => ({
+            categories: r.data,
+            version: Number(r.headers['x-menu-version'] ?? 0),
+        })),
+
+    // Só o que mudou desde a versão que o cliente já tem
+    getMenuChanges: (since: number) =>
+        api.get<MenuDelta>('/menu/changes', { params: { since } }).then((r) => r.data),
 }
 
 export const orderApi = {
-    createOrder: (data: OrderCreate) =>
-        api.post<Order>('/orders', data).then((r) => r.data),
+    // idempotencyKey: mesma chave em reenvios = servidor devolve o pedido original
+    createOrder: (data: OrderCreate, idempotencyKey?: string) =>
+        api.post<Order>('/orders', data, {
+            headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined,
+        }).then((r) => r.data),
 
     getOrder: (orderId: string) =>
         api.get<Order>(`/orders/${orderId}`).then((r) => r.data),
@@ -92,16 +134,33 @@ export const restaurantApi = {
         ).then((r) => r.data)
     },
 
+    // Lista completa + cursor de sincronização (cabeçalho X-Sync-Cursor)
     getActiveOrders: () =>
-        api.get<Order[]>('/restaurant/orders').then((r) => r.data),
-
-    getHistory: (filters: { start_date?: string; end_date?: string; customer_name?: string }) =>
-        api.get<Order[]>('/restaurant/history', { params: filters }).then((r) => r.data),
+        api.get<Order[]>('/restaurant/orders').then((r) => ({
+            orders: r.data,
+            cursor: (r.headers['x-sync-cursor'] as string | undefined) ?? null,
+        })),
+
+    // Só o que mudou desde o cursor
+    getActiveOrderChanges: (since: string) =>
+        api.get<ActiveOrdersDelta>('/restaurant/orders', { params: { since } }).then((r) => r.data),
+
+    // Uma página do histórico; nextCursor = null quando não há mais páginas
+    getHistory: (filters: { start_date?: string; end_date?: string; customer_name?: string; cursor?: string }) =>
+        api.get<Order[]>('/restaurant/history', { params: filters }).then((r) => ({
+            orders: r.data,
+            nextCursor: (r.headers['x-next-cursor'] as string | undefined) ?? null,
+        })),
+
+    // Planilha de pedidos e itens do período (CSV abre direto no Excel)
+    exportOrders: (filters: { start_date?: string; end_date?: string }, formato: 'csv' | 'xlsx' = 'csv') =>
+        api.get<Blob>('/restaurant/export', { params: { ...filters, formato }, responseType: 'blob' })
+            .then((r) => r.data),
 }
 
 export const tvApi = {
     getReadyOrders: () =>
-        api.get<Order[]>('/tv/ready-orders').then((r) => r.data),
+        api.get<TvOrder[]>('/tv/ready-orders').then((r) => r.data),
 }
 
 export const adminApi = {
@@ -168,6 +227,28 @@ export interface MemberTab {
     notes?: string
 }
 
+// Listagem do admin: membro + conta do mês atual + saldo devedor de todas as contas
+export interface MemberOverview extends Member {
+    current_tab_id?: string
+    current_consumed: number
+    current_paid: number
+    current_status?: MemberTab['status']
+    outstanding: number
+}
+
+export interface MemberOverviewPage {
+    total: number
+    items: MemberOverview[]
+}
+
+export interface MemberImportReport {
+    total: number
+    created: number
+    failed: number
+    dry_run: boolean
+    rows: { row: number; email?: string; status: 'criado' | 'valido' | 'erro'; member_id?: string; error?: string }[]
+}
+
 export interface MemberTabPix {
     pix_payload: string
     qr_code_base64: string
@@ -202,9 +283,22 @@ export const adminMembersApi = {
     listMembers: () =>
         api.get<Member[]>('/restaurant/members').then((r) => r.data),
 
+    getOverview: (params: { limit?: number; offset?: number; sort?: 'name' | 'balance' | 'current'; is_active?: boolean }) =>
+        api.get<MemberOverviewPage>('/restaurant/members/overview', { params }).then((r) => r.data),
+
     createMember: (data: { name: string; email: string; password: string; phone?: string }) =>
         api.post<Member>('/restaurant/members', data).then((r) => r.data),
 
+    // Planilha CSV (nome;email;senha;telefone) — cadastra todos de uma vez
+    importMembers: (file: File) => {
+        const form = new FormData()
+        form.append('file', file)
+        return api.post<MemberImportReport>(
+            '/restaurant/members/import', form,
+            { headers: { 'Content-Type': 'multipart/form-data' } }
+        ).then((r) => r.data)
+    },
+
     updateMember: (id: string, data: Partial<{ name: string; email: string; phone: string; is_active: boolean; password: string }>) =>
         api.patch<Member>(`/restaurant/members/${id}`, data).then((r) => r.data),
 